@@ -1,7 +1,7 @@
-from flask import Flask, g, session
+from flask import Flask, g, session, request, jsonify
 from flask_login import LoginManager, current_user
 from .app_factory import create_app
-from .db_connect import close_db, get_db
+from .db_connect import admit_request, close_db, record_request_db_usage, start_request_db_usage
 import os
 
 app = create_app()
@@ -16,8 +16,9 @@ login_manager.login_message_category = 'info'
 
 @login_manager.user_loader
 def load_user(user_id):
-    from app.db_service import get_employee_by_id
-    return get_employee_by_id(int(user_id))
+    # Served from the per-worker principal cache; no query in steady state
+    from app.db_principal import get_principal
+    return get_principal(int(user_id))
 
 # Register Blueprints
 from app.blueprints.examples import examples
@@ -38,11 +39,29 @@ app.register_blueprint(employees, url_prefix='/employees')
 
 from . import routes
 
+# Blueprints whose pages cannot do anything useful without the database
+DB_BLUEPRINTS = {'dashboard', 'customers', 'pizzas', 'orders', 'employees'}
+
 @app.before_request
 def before_request():
-    g.db = get_db()
-    if g.db is None:
-        print("Warning: Database connection unavailable. Some features may not work.")
+    # No connection is checked out until a query actually needs one
+    start_request_db_usage()
+
+    # Fail fast while the database circuit breaker is open, or half-open with
+    # another request probing (no pool or network needed)
+    if request.blueprint in DB_BLUEPRINTS and not admit_request():
+        message = 'The database is temporarily unavailable. Please try again shortly.'
+        if request.method != 'GET' or request.accept_mimetypes.best == 'application/json':
+            response = jsonify({'success': False, 'message': message})
+        else:
+            response = app.response_class(message, mimetype='text/plain')
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+
+@app.teardown_request
+def teardown_request(exception=None):
+    record_request_db_usage(exception)
 
 # Setup database connection teardown
 @app.teardown_appcontext
@@ -54,7 +73,8 @@ def teardown_db(exception=None):
 def add_security_headers(response):
     """Add security headers to prevent caching of authenticated pages"""
     # Only add no-cache headers for authenticated users or protected routes
-    if current_user.is_authenticated:
+    # (static files skip the check so they never load the user from the database)
+    if request.endpoint != 'static' and current_user.is_authenticated:
         response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate, private, max-age=0'
         response.headers['Pragma'] = 'no-cache'
         response.headers['Expires'] = '0'
@@ -0,0 +1,11 @@
+"""Helpers shared by the blueprints"""
+
+
+def parse_version(value):
+    """
+    Parse the optional row version an edit form sends for optimistic locking
+    Returns None when it is blank; raises ValueError unless it is a whole number
+    """
+    if value is None or not value.strip():
+        return None
+    return int(value)
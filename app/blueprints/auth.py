@@ -1,6 +1,8 @@
 from flask import Blueprint, render_template, redirect, url_for, flash, request, session, make_response
 from flask_login import login_user, logout_user, login_required, current_user
-from app.db_service import get_employee_by_email, update_employee, update_employee_password
+from app.db_router import reading_primary
+from app.passwords import PasswordHasherBusy, needs_rehash
+from app.db_service import get_employee_by_email, get_employee_by_id, update_employee, update_employee_password
 
 auth = Blueprint('auth', __name__)
 
@@ -11,17 +13,32 @@ def login():
         return redirect(url_for('dashboard.index'))
 
     if request.method == 'POST':
-        email = request.form.get('email')
+        # Emails are compared in lower case, however they were typed
+        email = (request.form.get('email') or '').strip().lower()
         password = request.form.get('password')
         remember = request.form.get('remember', False)
 
         employee = get_employee_by_email(email)
 
-        if employee and employee.check_password(password):
+        try:
+            valid = bool(employee) and employee.check_password(password)
+        except PasswordHasherBusy as e:
+            flash(str(e), 'error')
+            return render_template('auth/login.html'), 503
+
+        if valid:
             if not employee.active:
                 flash('Your account has been deactivated. Please contact your manager.', 'error')
                 return redirect(url_for('auth.login'))
 
+            # Upgrade hashes made with older parameters while the password is at hand
+            if needs_rehash(employee.password_hash):
+                try:
+                    employee.set_password(password)
+                    update_employee_password(employee.employee_id, employee.password_hash)
+                except PasswordHasherBusy:
+                    pass  # try again at the next login
+
             login_user(employee, remember=remember)
             flash(f'Welcome back, {employee.first_name}!', 'success')
 
@@ -68,11 +85,8 @@ def update_profile():
     )
 
     if success:
-        # Update current_user object attributes
-        current_user.first_name = first_name
-        current_user.last_name = last_name
-        current_user.email = email
-        current_user.phone = phone
+        # current_user is shared by this worker's requests, so it is not edited
+        # in place; update_employee dropped it and the next request reloads it
         flash('Profile updated successfully!', 'success')
     else:
         flash('Failed to update profile. Please try again.', 'error')
@@ -87,8 +101,15 @@ def change_password():
     new_password = request.form.get('new_password')
     confirm_password = request.form.get('confirm_password')
 
-    # Verify current password
-    if not current_user.check_password(current_password):
+    # Verify current password (the signed-in principal does not carry the hash)
+    with reading_primary():
+        employee = get_employee_by_id(current_user.employee_id)
+    try:
+        valid = bool(employee) and employee.check_password(current_password)
+    except PasswordHasherBusy as e:
+        flash(str(e), 'error')
+        return redirect(url_for('auth.profile'))
+    if not valid:
         flash('Current password is incorrect.', 'error')
         return redirect(url_for('auth.profile'))
 
@@ -103,8 +124,12 @@ def change_password():
         return redirect(url_for('auth.profile'))
 
     # Update password
-    current_user.set_password(new_password)
-    success = update_employee_password(current_user.employee_id, current_user.password_hash)
+    try:
+        employee.set_password(new_password)
+    except PasswordHasherBusy as e:
+        flash(str(e), 'error')
+        return redirect(url_for('auth.profile'))
+    success = update_employee_password(employee.employee_id, employee.password_hash)
 
     if success:
         flash('Password changed successfully!', 'success')
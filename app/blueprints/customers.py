@@ -1,18 +1,28 @@
 from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
 from flask_login import login_required
 from app.db_service import (
-    get_all_customers, get_customer_by_id,
-    create_customer, update_customer, delete_customer
+    get_customers_page, get_customer_by_id,
+    create_customer, update_customer, delete_customer, iter_customers,
+    StaleVersionError
 )
+from app.blueprints import parse_version
+from app.db_connect import get_db
+from app.streaming import stream_page
 
 customers = Blueprint('customers', __name__)
 
 @customers.route('/')
 @login_required
 def index():
-    """List all customers"""
-    customer_list = get_all_customers()
-    return render_template('customers/index.html', customers=customer_list)
+    """List customers one keyset page at a time"""
+    page = get_customers_page(request.args.get('cursor'), request.args.get('per_page'))
+    return render_template('customers/index.html', customers=page['items'], page=page)
+
+@customers.route('/report')
+@login_required
+def report():
+    """Stream every customer as one page, rendered while rows arrive from the database"""
+    return stream_page('customers/report.html', customers=iter_customers())
 
 @customers.route('/create', methods=['POST'])
 @login_required
@@ -37,32 +47,38 @@ def create():
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+def _customer_json(customer):
+    """Customer fields sent to the edit form"""
+    return {
+        'customer_id': customer.customer_id,
+        'first_name': customer.first_name,
+        'last_name': customer.last_name,
+        'email': customer.email,
+        'phone': customer.phone,
+        'address': customer.address,
+        'city': customer.city,
+        'state': customer.state,
+        'zip_code': customer.zip_code,
+        'version': customer.version
+    }
+
 @customers.route('/get/<int:customer_id>')
 @login_required
 def get(customer_id):
     """Get customer details via AJAX"""
     customer = get_customer_by_id(customer_id)
     if customer:
-        return jsonify({
-            'success': True,
-            'customer': {
-                'customer_id': customer.customer_id,
-                'first_name': customer.first_name,
-                'last_name': customer.last_name,
-                'email': customer.email,
-                'phone': customer.phone,
-                'address': customer.address,
-                'city': customer.city,
-                'state': customer.state,
-                'zip_code': customer.zip_code
-            }
-        })
+        return jsonify({'success': True, 'customer': _customer_json(customer)})
     return jsonify({'success': False, 'message': 'Customer not found.'}), 404
 
 @customers.route('/update/<int:customer_id>', methods=['POST'])
 @login_required
 def update(customer_id):
     """Update a customer via AJAX"""
+    try:
+        version = parse_version(request.form.get('version'))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'version must be a whole number.'}), 400
     try:
         data = request.form
         success = update_customer(
@@ -74,12 +90,18 @@ def update(customer_id):
             data['address'],
             data['city'],
             data['state'],
-            data['zip_code']
+            data['zip_code'],
+            version=version
         )
         if success:
             return jsonify({'success': True, 'message': 'Customer updated successfully!'})
-        else:
+        elif get_db() is None:
             return jsonify({'success': False, 'message': 'Failed to update customer.'}), 500
+        else:
+            # Nothing matched and the database is up, so the row is gone
+            return jsonify({'success': False, 'message': 'Customer not found.'}), 404
+    except StaleVersionError as e:
+        return jsonify({'success': False, 'message': str(e), 'customer': _customer_json(e.current)}), 409
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
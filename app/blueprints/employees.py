@@ -1,18 +1,20 @@
 from flask import Blueprint, render_template, request, jsonify
 from flask_login import login_required
 from app.db_service import (
-    get_all_employees, get_employee_by_id,
-    create_employee, update_employee, delete_employee
+    get_employees_page, get_employee_by_id,
+    create_employee, update_employee, delete_employee, StaleVersionError
 )
+from app.blueprints import parse_version
+from app.db_connect import get_db
 
 employees = Blueprint('employees', __name__)
 
 @employees.route('/')
 @login_required
 def index():
-    """List all employees"""
-    employee_list = get_all_employees()
-    return render_template('employees/index.html', employees=employee_list)
+    """List employees one keyset page at a time"""
+    page = get_employees_page(request.args.get('cursor'), request.args.get('per_page'))
+    return render_template('employees/index.html', employees=page['items'], page=page)
 
 @employees.route('/create', methods=['POST'])
 @login_required
@@ -36,31 +38,37 @@ def create():
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+def _employee_json(employee):
+    """Employee fields sent to the edit form (never the password hash)"""
+    return {
+        'employee_id': employee.employee_id,
+        'first_name': employee.first_name,
+        'last_name': employee.last_name,
+        'email': employee.email,
+        'phone': employee.phone,
+        'role': employee.role,
+        'hire_date': employee.hire_date.isoformat() if employee.hire_date else None,
+        'active': employee.active,
+        'version': employee.version
+    }
+
 @employees.route('/get/<int:employee_id>')
 @login_required
 def get(employee_id):
     """Get employee details via AJAX"""
     employee = get_employee_by_id(employee_id)
     if employee:
-        return jsonify({
-            'success': True,
-            'employee': {
-                'employee_id': employee.employee_id,
-                'first_name': employee.first_name,
-                'last_name': employee.last_name,
-                'email': employee.email,
-                'phone': employee.phone,
-                'role': employee.role,
-                'hire_date': employee.hire_date.isoformat() if employee.hire_date else None,
-                'active': employee.active
-            }
-        })
+        return jsonify({'success': True, 'employee': _employee_json(employee)})
     return jsonify({'success': False, 'message': 'Employee not found.'}), 404
 
 @employees.route('/update/<int:employee_id>', methods=['POST'])
 @login_required
 def update(employee_id):
     """Update an employee via AJAX"""
+    try:
+        version = parse_version(request.form.get('version'))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'version must be a whole number.'}), 400
     try:
         data = request.form
         active = data.get('active', 'true').lower() == 'true'
@@ -71,12 +79,18 @@ def update(employee_id):
             data['email'],
             data['phone'],
             data['role'],
-            active
+            active,
+            version=version
         )
         if success:
             return jsonify({'success': True, 'message': 'Employee updated successfully!'})
-        else:
+        elif get_db() is None:
             return jsonify({'success': False, 'message': 'Failed to update employee.'}), 500
+        else:
+            # Nothing matched and the database is up, so the row is gone
+            return jsonify({'success': False, 'message': 'Employee not found.'}), 404
+    except StaleVersionError as e:
+        return jsonify({'success': False, 'message': str(e), 'employee': _employee_json(e.current)}), 409
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -1,19 +1,112 @@
+import csv
+import hashlib
+import io
+import json
+import os
+from datetime import datetime, timedelta
+from itertools import groupby
 from flask import Blueprint, render_template, request, jsonify
 from flask_login import login_required, current_user
 from app.db_service import (
-    get_all_orders, get_order_by_id, get_order_details,
-    create_order, update_order_status, delete_order,
-    get_all_customers, get_available_pizzas
+    get_orders_page, get_order_by_id, get_order_details,
+    create_order, create_orders_bulk, update_order_status, update_order_statuses, delete_order,
+    get_idempotent_order, IdempotencyKeyConflict, StaleVersionError,
+    get_all_customers, get_available_pizzas, iter_orders,
+    ORDER_EXPORT_COLUMNS, iter_order_export
 )
+from app.blueprints import parse_version
+from app.db_connect import get_db
+from app.streaming import stream_download, stream_page
 
 orders = Blueprint('orders', __name__)
 
 @orders.route('/')
 @login_required
 def index():
-    """List all orders"""
-    order_list = get_all_orders()
-    return render_template('orders/index.html', orders=order_list)
+    """List orders one keyset page at a time, newest first"""
+    page = get_orders_page(request.args.get('cursor'), request.args.get('per_page'))
+    return render_template('orders/index.html', orders=page['items'], page=page)
+
+@orders.route('/report')
+@login_required
+def report():
+    """Stream every order as one page, rendered while rows arrive from the database"""
+    return stream_page('orders/report.html', orders=iter_orders())
+
+def _export_value(value):
+    """Format one exported value (money as plain decimals, dates as ISO 8601)"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.isoformat(' ')
+    if isinstance(value, (int, str)):
+        return value
+    return float(value)
+
+def _csv_lines(rows):
+    """One CSV line per order line item, with the order columns repeated"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(ORDER_EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow([_export_value(value) for value in row])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def _ndjson_lines(rows):
+    """One JSON object per order, with its line items nested under items"""
+    order_width = ORDER_EXPORT_COLUMNS.index('detail_id')
+    order_columns = ORDER_EXPORT_COLUMNS[:order_width]
+    item_columns = ORDER_EXPORT_COLUMNS[order_width:]
+    # Rows arrive sorted by order_id, so each order's items are consecutive
+    for _, order_rows in groupby(rows, key=lambda row: row[0]):
+        first = next(order_rows)
+        order = dict(zip(order_columns, map(_export_value, first[:order_width])))
+        order['items'] = [
+            dict(zip(item_columns, map(_export_value, row[order_width:])))
+            for row in (first, *order_rows) if row[order_width] is not None
+        ]
+        yield json.dumps(order) + '\n'
+
+def _parse_date(value):
+    """Parse an optional YYYY-MM-DD query argument"""
+    return datetime.strptime(value, '%Y-%m-%d') if value else None
+
+def _parse_int(value):
+    """Parse an optional integer query argument"""
+    return int(value) if value else None
+
+@orders.route('/export')
+@login_required
+def export():
+    """
+    Stream orders with their line items as CSV (default) or NDJSON (?format=ndjson)
+    Filters: start/end dates (YYYY-MM-DD, inclusive), status, employee_id.
+    An interrupted export resumes with ?after=<last complete order_id>
+    """
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'success': False, 'message': 'format must be csv or ndjson.'}), 400
+    try:
+        start = _parse_date(request.args.get('start'))
+        end = _parse_date(request.args.get('end'))
+        employee_id = _parse_int(request.args.get('employee_id'))
+        after_order_id = _parse_int(request.args.get('after'))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'Dates must be YYYY-MM-DD and IDs whole numbers.'}), 400
+
+    rows = iter_order_export(
+        start=start,
+        end=end + timedelta(days=1) if end else None,
+        status=request.args.get('status') or None,
+        employee_id=employee_id,
+        after_order_id=after_order_id,
+    )
+    if export_format == 'ndjson':
+        return stream_download(_ndjson_lines(rows), 'application/x-ndjson', 'orders.ndjson')
+    return stream_download(_csv_lines(rows), 'text/csv', 'orders.csv')
 
 @orders.route('/new')
 @login_required
@@ -23,33 +116,119 @@ def new():
     pizzas = get_available_pizzas()
     return render_template('orders/new.html', customers=customers, pizzas=pizzas)
 
+def _created_response(order_id, replayed=False):
+    """The /orders/create success response, identical for the original request and its replays"""
+    response = jsonify({'success': True, 'message': 'Order created successfully!', 'order_id': order_id})
+    if replayed:
+        response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
 @orders.route('/create', methods=['POST'])
 @login_required
 def create():
-    """Create a new order via AJAX"""
+    """
+    Create a new order via AJAX
+    Clients may send an Idempotency-Key header (unique per order, at most 100
+    characters); retrying with the same key returns the first order instead
+    of creating another
+    """
     try:
         data = request.get_json()
+        idempotency_key = request.headers.get('Idempotency-Key', '').strip() or None
+        request_hash = None
+        if idempotency_key:
+            if len(idempotency_key) > 100:
+                return jsonify({'success': False, 'message': 'Idempotency-Key is longer than 100 characters.'}), 400
+            # Tie the key to who sent what, so it cannot replay someone else's order
+            request_hash = hashlib.sha256(
+                json.dumps([current_user.employee_id, data], sort_keys=True).encode()
+            ).hexdigest()
+            order_id = get_idempotent_order(idempotency_key, request_hash)
+            if order_id:
+                return _created_response(order_id, replayed=True)
+
         customer_id = int(data['customer_id'])
         employee_id = current_user.employee_id
         tax_rate = float(data.get('tax_rate', 0.0700))
         notes = data.get('notes', '')
 
-        # Parse order items: list of {pizza_id, quantity, unit_price}
+        # Parse order items: list of {pizza_id, quantity}; prices come from the menu
         order_items = []
         for item in data['items']:
             pizza_id = int(item['pizza_id'])
             quantity = int(item['quantity'])
-            unit_price = float(item['unit_price'])
-            order_items.append((pizza_id, quantity, unit_price))
+            order_items.append((pizza_id, quantity))
 
-        order_id = create_order(customer_id, employee_id, order_items, tax_rate, notes)
+        order_id = create_order(customer_id, employee_id, order_items, tax_rate, notes,
+                                idempotency_key=idempotency_key, request_hash=request_hash)
 
         if order_id:
-            return jsonify({'success': True, 'message': 'Order created successfully!', 'order_id': order_id})
+            return _created_response(order_id)
         else:
             return jsonify({'success': False, 'message': 'Failed to create order.'}), 500
+    except IdempotencyKeyConflict:
+        return jsonify({'success': False, 'message': 'Idempotency-Key was already used for a different order.'}), 422
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+def _parse_bulk_order(entry):
+    """Convert one order from a /orders/bulk request (ValueError/KeyError/TypeError if malformed)"""
+    if not isinstance(entry, dict):
+        raise ValueError("Each order must be a JSON object")
+    order_date = entry.get('order_date')
+    return {
+        'customer_id': int(entry['customer_id']),
+        'employee_id': int(entry.get('employee_id') or current_user.employee_id),
+        'items': [(int(item['pizza_id']), int(item['quantity'])) for item in entry['items']],
+        'tax_rate': float(entry.get('tax_rate', 0.0700)),
+        'notes': entry.get('notes', ''),
+        'order_date': datetime.fromisoformat(order_date) if order_date else None,
+    }
+
+@orders.route('/bulk', methods=['POST'])
+@login_required
+def bulk_create():
+    """
+    Create many orders from one JSON request, for POS and online-order sync
+    Body: {"orders": [{customer_id, items: [{pizza_id, quantity}], and optional
+    employee_id, tax_rate, notes, order_date (ISO 8601)}]}. Each order
+    succeeds or fails on its own; results are returned in request order
+    """
+    data = request.get_json(silent=True) or {}
+    entries = data.get('orders')
+    if not isinstance(entries, list) or not entries:
+        return jsonify({'success': False, 'message': 'Send a non-empty "orders" list.'}), 400
+    max_orders = int(os.getenv('BULK_ORDER_MAX_ORDERS', 1000))
+    if len(entries) > max_orders:
+        return jsonify({'success': False, 'message': f'At most {max_orders} orders per request.'}), 413
+
+    results = [None] * len(entries)
+    parsed = []
+    for index, entry in enumerate(entries):
+        try:
+            parsed.append((index, _parse_bulk_order(entry)))
+        except (KeyError, TypeError, ValueError) as e:
+            results[index] = {'index': index, 'success': False, 'message': f'Malformed order: {e}'}
+
+    try:
+        created = create_orders_bulk([order for _, order in parsed]) if parsed else []
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
+    for (index, _), outcome in zip(parsed, created):
+        if isinstance(outcome, int):
+            results[index] = {'index': index, 'success': True, 'order_id': outcome}
+        else:
+            results[index] = {'index': index, 'success': False, 'message': outcome}
+
+    failed = sum(1 for result in results if not result['success'])
+    return jsonify({
+        'success': failed == 0,
+        'created': len(results) - failed,
+        'failed': failed,
+        'results': results,
+    })
 
 @orders.route('/view/<int:order_id>')
 @login_required
@@ -62,6 +241,22 @@ def view(order_id):
     details = get_order_details(order_id)
     return render_template('orders/view.html', order=order, details=details)
 
+def _order_json(order):
+    """Order header fields as JSON"""
+    return {
+        'order_id': order.order_id,
+        'customer_id': order.customer_id,
+        'employee_id': order.employee_id,
+        'order_date': order.order_date.isoformat() if order.order_date else None,
+        'subtotal': float(order.subtotal),
+        'tax_rate': float(order.tax_rate),
+        'tax_amount': float(order.tax_amount),
+        'total_amount': float(order.total_amount),
+        'status': order.status,
+        'notes': order.notes,
+        'version': order.version
+    }
+
 @orders.route('/details/<int:order_id>')
 @login_required
 def get_details(order_id):
@@ -74,18 +269,7 @@ def get_details(order_id):
 
     return jsonify({
         'success': True,
-        'order': {
-            'order_id': order.order_id,
-            'customer_id': order.customer_id,
-            'employee_id': order.employee_id,
-            'order_date': order.order_date.isoformat() if order.order_date else None,
-            'subtotal': float(order.subtotal),
-            'tax_rate': float(order.tax_rate),
-            'tax_amount': float(order.tax_amount),
-            'total_amount': float(order.total_amount),
-            'status': order.status,
-            'notes': order.notes
-        },
+        'order': _order_json(order),
         'details': [{
             'detail_id': d.detail_id,
             'pizza_id': d.pizza_id,
@@ -101,18 +285,63 @@ def get_details(order_id):
 @login_required
 def update_status(order_id):
     """Update order status via AJAX"""
+    try:
+        version = parse_version(request.form.get('version'))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'version must be a whole number.'}), 400
     try:
         data = request.form
         status = data['status']
-        success = update_order_status(order_id, status)
+        success = update_order_status(order_id, status, version=version)
 
         if success:
             return jsonify({'success': True, 'message': 'Order status updated successfully!'})
-        else:
+        elif get_db() is None:
             return jsonify({'success': False, 'message': 'Failed to update order status.'}), 500
+        else:
+            # Nothing matched and the database is up, so the row is gone
+            return jsonify({'success': False, 'message': 'Order not found.'}), 404
+    except StaleVersionError as e:
+        return jsonify({'success': False, 'message': str(e), 'order': _order_json(e.current)}), 409
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@orders.route('/bulk-status', methods=['POST'])
+@login_required
+def bulk_update_status():
+    """
+    Move many orders to one status via AJAX, e.g. clearing a rush from the expo screen
+    Body: {"order_ids": [...], "status": "Completed"}. Orders whose current
+    status cannot move to the target are left alone and listed as skipped
+    """
+    data = request.get_json(silent=True) or {}
+    status = data.get('status')
+    try:
+        order_ids = [int(order_id) for order_id in data.get('order_ids') or []]
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'order_ids must be a list of whole numbers.'}), 400
+    if not order_ids:
+        return jsonify({'success': False, 'message': 'Select at least one order.'}), 400
+    max_orders = int(os.getenv('BULK_ORDER_MAX_ORDERS', 1000))
+    if len(order_ids) > max_orders:
+        return jsonify({'success': False, 'message': f'At most {max_orders} orders per request.'}), 413
+
+    try:
+        updated = update_order_statuses(order_ids, status)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    if updated is None:
+        return jsonify({'success': False, 'message': 'Failed to update order statuses.'}), 500
+
+    changed = set(updated)
+    return jsonify({
+        'success': True,
+        'message': f'{len(updated)} order(s) marked {status}.',
+        'status': status,
+        'updated': updated,
+        'skipped': sorted(set(order_ids) - changed),
+    })
+
 @orders.route('/delete/<int:order_id>', methods=['POST'])
 @login_required
 def delete(order_id):
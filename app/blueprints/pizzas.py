@@ -1,19 +1,21 @@
 from flask import Blueprint, render_template, request, jsonify
 from flask_login import login_required
 from app.db_service import (
-    get_all_pizzas, get_pizza_by_id, get_archived_pizzas,
+    get_pizzas_page, get_pizza_by_id,
     create_pizza, update_pizza, delete_pizza,
-    restore_pizza, permanently_delete_pizza
+    restore_pizza, permanently_delete_pizza, StaleVersionError
 )
+from app.blueprints import parse_version
+from app.db_connect import get_db
 
 pizzas = Blueprint('pizzas', __name__)
 
 @pizzas.route('/')
 @login_required
 def index():
-    """List all pizzas"""
-    pizza_list = get_all_pizzas()
-    return render_template('pizzas/index.html', pizzas=pizza_list)
+    """List pizzas one keyset page at a time"""
+    page = get_pizzas_page(request.args.get('cursor'), request.args.get('per_page'))
+    return render_template('pizzas/index.html', pizzas=page['items'], page=page)
 
 @pizzas.route('/create', methods=['POST'])
 @login_required
@@ -37,30 +39,36 @@ def create():
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+def _pizza_json(pizza):
+    """Pizza fields sent to the edit form"""
+    return {
+        'pizza_id': pizza.pizza_id,
+        'name': pizza.name,
+        'description': pizza.description,
+        'size': pizza.size,
+        'base_price': pizza.base_price,
+        'category': pizza.category,
+        'available': pizza.available,
+        'version': pizza.version
+    }
+
 @pizzas.route('/get/<int:pizza_id>')
 @login_required
 def get(pizza_id):
     """Get pizza details via AJAX"""
     pizza = get_pizza_by_id(pizza_id)
     if pizza:
-        return jsonify({
-            'success': True,
-            'pizza': {
-                'pizza_id': pizza.pizza_id,
-                'name': pizza.name,
-                'description': pizza.description,
-                'size': pizza.size,
-                'base_price': pizza.base_price,
-                'category': pizza.category,
-                'available': pizza.available
-            }
-        })
+        return jsonify({'success': True, 'pizza': _pizza_json(pizza)})
     return jsonify({'success': False, 'message': 'Pizza not found.'}), 404
 
 @pizzas.route('/update/<int:pizza_id>', methods=['POST'])
 @login_required
 def update(pizza_id):
     """Update a pizza via AJAX"""
+    try:
+        version = parse_version(request.form.get('version'))
+    except ValueError:
+        return jsonify({'success': False, 'message': 'version must be a whole number.'}), 400
     try:
         data = request.form
         available = data.get('available', 'true').lower() == 'true'
@@ -71,12 +79,18 @@ def update(pizza_id):
             data['size'],
             float(data['base_price']),
             data['category'],
-            available
+            available,
+            version=version
         )
         if success:
             return jsonify({'success': True, 'message': 'Pizza updated successfully!'})
-        else:
+        elif get_db() is None:
             return jsonify({'success': False, 'message': 'Failed to update pizza.'}), 500
+        else:
+            # Nothing matched and the database is up, so the row is gone
+            return jsonify({'success': False, 'message': 'Pizza not found.'}), 404
+    except StaleVersionError as e:
+        return jsonify({'success': False, 'message': str(e), 'pizza': _pizza_json(e.current)}), 409
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
@@ -96,9 +110,9 @@ def delete(pizza_id):
 @pizzas.route('/archived')
 @login_required
 def archived():
-    """List all archived pizzas"""
-    pizza_list = get_archived_pizzas()
-    return render_template('pizzas/index.html', pizzas=pizza_list, show_archived=True)
+    """List archived pizzas one keyset page at a time"""
+    page = get_pizzas_page(request.args.get('cursor'), request.args.get('per_page'), archived=True)
+    return render_template('pizzas/index.html', pizzas=page['items'], page=page, show_archived=True)
 
 @pizzas.route('/restore/<int:pizza_id>', methods=['POST'])
 @login_required
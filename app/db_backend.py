@@ -0,0 +1,321 @@
+"""
+Storage backends for the Pizza Management System
+db_service writes MySQL-flavoured SQL with %s placeholders and dict rows.
+This module opens connections for the backend chosen by DB_BACKEND:
+- mysql:  PyMySQL against DB_HOST (the default)
+- sqlite: an embedded SQLite file (SQLITE_PATH) in WAL mode, wrapped so the
+          same queries, placeholders and dict rows work unchanged
+"""
+
+import os
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
+import pymysql
+import pymysql.cursors
+from pymysql.constants import CLIENT
+
+MYSQL = 'mysql'
+SQLITE = 'sqlite'
+
+# MySQL client/server error codes that mean the connection itself is gone
+MYSQL_DISCONNECT_ERRORS = {
+    0,     # PyMySQL: operation on a closed connection
+    2006,  # CR_SERVER_GONE_ERROR
+    2013,  # CR_SERVER_LOST
+    2055,  # CR_SERVER_LOST_EXTENDED
+    1927,  # ER_CONNECTION_KILLED
+    4031,  # ER_CLIENT_INTERACTION_TIMEOUT
+}
+
+
+def get_backend_name():
+    """Return the configured backend name ('mysql' or 'sqlite')"""
+    name = os.getenv('DB_BACKEND', MYSQL).strip().lower()
+    if name not in (MYSQL, SQLITE):
+        raise ValueError(f"Unsupported DB_BACKEND '{name}' (use 'mysql' or 'sqlite')")
+    return name
+
+
+def is_sqlite():
+    """Check whether the embedded SQLite backend is selected"""
+    return get_backend_name() == SQLITE
+
+
+# ==================== MYSQL ====================
+
+def connect_mysql(host=None, port=None, local_infile=False, multi_statements=False):
+    """
+    Open a new MySQL connection from environment settings (`local_infile`
+    allows LOAD DATA LOCAL INFILE, for bulk loading tools only;
+    `multi_statements` is only for the batch pools fetch_result_sets runs on)
+    """
+    return pymysql.connect(
+        # Database configuration from environment variables
+        host=host or os.getenv('DB_HOST'),
+        port=port or int(os.getenv('DB_PORT', 3306)),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=os.getenv('DB_NAME'),
+        # Short timeouts so a dead server fails requests quickly instead of hanging workers
+        connect_timeout=float(os.getenv('DB_CONNECT_TIMEOUT', 3)),
+        read_timeout=float(os.getenv('DB_READ_TIMEOUT', 30)),
+        write_timeout=float(os.getenv('DB_WRITE_TIMEOUT', 30)),
+        cursorclass=pymysql.cursors.DictCursor,  # Set the default cursor class to DictCursor
+        # Ordinary pooled connections stay single-statement, so an injected
+        # ";" cannot append statements; only the separate batch pools opt in
+        client_flag=CLIENT.MULTI_STATEMENTS if multi_statements else 0,
+        local_infile=local_infile,
+    )
+
+
+# ==================== SQLITE ====================
+
+_PLACEHOLDER = re.compile(r'%(s|%)')
+
+
+@lru_cache(maxsize=512)
+def _translate(sql):
+    """Rewrite PyMySQL-style %s placeholders (and %% escapes) for sqlite3"""
+    return _PLACEHOLDER.sub(lambda m: '?' if m.group(1) == 's' else '%', sql)
+
+
+def _dict_row(cursor, row):
+    """sqlite3 row factory producing dicts, like PyMySQL's DictCursor"""
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SQLiteCursor(sqlite3.Cursor):
+    """sqlite3 cursor that accepts the %s placeholders db_service uses"""
+
+    def execute(self, sql, params=None):
+        if params is None:
+            return super().execute(sql)
+        return super().execute(_translate(sql), params)
+
+    def executemany(self, sql, seq_of_params):
+        return super().executemany(_translate(sql), seq_of_params)
+
+
+class SQLiteConnection(sqlite3.Connection):
+    """sqlite3 connection whose cursors behave like PyMySQL DictCursors"""
+
+    def cursor(self, factory=SQLiteCursor):
+        return super().cursor(factory)
+
+
+def _register_sqlite_types():
+    """Map DATE/TIMESTAMP columns and Decimal parameters the way PyMySQL does"""
+    sqlite3.register_adapter(Decimal, float)
+    sqlite3.register_adapter(date, lambda value: value.isoformat())
+    sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+    sqlite3.register_converter('DATE', lambda raw: date.fromisoformat(raw.decode()))
+    sqlite3.register_converter('TIMESTAMP', lambda raw: datetime.fromisoformat(raw.decode()))
+
+
+_register_sqlite_types()
+
+
+def get_sqlite_path():
+    """Return the SQLite database file (SQLITE_PATH, default pizza.sqlite3)"""
+    return os.getenv('SQLITE_PATH', 'pizza.sqlite3')
+
+
+def connect_sqlite(path=None):
+    """Open the embedded SQLite database in WAL mode"""
+    conn = sqlite3.connect(
+        path or get_sqlite_path(),
+        factory=SQLiteConnection,
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        timeout=float(os.getenv('SQLITE_BUSY_TIMEOUT', 5)),
+        # Pooled connections move between request threads (one at a time)
+        check_same_thread=False,
+    )
+    conn.row_factory = _dict_row
+    conn.execute('PRAGMA journal_mode = WAL')
+    conn.execute('PRAGMA synchronous = NORMAL')
+    conn.execute('PRAGMA foreign_keys = ON')
+    return conn
+
+
+# ==================== BACKEND-NEUTRAL HELPERS ====================
+
+def connect(host=None, port=None, multi_statements=False):
+    """
+    Open a connection for the configured backend (host, port and
+    multi_statements are MySQL-only)
+    """
+    if is_sqlite():
+        return connect_sqlite()
+    return connect_mysql(host, port, multi_statements=multi_statements)
+
+
+def tuple_cursor(conn):
+    """
+    Return a cursor yielding plain tuples instead of dicts, for mapping rows
+    positionally onto models without building a dict per row
+    """
+    if isinstance(conn, sqlite3.Connection):
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        return cursor
+    return conn.cursor(pymysql.cursors.Cursor)
+
+
+def streaming_cursor(conn):
+    """
+    Return a tuple cursor that fetches rows from the server as they are read
+    instead of buffering the whole result (PyMySQL SSCursor; sqlite3 cursors
+    already step through results lazily). Finish it with close_streaming_cursor
+    """
+    if isinstance(conn, sqlite3.Connection):
+        return tuple_cursor(conn)
+    return conn.cursor(pymysql.cursors.SSCursor)
+
+
+def close_streaming_cursor(cursor, exhausted):
+    """
+    Close a streaming cursor. A MySQL result abandoned part-way would have to
+    be read to the end before the connection could be reused, so the
+    connection is closed instead and the pool discards it on release
+    """
+    if exhausted or isinstance(cursor, sqlite3.Cursor):
+        cursor.close()
+    else:
+        cursor.connection.close()
+
+
+def fetch_result_sets(cursor, statements):
+    """
+    Run several parameterless, constant SELECTs and return one fetchall()
+    list per statement. SQLite is in-process, so they simply run one after
+    another. MySQL receives them as a single multi-statement round trip, so
+    `cursor` must come from a batch pool connection (db_router.get_batch_read_db)
+    """
+    if isinstance(cursor, sqlite3.Cursor):
+        results = []
+        for statement in statements:
+            cursor.execute(statement)
+            results.append(cursor.fetchall())
+        return results
+
+    try:
+        cursor.execute(";\n".join(statements))
+        results = [cursor.fetchall()]
+        while cursor.nextset():
+            results.append(cursor.fetchall())
+    except Exception:
+        # Never reuse a connection left part-way through a batch; the pool
+        # discards closed connections on release
+        if cursor.connection.open:
+            cursor.connection.close()
+        raise
+    return results
+
+
+def begin_write(conn):
+    """
+    Start a transaction that reads rows and then changes them. SQLite takes
+    its write lock up front (BEGIN IMMEDIATE) so two writers cannot both read
+    the old values; MySQL needs nothing here and locks rows with for_update()
+    """
+    if isinstance(conn, sqlite3.Connection) and not conn.in_transaction:
+        conn.execute('BEGIN IMMEDIATE')
+
+
+def for_update(conn):
+    """Suffix for SELECTs whose rows the transaction is about to change"""
+    if isinstance(conn, sqlite3.Connection):
+        return ''  # begin_write already holds the database write lock
+    return ' FOR UPDATE'
+
+
+def case_insensitive(column):
+    """
+    SQL for `column` when comparing it with a lower-case value regardless of
+    case. MySQL's default _ci collations already compare that way, and the
+    bare column keeps its index usable; SQLite compares exactly, so it gets
+    LOWER()
+    """
+    return f"LOWER({column})" if is_sqlite() else column
+
+
+def upsert_add_sql(table, key_column, columns):
+    """
+    Build an INSERT that creates the `key_column` row, or adds the given
+    values onto its existing `columns` (for counters and running totals)
+    """
+    names = ', '.join((key_column,) + tuple(columns))
+    placeholders = ', '.join(['%s'] * (len(columns) + 1))
+    if is_sqlite():
+        updates = ', '.join(f"{column} = {column} + excluded.{column}" for column in columns)
+        conflict = f"ON CONFLICT ({key_column}) DO UPDATE SET {updates}"
+    else:
+        updates = ', '.join(f"{column} = {column} + VALUES({column})" for column in columns)
+        conflict = f"ON DUPLICATE KEY UPDATE {updates}"
+    return f"INSERT INTO {table} ({names}) VALUES ({placeholders}) {conflict}"
+
+
+def first_insert_id(cursor, row_count):
+    """
+    Return the id given to the first row of the multi-row INSERT ... VALUES
+    just run on cursor. MySQL reports the first id, SQLite the last; each
+    hands one such statement consecutive ids (when auto_increment_step is 1)
+    """
+    if isinstance(cursor, sqlite3.Cursor):
+        return cursor.lastrowid - row_count + 1
+    return cursor.lastrowid
+
+
+def auto_increment_step(cursor):
+    """Return the gap between ids the server assigns (auto_increment_increment; always 1 on SQLite)"""
+    if isinstance(cursor, sqlite3.Cursor):
+        return 1
+    cursor.execute("SELECT @@auto_increment_increment AS step")
+    return int(cursor.fetchone()['step'])
+
+
+def reset_connection(conn):
+    """End any open transaction so the next borrower starts with a fresh snapshot"""
+    conn.rollback()
+
+
+def ping(conn):
+    """Liveness check for pooled connections; raises if the connection is gone"""
+    if isinstance(conn, sqlite3.Connection):
+        conn.execute('SELECT 1')
+    else:
+        conn.ping(reconnect=False)
+
+
+def is_closed(conn):
+    """Check whether a connection has already been closed"""
+    if isinstance(conn, sqlite3.Connection):
+        try:
+            conn.total_changes
+        except sqlite3.ProgrammingError:
+            return True
+        return False
+    return conn._closed
+
+
+def is_disconnect_error(error):
+    """Check whether an exception means the database connection was lost"""
+    if isinstance(error, sqlite3.ProgrammingError):
+        return 'closed' in str(error)
+    if not isinstance(error, (pymysql.err.OperationalError, pymysql.err.InterfaceError)):
+        return False
+    code = error.args[0] if error.args else 0
+    return code in MYSQL_DISCONNECT_ERRORS
+
+
+def is_duplicate_key_error(error):
+    """Check whether an exception is a PRIMARY KEY / UNIQUE constraint violation"""
+    if isinstance(error, sqlite3.IntegrityError):
+        return 'UNIQUE constraint failed' in str(error)
+    if isinstance(error, pymysql.err.IntegrityError):
+        return bool(error.args) and error.args[0] == 1062  # ER_DUP_ENTRY
+    return False
@@ -0,0 +1,166 @@
+"""
+Circuit breaker for database connection attempts
+After repeated connection failures the breaker opens and requests fail fast
+instead of each waiting on a connect timeout; after a backoff one request is
+let through (half-open) to probe whether the server is back
+"""
+
+import os
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Raised when a connection attempt is rejected because the breaker is open"""
+
+
+def _settings():
+    """Read breaker thresholds from DB_BREAKER_* environment variables"""
+    return {
+        'failure_threshold': int(os.getenv('DB_BREAKER_FAILURE_THRESHOLD', 3)),
+        'reset_timeout': float(os.getenv('DB_BREAKER_RESET_TIMEOUT', 5)),
+        'max_reset_timeout': float(os.getenv('DB_BREAKER_MAX_RESET_TIMEOUT', 60)),
+    }
+
+
+def _get_breaker(name):
+    """Return the breaker state dict for one database server"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = dict(_settings(), **{
+                    'name': name,
+                    'state': CLOSED,
+                    'failures': 0,
+                    'opened_at': None,
+                    'backoff': None,
+                    'probe_in_flight': False,
+                    'lock': threading.Lock(),
+                    'stats': {'opened': 0, 'rejected': 0, 'probes': 0},
+                })
+                breaker['backoff'] = breaker['reset_timeout']
+                _breakers[name] = breaker
+    return breaker
+
+
+def _backoff_elapsed(breaker):
+    """Check whether an open breaker has waited long enough to probe"""
+    return time.monotonic() - breaker['opened_at'] >= breaker['backoff']
+
+
+def allow(name):
+    """
+    Decide whether a connection attempt to this server may go ahead
+    While open, only one probe attempt is allowed once the backoff expires
+    """
+    breaker = _get_breaker(name)
+    with breaker['lock']:
+        return _allow(breaker)
+
+
+def _allow(breaker):
+    """allow() for a breaker whose lock is held"""
+    if breaker['state'] == CLOSED:
+        return True
+    if breaker['state'] == OPEN and _backoff_elapsed(breaker):
+        breaker['state'] = HALF_OPEN
+    if breaker['state'] == HALF_OPEN and not breaker['probe_in_flight']:
+        breaker['probe_in_flight'] = True
+        breaker['stats']['probes'] += 1
+        return True
+    breaker['stats']['rejected'] += 1
+    return False
+
+
+def admit(name):
+    """
+    Decide whether a whole request may go on to use this server: always
+    while closed, and otherwise only if it takes the half-open probe (every
+    other request fails fast until the probe reports back)
+    Returns (admitted, holds_probe); a request holding the probe passes it to
+    its first connection attempt, or gives it back with cancel_probe
+    """
+    breaker = _get_breaker(name)
+    with breaker['lock']:
+        if breaker['state'] == CLOSED:
+            return True, False
+        admitted = _allow(breaker)
+        return admitted, admitted
+
+
+def is_open(name):
+    """
+    Check whether this server is refusing connections, without using up the
+    half-open probe (for health reports; requests go through admit)
+    """
+    breaker = _get_breaker(name)
+    with breaker['lock']:
+        if breaker['state'] == CLOSED:
+            return False
+        if breaker['state'] == OPEN:
+            return not _backoff_elapsed(breaker)
+        return breaker['probe_in_flight']
+
+
+def record_success(name):
+    """A connection attempt worked - close the breaker and reset the backoff"""
+    breaker = _get_breaker(name)
+    with breaker['lock']:
+        if breaker['state'] != CLOSED:
+            print(f"Database circuit for {name} closed - connections restored.")
+        breaker['state'] = CLOSED
+        breaker['failures'] = 0
+        breaker['backoff'] = breaker['reset_timeout']
+        breaker['probe_in_flight'] = False
+
+
+def record_failure(name):
+    """
+    A connection attempt failed - open the breaker once failures reach the
+    threshold; a failed half-open probe reopens it with double the backoff
+    """
+    breaker = _get_breaker(name)
+    with breaker['lock']:
+        breaker['failures'] += 1
+        if breaker['state'] == HALF_OPEN:
+            breaker['backoff'] = min(breaker['backoff'] * 2, breaker['max_reset_timeout'])
+        elif breaker['failures'] < breaker['failure_threshold']:
+            return
+        if breaker['state'] != OPEN:
+            breaker['stats']['opened'] += 1
+            print(f"Database circuit for {name} opened - failing fast for {breaker['backoff']}s.")
+        breaker['state'] = OPEN
+        breaker['opened_at'] = time.monotonic()
+        breaker['probe_in_flight'] = False
+
+
+def cancel_probe(name):
+    """Give back a half-open probe whose attempt ended without a verdict"""
+    breaker = _get_breaker(name)
+    with breaker['lock']:
+        breaker['probe_in_flight'] = False
+
+
+def get_breaker_state(name):
+    """Return a snapshot of one breaker's state and counters"""
+    breaker = _get_breaker(name)
+    with breaker['lock']:
+        retry_in = None
+        if breaker['state'] == OPEN:
+            retry_in = max(0.0, breaker['backoff'] - (time.monotonic() - breaker['opened_at']))
+        return dict(breaker['stats'], **{
+            'name': name,
+            'state': breaker['state'],
+            'consecutive_failures': breaker['failures'],
+            'backoff': breaker['backoff'],
+            'retry_in': round(retry_in, 3) if retry_in is not None else None,
+        })
@@ -0,0 +1,140 @@
+"""
+In-process result cache for expensive read-only queries
+Each named entry lives for a short TTL and is dropped early by invalidate()
+when db_service changes the data behind it. Concurrent misses for the same
+name in a worker wait for one computation instead of all querying the
+database. Invalidation is per process; other workers catch up within the TTL.
+
+Caches that must notice other workers' writes sooner keep a version number
+in the cache_versions table: writers bump it in their transaction and
+readers compare it with the version they loaded.
+"""
+
+import threading
+import time
+
+from app.db_backend import upsert_add_sql
+
+_entries = {}
+_entries_lock = threading.Lock()
+
+
+def _get_entry(name):
+    """Return the state dict for one cached name"""
+    entry = _entries.get(name)
+    if entry is None:
+        with _entries_lock:
+            entry = _entries.get(name)
+            if entry is None:
+                entry = {
+                    'value': None,
+                    'expires_at': 0.0,
+                    'computed_at': None,
+                    'generation': 0,
+                    'fresh': False,
+                    # Held while computing so concurrent misses share one result
+                    'lock': threading.Lock(),
+                    'stats': {
+                        'hits': 0,
+                        'misses': 0,
+                        'expired': 0,
+                        'invalidated': 0,
+                        'coalesced': 0,
+                        'computations': 0,
+                        'compute_time_total': 0.0,
+                        'max_age_served': 0.0,
+                    },
+                }
+                _entries[name] = entry
+    return entry
+
+
+def _serve(entry, now):
+    """Count a hit and return the cached value"""
+    stats = entry['stats']
+    stats['hits'] += 1
+    stats['max_age_served'] = max(stats['max_age_served'], now - entry['computed_at'])
+    return entry['value']
+
+
+def get_or_compute(name, compute, ttl):
+    """
+    Return the cached value for `name`, calling compute() on a miss
+    Falsy results (e.g. {} when the database is unavailable) are returned
+    but not cached. Callers share the cached object and must not modify it
+    """
+    entry = _get_entry(name)
+    now = time.monotonic()
+    if entry['fresh'] and entry['expires_at'] > now:
+        return _serve(entry, now)
+
+    with entry['lock']:
+        # Another request may have refreshed it while this one waited
+        now = time.monotonic()
+        if entry['fresh'] and entry['expires_at'] > now:
+            entry['stats']['coalesced'] += 1
+            return _serve(entry, now)
+
+        stats = entry['stats']
+        stats['misses'] += 1
+        if entry['fresh']:
+            stats['expired'] += 1
+
+        generation = entry['generation']
+        started = time.monotonic()
+        value = compute()
+        finished = time.monotonic()
+        stats['computations'] += 1
+        stats['compute_time_total'] += finished - started
+
+        # Skip storing a result that an invalidation made out of date mid-compute
+        if value and entry['generation'] == generation:
+            entry['value'] = value
+            entry['computed_at'] = finished
+            entry['expires_at'] = finished + ttl
+            entry['fresh'] = True
+        return value
+
+
+def invalidate(*names):
+    """Drop cached values after the data behind them changed"""
+    for name in names:
+        entry = _get_entry(name)
+        entry['generation'] += 1
+        if entry['fresh']:
+            entry['stats']['invalidated'] += 1
+        entry['fresh'] = False
+
+
+def get_cache_stats():
+    """
+    Return hit/miss/staleness counters for every cached name (hits are
+    counted without a lock, so they are approximate under heavy concurrency)
+    """
+    now = time.monotonic()
+    stats = {}
+    for name, entry in list(_entries.items()):
+        counters = dict(entry['stats'])
+        lookups = counters['hits'] + counters['misses']
+        counters['hit_rate'] = round(counters['hits'] / lookups, 3) if lookups else None
+        counters['age'] = round(now - entry['computed_at'], 3) if entry['fresh'] else None
+        counters['avg_compute_ms'] = (
+            round(counters['compute_time_total'] / counters['computations'] * 1000, 2)
+            if counters['computations'] else 0.0
+        )
+        stats[name] = counters
+    return stats
+
+
+# ==================== SHARED VERSION COUNTERS ====================
+
+def read_version(cursor, name):
+    """Return the cache_versions number for `name` (0 if never bumped); needs a tuple cursor"""
+    cursor.execute("SELECT version FROM cache_versions WHERE name = %s", (name,))
+    row = cursor.fetchone()
+    return row[0] if row else 0
+
+
+def bump_version(cursor, name):
+    """Advance the cache_versions number for `name` inside the caller's transaction"""
+    cursor.execute(upsert_add_sql('cache_versions', 'name', ('version',)), (name, 1))
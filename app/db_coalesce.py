@@ -0,0 +1,105 @@
+"""
+Single-flight coalescing for db_service reads
+When several request threads in a worker call the same read function with the
+same arguments at the same moment, only the first runs the query; the others
+wait for it and share its result. Callers are never joined to a query that
+might miss a write they should see: sessions inside their read-your-writes
+window always query themselves, and a query started before this worker's
+latest write does not accept new waiters.
+"""
+
+import copy
+import functools
+import threading
+
+from app.db_router import get_write_epoch, is_sticky
+
+_flights = {}
+_flights_lock = threading.Lock()
+_stats = {}
+
+
+def _count(name, key):
+    """Bump one counter for a coalesced function (call with _flights_lock held)"""
+    counters = _stats.setdefault(name, {
+        'calls': 0,
+        'executed': 0,
+        'coalesced': 0,
+        'bypassed': 0,
+        'errors': 0,
+    })
+    counters[key] += 1
+
+
+def coalesce(func):
+    """
+    Decorator: share one in-flight call among concurrent identical calls
+    Waiters receive a shallow copy of the result, so adding to or removing
+    from a returned list does not affect other requests
+    """
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            key = (name, args, tuple(sorted(kwargs.items())))
+            hash(key)
+        except TypeError:
+            key = None
+
+        if key is None or is_sticky():
+            with _flights_lock:
+                _count(name, 'calls')
+                _count(name, 'bypassed')
+            return func(*args, **kwargs)
+
+        epoch = get_write_epoch()
+        with _flights_lock:
+            _count(name, 'calls')
+            flight = _flights.get(key)
+            if flight is not None and flight['epoch'] == epoch:
+                _count(name, 'coalesced')
+                leader = False
+            else:
+                flight = {'epoch': epoch, 'done': threading.Event(), 'result': None, 'error': None}
+                _flights[key] = flight
+                _count(name, 'executed')
+                leader = True
+
+        if not leader:
+            flight['done'].wait()
+            if flight['error'] is not None:
+                raise flight['error']
+            return copy.copy(flight['result'])
+
+        try:
+            flight['result'] = func(*args, **kwargs)
+            return flight['result']
+        except Exception as e:
+            flight['error'] = e
+            with _flights_lock:
+                _count(name, 'errors')
+            raise
+        finally:
+            with _flights_lock:
+                # A newer flight may have replaced this one after a write
+                if _flights.get(key) is flight:
+                    del _flights[key]
+            flight['done'].set()
+
+    return wrapper
+
+
+def get_coalesce_stats():
+    """Return per-function counters: calls, executed, coalesced, bypassed, errors"""
+    with _flights_lock:
+        stats = {name: dict(counters) for name, counters in _stats.items()}
+        in_flight = len(_flights)
+    total_calls = sum(counters['calls'] for counters in stats.values())
+    total_coalesced = sum(counters['coalesced'] for counters in stats.values())
+    return {
+        'functions': stats,
+        'in_flight': in_flight,
+        'coalesced_total': total_coalesced,
+        'coalesced_ratio': round(total_coalesced / total_calls, 3) if total_calls else None,
+    }
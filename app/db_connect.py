@@ -1,38 +1,223 @@
-import pymysql
-import pymysql.cursors
 from flask import g
+import functools
 import os
+import threading
 from dotenv import load_dotenv
 
+from app import db_breaker, db_pool
+from app.db_backend import connect, is_closed, is_disconnect_error, ping, reset_connection
+
 load_dotenv()
 
+# One pool per worker process, created on first use
+PRIMARY_POOL_NAME = 'primary'
+_pool = None
+_pool_lock = threading.Lock()
+
+_retry_stats = {'disconnect_retries': 0}
+
+# How many requests actually needed a database connection
+_request_stats = {
+    'requests': 0,
+    'requests_with_db': 0,
+    'requests_without_db': 0,
+}
+_request_stats_lock = threading.Lock()
+
+def create_connection_pool(name, host=None, port=None, multi_statements=False,
+                           breaker=None, **settings):
+    """
+    Create and pre-fill a pool of connections to one database server
+    Checkouts go through the circuit breaker named `breaker` (default: the
+    pool's own name); `settings` override the DB_POOL_* values
+    """
+    pool = db_pool.create_pool(
+        lambda: connect(host, port, multi_statements=multi_statements),
+        reset=reset_connection,
+        validate=ping,
+        name=name,
+        **dict(db_pool.pool_settings_from_env(), **settings)
+    )
+    pool['breaker'] = breaker or name
+    pool['server'] = (host, port)
+    db_pool.fill_pool(pool)
+    return pool
+
+def get_pool():
+    """Return this process's primary connection pool, creating it on first use"""
+    global _pool
+    # A pool inherited across fork() holds the parent's sockets - start over
+    if _pool is None or _pool['pid'] != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool['pid'] != os.getpid():
+                _pool = create_connection_pool(PRIMARY_POOL_NAME)
+    return _pool
+
+def get_batch_pool(server_pool):
+    """
+    Return the multi-statement companion of server_pool, creating it on first
+    use. It connects to the same server and shares its circuit breaker, but
+    is kept small and empty until fetch_result_sets needs it
+    """
+    if 'batch_pool' not in server_pool:
+        with _pool_lock:
+            if 'batch_pool' not in server_pool:
+                host, port = server_pool['server']
+                server_pool['batch_pool'] = create_connection_pool(
+                    f"{server_pool['name']}:batch", host, port,
+                    multi_statements=True, breaker=server_pool['breaker'],
+                    min_size=0, max_size=int(os.getenv('DB_BATCH_POOL_SIZE', 2)),
+                )
+    return server_pool['batch_pool']
+
+def get_pool_stats():
+    """Return usage counters for this process's connection pools"""
+    pool = get_pool()
+    stats = db_pool.get_pool_stats(pool)
+    stats.update(_retry_stats)
+    stats['batch'] = db_pool.get_pool_stats(pool['batch_pool']) if 'batch_pool' in pool else None
+    return stats
+
+def get_request_stats():
+    """Return how many requests did and did not check out a connection"""
+    with _request_stats_lock:
+        return dict(_request_stats)
+
+def checkout(pool):
+    """
+    Return the request's connection from pool, borrowing one on first use;
+    it goes back to the pool when the request ends
+    Raises CircuitOpenError without touching the network while the server's
+    circuit breaker is open, or the pool/driver error if borrowing fails
+    """
+    connections = g.setdefault('_connections', {})
+    if pool['name'] not in connections:
+        g.db_used = True
+        connections[pool['name']] = (pool, _acquire_guarded(pool))
+    return connections[pool['name']][1]
+
+def _acquire_guarded(pool):
+    """
+    Borrow from pool through its server's circuit breaker; a request that
+    admit_request() let through as the half-open probe uses its probe here
+    """
+    name = pool['breaker']
+    if g.get('_db_probe') == name:
+        g._db_probe = None
+    elif not db_breaker.allow(name):
+        raise db_breaker.CircuitOpenError(f"Database circuit for {name} is open")
+    try:
+        conn = db_pool.acquire(pool)
+    except db_pool.PoolTimeoutError:
+        # An exhausted pool says nothing about the server's health
+        db_breaker.cancel_probe(name)
+        raise
+    except Exception:
+        db_breaker.record_failure(name)
+        raise
+    db_breaker.record_success(name)
+    return conn
+
+def is_database_available():
+    """
+    Cheap check whether the primary is accepting connections: reads only its
+    circuit breaker, so it neither creates the pool nor touches the network
+    """
+    return not db_breaker.is_open(PRIMARY_POOL_NAME)
+
+def admit_request():
+    """
+    Check whether the current request may use the primary (before_request's
+    fast-fail): not while its circuit breaker is open, and once the backoff
+    ends only the single request handed the half-open probe
+    """
+    admitted, probe = db_breaker.admit(PRIMARY_POOL_NAME)
+    g._db_probe = PRIMARY_POOL_NAME if probe else None
+    return admitted
+
+def get_database_health():
+    """
+    Return the primary's breaker state and pool occupancy without querying
+    it ('pool' is None until a request in this worker has needed the pool)
+    """
+    pool = _pool if _pool is not None and _pool['pid'] == os.getpid() else None
+    stats = db_pool.get_pool_stats(pool) if pool else None
+    return {
+        'breaker': db_breaker.get_breaker_state(PRIMARY_POOL_NAME),
+        'pool': {key: stats[key] for key in ('size', 'idle', 'in_use', 'max_size')} if stats else None,
+    }
+
 def get_db():
-    if 'db' not in g or not is_connection_open(g.db):
-        print("Re-establishing closed database connection.")
-        try:
-            g.db = pymysql.connect(
-                # Database configuration from environment variables
-                host=os.getenv('DB_HOST'),
-                user=os.getenv('DB_USER'),
-                password=os.getenv('DB_PASSWORD'),
-                database=os.getenv('DB_NAME'),
-                cursorclass=pymysql.cursors.DictCursor  # Set the default cursor class to DictCursor
-            )
-        except Exception as e:
-            print(f"Database connection failed: {e}")
-            g.db = None
-            return None
-    return g.db
+    """
+    Return the request's primary database connection, borrowing one from the
+    pool on first use. Pooled connections are only pinged after sitting idle,
+    so repeated calls within a request cost no round-trips
+    """
+    return checkout_or_none(get_pool())
+
+def get_batch_db():
+    """
+    Return the request's multi-statement connection to the primary, for
+    fetch_result_sets only (see get_batch_pool)
+    """
+    return checkout_or_none(get_batch_pool(get_pool()))
 
-def is_connection_open(conn):
+def checkout_or_none(pool):
+    """checkout(pool), reporting failure as None like the other db helpers"""
     try:
-        conn.ping(reconnect=True)  # PyMySQL's way to check connection health
-        return True
-    except:
-        return False
+        return checkout(pool)
+    except db_breaker.CircuitOpenError:
+        return None
+    except Exception as e:
+        print(f"Database connection failed: {e}")
+        return None
+
+def start_request_db_usage():
+    """Mark the request as not having used the database yet (checkout() sets it)"""
+    g.db_used = False
+
+def record_request_db_usage(exception=None):
+    """Count whether the finished request checked out a connection"""
+    used = g.get('db_used', False)
+    with _request_stats_lock:
+        _request_stats['requests'] += 1
+        if used:
+            _request_stats['requests_with_db'] += 1
+        else:
+            _request_stats['requests_without_db'] += 1
+
+def discard_db():
+    """Throw away the request's connections (e.g. after the server dropped one)"""
+    for pool, db in g.pop('_connections', {}).values():
+        db_pool.release(pool, db, discard=True)
+
+def retry_on_disconnect(func):
+    """
+    Retry an idempotent read once on a fresh connection when the current one
+    turns out to be dead. Only use this on functions that do not write
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if not is_disconnect_error(e):
+                raise
+            print(f"Database connection lost during {func.__name__}, retrying: {e}")
+            _retry_stats['disconnect_retries'] += 1
+            discard_db()
+            return func(*args, **kwargs)
+    return wrapper
 
 def close_db(exception=None):
-    db = g.pop('db', None)
-    if db is not None and not db._closed:
-        print("Closing database connection.")
-        db.close()
\ No newline at end of file
+    """
+    Return the request's connections to their pools, and give back a
+    half-open probe the request never used
+    """
+    probe = g.pop('_db_probe', None)
+    if probe:
+        db_breaker.cancel_probe(probe)
+    for pool, db in g.pop('_connections', {}).values():
+        # After an error, make the next borrower ping before trusting it
+        db_pool.release(pool, db, discard=is_closed(db),
+                        needs_check=exception is not None)
@@ -0,0 +1,147 @@
+"""
+Per-worker index of the pizza menu
+The pizzas table is small and changes a few times a week, yet order entry
+and the pizza lookups read it constantly. Each worker loads the whole table
+once into an index (by id, by category, by name and size) and answers menu
+reads from memory.
+
+Every menu write bumps the 'menu' row of the cache_versions table in the same
+transaction. A worker compares that number with the one it loaded at most
+every MENU_VERSION_CHECK_SECONDS (and on every read while the session is in
+its read-your-writes window), and reloads when another worker changed the
+menu. Writes made by this worker drop the index immediately.
+"""
+
+import os
+import threading
+import time
+from itertools import groupby
+
+from app.db_backend import tuple_cursor
+from app.db_cache import read_version
+from app.db_router import get_read_db, is_sticky
+from app.models import Pizza
+
+MENU_VERSION_NAME = 'menu'
+
+_menu = {
+    'index': None,
+    'version': None,
+    'checked_at': 0.0,
+    # Bumped by invalidate_menu() so a load that overlapped a write is not kept
+    'generation': 0,
+    'fresh': False,
+}
+_menu_lock = threading.Lock()
+
+_menu_stats = {
+    'hits': 0,
+    'version_checks': 0,
+    'loads': 0,
+    'invalidations': 0,
+}
+
+
+def _version_check_seconds():
+    """How long a worker trusts its index before re-reading the menu version"""
+    return float(os.getenv('MENU_VERSION_CHECK_SECONDS', 2))
+
+
+def _build_index(rows):
+    """
+    Build the menu index from (pizza columns..., archived) rows sorted by
+    category, name, size and id
+    """
+    by_id = {}
+    active = []
+    archived = []
+    for row in rows:
+        pizza = Pizza(*row[:-1])
+        by_id[pizza.pizza_id] = pizza
+        (archived if row[-1] else active).append(pizza)
+
+    return {
+        'by_id': by_id,
+        'active': active,
+        'available': [pizza for pizza in active if pizza.available],
+        'archived': archived,
+        'by_category': {category: list(pizzas) for category, pizzas in
+                        groupby(active, key=lambda pizza: pizza.category)},
+        'by_name_size': {(pizza.name, pizza.size): pizza for pizza in active},
+    }
+
+
+def _load(db, known_version):
+    """
+    Read the menu version and, if it differs from `known_version`, the whole
+    menu. Returns (version, index or None when unchanged)
+    """
+    cursor = tuple_cursor(db)
+    try:
+        version = read_version(cursor, MENU_VERSION_NAME)
+        _menu_stats['version_checks'] += 1
+        if version == known_version:
+            return version, None
+        cursor.execute("""
+            SELECT pizza_id, name, description, size, base_price, category, available, created_at,
+                   version, archived
+            FROM pizzas ORDER BY category, name, size, pizza_id
+        """)
+        rows = cursor.fetchall()
+    finally:
+        cursor.close()
+    _menu_stats['loads'] += 1
+    return version, _build_index(rows)
+
+
+def get_menu_index():
+    """
+    Return the current menu index, loading or refreshing it when needed
+    The index and the Pizza objects in it are shared by every request in the
+    worker; callers must not modify them. Returns None if the menu cannot be
+    read and no earlier copy is available
+    """
+    index = _menu['index']
+    if (_menu['fresh'] and time.monotonic() - _menu['checked_at'] < _version_check_seconds()
+            and not is_sticky()):
+        _menu_stats['hits'] += 1
+        return index
+
+    with _menu_lock:
+        # Another request may have refreshed it while this one waited
+        index = _menu['index']
+        if (_menu['fresh'] and time.monotonic() - _menu['checked_at'] < _version_check_seconds()
+                and not is_sticky()):
+            _menu_stats['hits'] += 1
+            return index
+
+        db = get_read_db()
+        if not db:
+            return index
+
+        generation = _menu['generation']
+        # After a local write the version is re-read but the menu is always reloaded
+        known_version = _menu['version'] if _menu['fresh'] else None
+        version, loaded = _load(db, known_version)
+        if loaded is not None:
+            index = loaded
+        if _menu['generation'] == generation:
+            _menu.update(index=index, version=version, checked_at=time.monotonic(), fresh=True)
+        return index
+
+
+def invalidate_menu():
+    """Drop this worker's index after it changed the menu"""
+    _menu['generation'] += 1
+    if _menu['fresh']:
+        _menu_stats['invalidations'] += 1
+    _menu['fresh'] = False
+
+
+def get_menu_stats():
+    """Return menu index counters plus the loaded version and its age"""
+    stats = dict(_menu_stats)
+    stats['version'] = _menu['version']
+    stats['pizzas'] = len(_menu['index']['by_id']) if _menu['index'] else 0
+    stats['checked_ago'] = round(time.monotonic() - _menu['checked_at'], 3) if _menu['fresh'] else None
+    return stats
@@ -0,0 +1,181 @@
+"""
+Keyset pagination for the listing pages
+Pages seek past the sort key of the last row shown ("WHERE (a, b) > (x, y)")
+instead of using OFFSET, so every page costs the same index range scan no
+matter how deep the employee has paged. Page positions travel as opaque
+URL-safe cursor tokens; total counts are cached for COUNT_CACHE_SECONDS
+rather than recomputed for every page.
+"""
+
+import base64
+import binascii
+import json
+import os
+import threading
+import time
+from datetime import date, datetime
+
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+NEXT = 'next'
+PREV = 'prev'
+
+_count_cache = {}
+_count_cache_lock = threading.Lock()
+
+
+def clamp_page_size(value):
+    """Parse a requested page size, falling back to the default and capping at MAX_PAGE_SIZE"""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+# ==================== CURSOR TOKENS ====================
+
+def _dump_value(value):
+    """Make a sort key value JSON-safe (dates are tagged so they round-trip)"""
+    if isinstance(value, datetime):
+        return {'dt': value.isoformat(' ')}
+    if isinstance(value, date):
+        return {'d': value.isoformat()}
+    return value
+
+
+def _load_value(value):
+    """Reverse _dump_value"""
+    if isinstance(value, dict):
+        if 'dt' in value:
+            return datetime.fromisoformat(value['dt'])
+        if 'd' in value:
+            return date.fromisoformat(value['d'])
+    return value
+
+
+def encode_cursor(direction, key):
+    """Build the opaque token for paging in `direction` from a row's sort key"""
+    payload = json.dumps([direction, [_dump_value(value) for value in key]], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, key_length):
+    """
+    Turn a token back into (direction, key)
+    Returns None for a missing, malformed or foreign token so the caller
+    simply shows the first page
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        direction, key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if direction not in (NEXT, PREV) or len(key) != key_length:
+            return None
+        return direction, tuple(_load_value(value) for value in key)
+    except (ValueError, TypeError, binascii.Error):
+        return None
+
+
+# ==================== PAGE QUERIES ====================
+
+def fetch_page(cursor, select_sql, sort_columns, key_indexes, where=None, params=(),
+               token=None, page_size=DEFAULT_PAGE_SIZE, descending=False):
+    """
+    Run one keyset page of `select_sql` on an open cursor
+    - sort_columns: the ORDER BY columns, ending with a unique column (the id)
+    - key_indexes: positions of those columns in each selected row
+    - where/params: the listing's own filter, if any
+    Returns (rows, next_token, prev_token); a token is None when there is no
+    page in that direction
+    """
+    position = decode_cursor(token, len(sort_columns))
+    direction, key = position if position else (NEXT, None)
+
+    # Walking backwards flips both the comparison and the sort, then the
+    # fetched rows are reversed back into display order
+    backwards = direction == PREV
+    seek_descending = descending != backwards
+    comparison = '<' if seek_descending else '>'
+    order = ' DESC' if seek_descending else ''
+
+    conditions = [where] if where else []
+    params = list(params)
+    if key is not None:
+        conditions.append(
+            f"({', '.join(sort_columns)}) {comparison} ({', '.join(['%s'] * len(key))})"
+        )
+        params.extend(key)
+
+    sql = select_sql
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY " + ", ".join(column + order for column in sort_columns)
+    sql += " LIMIT %s"
+    params.append(page_size + 1)  # One extra row tells us whether another page exists
+
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    has_more = len(rows) > page_size
+    rows = list(rows[:page_size])
+    if backwards:
+        rows.reverse()
+
+    if not rows:
+        return rows, None, None
+
+    def key_of(row):
+        return [row[index] for index in key_indexes]
+
+    if backwards:
+        next_token = encode_cursor(NEXT, key_of(rows[-1]))
+        prev_token = encode_cursor(PREV, key_of(rows[0])) if has_more else None
+    else:
+        next_token = encode_cursor(NEXT, key_of(rows[-1])) if has_more else None
+        prev_token = encode_cursor(PREV, key_of(rows[0])) if key is not None else None
+    return rows, next_token, prev_token
+
+
+# ==================== TOTAL COUNTS ====================
+
+def _count_ttl():
+    """Seconds a cached total stays valid"""
+    return float(os.getenv('COUNT_CACHE_SECONDS', 30))
+
+
+def cached_count(name, cursor, sql, params=()):
+    """
+    Return a total row count, re-running the COUNT(*) at most once per
+    COUNT_CACHE_SECONDS per process (writes in this process invalidate it)
+    """
+    now = time.monotonic()
+    with _count_cache_lock:
+        entry = _count_cache.get(name)
+        if entry and entry[1] > now:
+            return entry[0]
+
+    cursor.execute(sql, params)
+    total = cursor.fetchone()[0]
+    with _count_cache_lock:
+        _count_cache[name] = (total, now + _count_ttl())
+    return total
+
+
+def invalidate_counts(table):
+    """Drop cached totals for a table after this process changes its rows"""
+    with _count_cache_lock:
+        for name in [name for name in _count_cache if name.split(':')[0] == table]:
+            del _count_cache[name]
+
+
+def build_page(items, next_token, prev_token, page_size, total):
+    """Bundle one page of results for the blueprints and templates"""
+    return {
+        'items': items,
+        'next_cursor': next_token,
+        'prev_cursor': prev_token,
+        'page_size': page_size,
+        'total': total,
+    }
@@ -0,0 +1,330 @@
+"""
+Connection pool for the Pizza Management System
+Keeps a bounded set of open database connections per worker process so that
+requests borrow an existing connection instead of reconnecting every time
+"""
+
+import os
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out before the timeout"""
+
+
+def _env_number(name, default, cast=int):
+    """Read a numeric setting from the environment, falling back to default"""
+    value = os.getenv(name)
+    if value in (None, ''):
+        return default
+    return cast(value)
+
+
+def pool_settings_from_env():
+    """Build pool settings from DB_POOL_* environment variables"""
+    return {
+        'min_size': _env_number('DB_POOL_MIN_SIZE', 1),
+        'max_size': _env_number('DB_POOL_MAX_SIZE', 10),
+        'idle_timeout': _env_number('DB_POOL_IDLE_TIMEOUT', 300.0, float),
+        'max_lifetime': _env_number('DB_POOL_MAX_LIFETIME', 3600.0, float),
+        'checkout_timeout': _env_number('DB_POOL_CHECKOUT_TIMEOUT', 5.0, float),
+        'validate_idle': _env_number('DB_POOL_VALIDATE_IDLE', 30.0, float),
+    }
+
+
+def create_pool(connect, reset=None, validate=None, name='primary', min_size=1,
+                max_size=10, idle_timeout=300.0, max_lifetime=3600.0,
+                checkout_timeout=5.0, validate_idle=30.0):
+    """
+    Create a new connection pool
+    connect: callable returning a new open connection
+    reset: optional callable run on every returned connection (e.g. rollback);
+           if it raises, the connection is discarded instead of reused
+    validate: optional liveness check (e.g. ping) run at checkout, but only on
+              connections idle longer than validate_idle seconds or returned
+              after an error; if it raises, the connection is replaced
+    Returns the pool state dict used by the other functions in this module
+    """
+    if max_size < 1:
+        raise ValueError("Pool max_size must be at least 1")
+    min_size = max(0, min(min_size, max_size))
+
+    return {
+        'name': name,
+        'pid': os.getpid(),
+        'connect': connect,
+        'reset': reset,
+        'validate': validate,
+        'validate_idle': validate_idle,
+        'min_size': min_size,
+        'max_size': max_size,
+        'idle_timeout': idle_timeout,
+        'max_lifetime': max_lifetime,
+        'checkout_timeout': checkout_timeout,
+        'lock': threading.Condition(),
+        # Idle connections as (conn, created_at, last_used, needs_check);
+        # newest on the right
+        'idle': deque(),
+        # id(conn) -> created_at for connections currently checked out
+        'in_use': {},
+        # Open connections plus connections currently being opened
+        'size': 0,
+        'stats': {
+            'connections_created': 0,
+            'connections_closed': 0,
+            'connect_failures': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time_total': 0.0,
+            'timeouts': 0,
+            'peak_in_use': 0,
+            'pings_performed': 0,
+            'pings_avoided': 0,
+            'ping_failures': 0,
+        },
+    }
+
+
+def _close_quietly(pool, conn):
+    """Close a connection, ignoring errors, and count it as closed"""
+    try:
+        conn.close()
+    except Exception:
+        pass
+    with pool['lock']:
+        pool['stats']['connections_closed'] += 1
+
+
+def _is_expired(pool, created_at, last_used, now):
+    """Check whether an idle connection is past its lifetime or idle timeout"""
+    if pool['max_lifetime'] and now - created_at > pool['max_lifetime']:
+        return True
+    if pool['idle_timeout'] and now - last_used > pool['idle_timeout']:
+        return True
+    return False
+
+
+def _prune_idle(pool, now):
+    """
+    Remove expired idle connections (caller holds the pool lock)
+    Idle-timeout pruning never drops the pool below min_size, but connections
+    past max_lifetime are always recycled
+    Returns the list of connections to close outside the lock
+    """
+    to_close = []
+    kept = deque()
+    while pool['idle']:
+        entry = pool['idle'].popleft()
+        conn, created_at, last_used, _ = entry
+        too_old = pool['max_lifetime'] and now - created_at > pool['max_lifetime']
+        above_min = pool['size'] - len(to_close) > pool['min_size']
+        if too_old or (above_min and _is_expired(pool, created_at, last_used, now)):
+            to_close.append(conn)
+        else:
+            kept.append(entry)
+    pool['idle'] = kept
+    pool['size'] -= len(to_close)
+    return to_close
+
+
+def _open_connection(pool):
+    """Open a new connection for a slot already reserved in pool['size']"""
+    try:
+        conn = pool['connect']()
+    except Exception:
+        with pool['lock']:
+            pool['size'] -= 1
+            pool['stats']['connect_failures'] += 1
+            pool['lock'].notify()
+        raise
+    return conn, time.monotonic()
+
+
+def _take_slot(pool):
+    """
+    Take an idle connection or reserve room for a new one, waiting up to
+    checkout_timeout seconds while the pool is exhausted
+    Returns the idle entry, or None when the caller should open a connection
+    """
+    deadline = None
+    waited_since = None
+    to_close = []
+    lock = pool['lock']
+
+    try:
+        with lock:
+            while True:
+                pruned = _prune_idle(pool, time.monotonic())
+                if pruned:
+                    to_close.extend(pruned)
+                    lock.notify(len(pruned))
+                if pool['idle']:
+                    entry = pool['idle'].pop()
+                    break
+                if pool['size'] < pool['max_size']:
+                    pool['size'] += 1
+                    entry = None
+                    break
+
+                if deadline is None:
+                    waited_since = time.monotonic()
+                    deadline = waited_since + pool['checkout_timeout']
+                    pool['stats']['waits'] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    pool['stats']['timeouts'] += 1
+                    pool['stats']['wait_time_total'] += time.monotonic() - waited_since
+                    raise PoolTimeoutError(
+                        f"No connection available in pool '{pool['name']}' "
+                        f"after {pool['checkout_timeout']}s (max_size={pool['max_size']})"
+                    )
+                lock.wait(remaining)
+
+            if waited_since is not None:
+                pool['stats']['wait_time_total'] += time.monotonic() - waited_since
+    finally:
+        for stale in to_close:
+            _close_quietly(pool, stale)
+    return entry
+
+
+def _is_alive(pool, conn, last_used, needs_check):
+    """
+    Run the liveness check only when the connection has been idle longer than
+    validate_idle or was returned after an error; recently used connections
+    are trusted without a round-trip
+    """
+    if pool['validate'] is None:
+        return True
+    idle_for = time.monotonic() - last_used
+    if not needs_check and idle_for <= pool['validate_idle']:
+        with pool['lock']:
+            pool['stats']['pings_avoided'] += 1
+        return True
+
+    try:
+        pool['validate'](conn)
+        alive = True
+    except Exception:
+        alive = False
+    with pool['lock']:
+        pool['stats']['pings_performed'] += 1
+        if not alive:
+            pool['stats']['ping_failures'] += 1
+            pool['size'] -= 1
+            pool['lock'].notify()
+    if not alive:
+        _close_quietly(pool, conn)
+    return alive
+
+
+def acquire(pool):
+    """
+    Check a connection out of the pool
+    Reuses the most recently returned idle connection when one is available,
+    opens a new one while the pool is below max_size, and otherwise waits up
+    to checkout_timeout seconds for another request to return one
+    Raises PoolTimeoutError when the wait times out
+    """
+    while True:
+        entry = _take_slot(pool)
+        if entry is None:
+            conn, created_at = _open_connection(pool)
+            with pool['lock']:
+                pool['stats']['connections_created'] += 1
+            break
+        conn, created_at, last_used, needs_check = entry
+        if _is_alive(pool, conn, last_used, needs_check):
+            break
+
+    with pool['lock']:
+        pool['in_use'][id(conn)] = created_at
+        pool['stats']['checkouts'] += 1
+        pool['stats']['peak_in_use'] = max(pool['stats']['peak_in_use'], len(pool['in_use']))
+    return conn
+
+
+def release(pool, conn, discard=False, needs_check=False):
+    """
+    Return a checked-out connection to the pool
+    The connection is reset first; it is closed instead of reused when
+    discard is True, the reset fails, or it has outlived max_lifetime
+    needs_check forces a liveness check before the connection is reused
+    (e.g. after the request that held it raised an error)
+    """
+    lock = pool['lock']
+    with lock:
+        created_at = pool['in_use'].pop(id(conn), None)
+    if created_at is None:
+        # Already returned (or never checked out of this pool) - nothing to do
+        return
+
+    now = time.monotonic()
+    if not discard and pool['reset'] is not None:
+        try:
+            pool['reset'](conn)
+        except Exception:
+            discard = True
+    if not discard and pool['max_lifetime'] and now - created_at > pool['max_lifetime']:
+        discard = True
+
+    with lock:
+        if discard:
+            pool['size'] -= 1
+        else:
+            pool['idle'].append((conn, created_at, now, needs_check))
+        lock.notify()
+
+    if discard:
+        _close_quietly(pool, conn)
+
+
+def fill_pool(pool):
+    """Open connections until the pool holds at least min_size (best effort)"""
+    while True:
+        with pool['lock']:
+            if pool['size'] >= pool['min_size']:
+                return
+            pool['size'] += 1
+        try:
+            conn, created_at = _open_connection(pool)
+        except Exception as e:
+            print(f"Could not pre-open pooled connection: {e}")
+            return
+        with pool['lock']:
+            pool['stats']['connections_created'] += 1
+            pool['idle'].appendleft((conn, created_at, time.monotonic(), False))
+            pool['lock'].notify()
+
+
+def close_pool(pool):
+    """Close every idle connection; checked-out connections close on return"""
+    with pool['lock']:
+        idle = list(pool['idle'])
+        pool['idle'].clear()
+        pool['size'] -= len(idle)
+    for conn, _, _, _ in idle:
+        _close_quietly(pool, conn)
+
+
+def get_pool_stats(pool):
+    """Return a snapshot of pool sizing and usage counters"""
+    with pool['lock']:
+        stats = dict(pool['stats'])
+        stats.update({
+            'name': pool['name'],
+            'size': pool['size'],
+            'idle': len(pool['idle']),
+            'in_use': len(pool['in_use']),
+            'min_size': pool['min_size'],
+            'max_size': pool['max_size'],
+            'idle_timeout': pool['idle_timeout'],
+            'max_lifetime': pool['max_lifetime'],
+            'checkout_timeout': pool['checkout_timeout'],
+            'validate_idle': pool['validate_idle'],
+        })
+    checkouts = stats['checkouts']
+    stats['avg_wait_ms'] = round(stats['wait_time_total'] * 1000 / checkouts, 3) if checkouts else 0.0
+    return stats
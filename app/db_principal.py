@@ -0,0 +1,169 @@
+"""
+Per-worker cache of signed-in employees
+Flask-Login loads the current employee on every authenticated request. Each
+worker keeps the employees it has recently served in a small LRU (at most
+PRINCIPAL_CACHE_SIZE entries, each trusted for PRINCIPAL_CACHE_TTL seconds),
+so a steady stream of AJAX calls from the same tablets runs no login query.
+Cached principals never carry the password hash.
+
+Every employee write bumps the 'employees' row of the cache_versions table in
+the same transaction. A worker compares that number with the one its cache
+was filled under at most every PRINCIPAL_VERSION_CHECK_SECONDS (and on every
+request while the session is in its read-your-writes window), and drops the
+whole cache when another worker changed an employee. Writes made by this
+worker drop the affected entry immediately.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from app.db_backend import tuple_cursor
+from app.db_cache import read_version
+from app.db_router import get_read_db, is_sticky
+from app.models import EmployeePrincipal
+
+PRINCIPAL_VERSION_NAME = 'employees'
+
+# employee_id -> (principal, loaded_at), least recently used first
+_principals = OrderedDict()
+_principal_state = {
+    'version': None,
+    'checked_at': 0.0,
+    # Bumped by invalidate_principal() so a load that overlapped a write is not kept
+    'generation': 0,
+}
+_principal_lock = threading.Lock()
+
+_principal_stats = {
+    'hits': 0,
+    'misses': 0,
+    'expired': 0,
+    'evictions': 0,
+    'version_checks': 0,
+    'flushes': 0,
+    'invalidations': 0,
+}
+
+
+def _cache_size():
+    """Most principals a worker keeps"""
+    return int(os.getenv('PRINCIPAL_CACHE_SIZE', 256))
+
+
+def _ttl():
+    """How long a cached principal is used before it is read again"""
+    return float(os.getenv('PRINCIPAL_CACHE_TTL', 60))
+
+
+def _version_check_seconds():
+    """How long a worker trusts its cache before re-reading the employees version"""
+    return float(os.getenv('PRINCIPAL_VERSION_CHECK_SECONDS', 2))
+
+
+def _apply_version(version):
+    """Flush the cache if the shared employees version moved (hold _principal_lock)"""
+    _principal_stats['version_checks'] += 1
+    if version != _principal_state['version']:
+        if _principals:
+            _principal_stats['flushes'] += 1
+        _principals.clear()
+        _principal_state['version'] = version
+        # A load that started before the flush must not be cached after it
+        _principal_state['generation'] += 1
+
+
+def _cached(employee_id, now):
+    """Return a fresh cached principal and count the hit, or None (hold _principal_lock)"""
+    entry = _principals.get(employee_id)
+    if entry is not None and now - entry[1] < _ttl():
+        _principals.move_to_end(employee_id)
+        _principal_stats['hits'] += 1
+        return entry[0]
+    return None
+
+
+def _select_principal(cursor, employee_id):
+    """Read one employee without the password hash"""
+    cursor.execute("""
+        SELECT employee_id, first_name, last_name, email, phone, role,
+               hire_date, active, version
+        FROM employees WHERE employee_id = %s
+    """, (employee_id,))
+    row = cursor.fetchone()
+    return EmployeePrincipal(*row) if row else None
+
+
+def get_principal(employee_id):
+    """
+    Return the EmployeePrincipal for a signed-in employee, or None if there
+    is no such employee (or the database cannot be reached). Principals are
+    shared by every request in the worker; callers must not modify them
+    """
+    now = time.monotonic()
+    sticky = is_sticky()
+    with _principal_lock:
+        # One request per interval re-reads the version (it claims the check by
+        # moving checked_at first); the others keep using the cache meanwhile.
+        # Requests in their read-your-writes window always check for themselves
+        check_due = sticky or now - _principal_state['checked_at'] >= _version_check_seconds()
+        if check_due and not sticky:
+            _principal_state['checked_at'] = now
+        if not check_due:
+            principal = _cached(employee_id, now)
+            if principal is not None:
+                return principal
+
+    # Only borrow a connection once a query is actually needed
+    db = get_read_db()
+    if not db:
+        return None
+
+    cursor = tuple_cursor(db)
+    try:
+        # The version query runs outside the lock, so other requests are not held up
+        version = read_version(cursor, PRINCIPAL_VERSION_NAME) if check_due else None
+        with _principal_lock:
+            if check_due:
+                _apply_version(version)
+            principal = _cached(employee_id, now)
+            if principal is not None:
+                return principal
+            _principal_stats['misses'] += 1
+            if employee_id in _principals:
+                _principal_stats['expired'] += 1
+            generation = _principal_state['generation']
+
+        principal = _select_principal(cursor, employee_id)
+    finally:
+        cursor.close()
+
+    if principal is not None:
+        with _principal_lock:
+            if _principal_state['generation'] == generation:
+                _principals[employee_id] = (principal, time.monotonic())
+                _principals.move_to_end(employee_id)
+                while len(_principals) > _cache_size():
+                    _principals.popitem(last=False)
+                    _principal_stats['evictions'] += 1
+    return principal
+
+
+def invalidate_principal(employee_id):
+    """Drop one employee from this worker's cache after it changed"""
+    with _principal_lock:
+        _principal_state['generation'] += 1
+        if _principals.pop(employee_id, None) is not None:
+            _principal_stats['invalidations'] += 1
+
+
+def get_principal_stats():
+    """Return principal cache counters plus its size and version"""
+    with _principal_lock:
+        stats = dict(_principal_stats)
+        stats['cached'] = len(_principals)
+        stats['version'] = _principal_state['version']
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 3) if lookups else None
+    return stats
@@ -0,0 +1,212 @@
+"""
+Read routing for the Pizza Management System
+Sends read-only db_service queries to the replica servers listed in
+DB_REPLICA_HOSTS, falling back to the primary when no replica is usable or
+when the employee's session has just written (read-your-writes)
+"""
+
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context, session
+
+from app import db_pool
+from app.db_backend import is_sqlite
+from app.db_connect import (
+    checkout, create_connection_pool, get_batch_db, get_batch_pool, get_db,
+)
+
+# Session key holding the time until which this session reads from the primary
+STICKY_SESSION_KEY = '_db_primary_until'
+
+_replica_pools = {}
+_replica_pools_lock = threading.Lock()
+_replica_down_until = {}
+_round_robin = itertools.count()
+
+# Bumped on every write committed by this worker (see note_write)
+_write_epoch = itertools.count(1)
+_current_epoch = 0
+
+_router_stats = {
+    'replica_reads': 0,
+    'primary_reads': 0,
+    'sticky_reads': 0,
+    'replica_fallbacks': 0,
+}
+_router_stats_lock = threading.Lock()
+
+
+def _count(key):
+    """Bump one of the routing counters"""
+    with _router_stats_lock:
+        _router_stats[key] += 1
+
+
+def get_replica_hosts():
+    """Parse DB_REPLICA_HOSTS ("host[:port],host[:port]") into (host, port) pairs"""
+    if is_sqlite():
+        # The embedded backend is a single local file - nothing to replicate
+        return []
+    hosts = []
+    for entry in os.getenv('DB_REPLICA_HOSTS', '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port = entry.partition(':')
+        hosts.append((host, int(port) if port else None))
+    return hosts
+
+
+def _get_replica_pools():
+    """Return this process's replica pools, creating them on first use"""
+    pid = os.getpid()
+    if _replica_pools.get('pid') != pid:
+        with _replica_pools_lock:
+            if _replica_pools.get('pid') != pid:
+                _replica_pools.clear()
+                _replica_down_until.clear()
+                _replica_pools['pid'] = pid
+                _replica_pools['pools'] = [
+                    create_connection_pool(f"replica:{host}:{port or 3306}", host, port)
+                    for host, port in get_replica_hosts()
+                ]
+    return _replica_pools['pools']
+
+
+def _sticky_seconds():
+    """How long a session keeps reading from the primary after it writes"""
+    return float(os.getenv('DB_STICKY_SECONDS', 5))
+
+
+def note_write():
+    """
+    Record that the current session committed a write so its reads go to the
+    primary until replicas have had time to catch up
+    """
+    global _current_epoch
+    _current_epoch = next(_write_epoch)
+    if has_request_context() and get_replica_hosts():
+        session[STICKY_SESSION_KEY] = time.time() + _sticky_seconds()
+
+
+def get_write_epoch():
+    """Return a number that changes whenever this worker commits a write"""
+    return _current_epoch
+
+
+@contextmanager
+def reading_primary():
+    """
+    Send this request's reads to the primary inside the block, e.g. to show
+    the current row after an update lost a race with another writer
+    """
+    previous = g.get('_read_primary', False)
+    g._read_primary = True
+    try:
+        yield
+    finally:
+        g._read_primary = previous
+
+
+def is_sticky():
+    """
+    Check whether the current request must read from the primary: its session
+    is inside the read-your-writes window, or it is inside reading_primary()
+    """
+    if not has_request_context():
+        return False
+    if g.get('_read_primary'):
+        return True
+    until = session.get(STICKY_SESSION_KEY)
+    if until is None:
+        return False
+    if until < time.time():
+        session.pop(STICKY_SESSION_KEY, None)
+        return False
+    return True
+
+
+def _ordered_candidates(pools):
+    """Order healthy replica pools by the configured DB_REPLICA_STRATEGY"""
+    now = time.monotonic()
+    healthy = [pool for pool in pools if _replica_down_until.get(pool['name'], 0) <= now]
+    if not healthy:
+        return []
+    if os.getenv('DB_REPLICA_STRATEGY', 'round_robin') == 'least_connections':
+        return sorted(healthy, key=lambda pool: len(pool['in_use']))
+    start = next(_round_robin) % len(healthy)
+    return healthy[start:] + healthy[:start]
+
+
+def get_read_db():
+    """
+    Return a connection for read-only queries
+    Uses a replica when any are configured and healthy, otherwise the primary.
+    A replica that fails to connect is skipped for DB_REPLICA_RETRY_SECONDS
+    """
+    return _route_read(lambda pool: pool, get_db)
+
+
+def get_batch_read_db():
+    """
+    Like get_read_db, but from the chosen server's multi-statement batch
+    pool, for fetch_result_sets
+    """
+    if is_sqlite():
+        # SQLite runs batches one statement at a time on any connection
+        return get_read_db()
+    return _route_read(get_batch_pool, get_batch_db)
+
+
+def _route_read(pool_for, primary):
+    """
+    Pick the server for a read and check out from pool_for(its pool);
+    primary() supplies the primary's connection
+    """
+    pools = _get_replica_pools()
+    if not pools:
+        return primary()
+    if is_sticky():
+        _count('sticky_reads')
+        return primary()
+
+    # Stay on the replica this request already borrowed from
+    connections = g.get('_connections', {})
+    for pool in pools:
+        name = pool_for(pool)['name']
+        if name in connections:
+            _count('replica_reads')
+            return connections[name][1]
+
+    for pool in _ordered_candidates(pools):
+        try:
+            conn = checkout(pool_for(pool))
+        except Exception as e:
+            print(f"Replica {pool['name']} unavailable, trying next: {e}")
+            _replica_down_until[pool['name']] = (
+                time.monotonic() + float(os.getenv('DB_REPLICA_RETRY_SECONDS', 30))
+            )
+            continue
+        _count('replica_reads')
+        return conn
+
+    _count('replica_fallbacks')
+    _count('primary_reads')
+    return primary()
+
+
+def get_router_stats():
+    """Return read routing counters and per-replica pool usage"""
+    with _router_stats_lock:
+        stats = dict(_router_stats)
+    now = time.monotonic()
+    stats['replicas'] = [
+        dict(db_pool.get_pool_stats(pool),
+             down=_replica_down_until.get(pool['name'], 0) > now,
+             batch=db_pool.get_pool_stats(pool['batch_pool']) if 'batch_pool' in pool else None)
+        for pool in _get_replica_pools()
+    ]
+    return stats
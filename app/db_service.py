@@ -3,57 +3,132 @@ Database service layer for Pizza Management System
 Handles all database operations using the models
 """
 
+import os
+import time
+from datetime import datetime, timedelta
+from itertools import starmap
 from flask import g
 from app.models import Employee, Customer, Pizza, Order, OrderDetail
-from app.db_connect import get_db
+from app.db_backend import (
+    auto_increment_step, begin_write, case_insensitive, close_streaming_cursor,
+    fetch_result_sets, first_insert_id, for_update, is_duplicate_key_error,
+    streaming_cursor, tuple_cursor, upsert_add_sql
+)
+from app.db_cache import bump_version, get_or_compute, invalidate
+from app.db_coalesce import coalesce
+from app.db_connect import get_db, retry_on_disconnect
+from app.db_menu import MENU_VERSION_NAME, get_menu_index, invalidate_menu
+from app.db_pagination import build_page, cached_count, clamp_page_size, fetch_page, invalidate_counts
+from app.db_principal import PRINCIPAL_VERSION_NAME, invalidate_principal
+from app.db_router import get_batch_read_db, get_read_db, note_write, reading_primary
+
+class StaleVersionError(Exception):
+    """
+    An update was based on an out-of-date copy of the row (optimistic
+    concurrency): someone else changed it after it was read
+    """
+
+    def __init__(self, current):
+        super().__init__("This record was changed by someone else. Review the latest values and try again.")
+        # The row as it is now, read from the primary
+        self.current = current
+
+def _version_check(version):
+    """WHERE clause suffix and parameters for an optional expected row version"""
+    if version is None:
+        return '', ()
+    return ' AND version = %s', (int(version),)
+
+def _update_missed(db, cursor, get_current, row_id):
+    """
+    Handle an UPDATE that matched no row: roll back, then raise
+    StaleVersionError with the current row, or return False if it is gone
+    """
+    db.rollback()
+    cursor.close()
+    with reading_primary():
+        current = get_current(row_id)
+    if current is None:
+        return False
+    raise StaleVersionError(current)
+
+def _stream_rows(sql, params=()):
+    """
+    Yield result rows (as tuples) from an unbuffered cursor, STREAM_BATCH_SIZE
+    at a time, so memory stays flat however many rows match. Not retried on
+    disconnect - rows already yielded may have been sent to the client
+    """
+    db = get_read_db()
+    if not db:
+        return
+
+    batch_size = int(os.getenv('STREAM_BATCH_SIZE', 500))
+    cursor = streaming_cursor(db)
+    exhausted = False
+    try:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+        exhausted = True
+    finally:
+        close_streaming_cursor(cursor, exhausted)
 
 # ==================== EMPLOYEE OPERATIONS ====================
 
+@retry_on_disconnect
 def get_employee_by_id(employee_id):
     """Get employee by ID"""
-    db = get_db()
+    db = get_read_db()
     if not db:
         return None
 
-    cursor = db.cursor()
+    cursor = tuple_cursor(db)
     cursor.execute("""
         SELECT employee_id, first_name, last_name, email, phone, role,
-               password_hash, hire_date, active
+               password_hash, hire_date, active, version
         FROM employees WHERE employee_id = %s
     """, (employee_id,))
     row = cursor.fetchone()
     cursor.close()
 
     if row:
-        return Employee(**row)
+        return Employee(*row)
     return None
 
+@retry_on_disconnect
 def get_employee_by_email(email):
-    """Get employee by email"""
-    db = get_db()
+    """Get employee by email, ignoring case"""
+    if not email:
+        return None
+    db = get_read_db()
     if not db:
         return None
 
-    cursor = db.cursor()
-    cursor.execute("""
+    cursor = tuple_cursor(db)
+    cursor.execute(f"""
         SELECT employee_id, first_name, last_name, email, phone, role,
-               password_hash, hire_date, active
-        FROM employees WHERE email = %s
-    """, (email,))
+               password_hash, hire_date, active, version
+        FROM employees WHERE {case_insensitive('email')} = %s
+    """, (email.lower(),))
     row = cursor.fetchone()
     cursor.close()
 
     if row:
-        return Employee(**row)
+        return Employee(*row)
     return None
 
+@coalesce
+@retry_on_disconnect
 def get_all_employees():
     """Get all employees"""
-    db = get_db()
+    db = get_read_db()
     if not db:
         return []
 
-    cursor = db.cursor()
+    cursor = tuple_cursor(db)
     cursor.execute("""
         SELECT employee_id, first_name, last_name, email, phone, role,
                password_hash, hire_date, active
@@ -62,7 +137,34 @@ def get_all_employees():
     rows = cursor.fetchall()
     cursor.close()
 
-    return [Employee(**row) for row in rows]
+    return list(starmap(Employee, rows))
+
+@coalesce
+@retry_on_disconnect
+def get_employees_page(cursor_token=None, page_size=None):
+    """Get one keyset page of employees, ordered by name"""
+    page_size = clamp_page_size(page_size)
+    db = get_read_db()
+    if not db:
+        return build_page([], None, None, page_size, 0)
+
+    cursor = tuple_cursor(db)
+    rows, next_token, prev_token = fetch_page(
+        cursor,
+        """
+        SELECT employee_id, first_name, last_name, email, phone, role,
+               password_hash, hire_date, active
+        FROM employees
+        """,
+        sort_columns=('last_name', 'first_name', 'employee_id'),
+        key_indexes=(2, 1, 0),
+        token=cursor_token,
+        page_size=page_size,
+    )
+    total = cached_count('employees', cursor, "SELECT COUNT(*) FROM employees")
+    cursor.close()
+
+    return build_page(list(starmap(Employee, rows)), next_token, prev_token, page_size, total)
 
 def create_employee(first_name, last_name, email, phone, role, password, hire_date):
     """Create a new employee"""
@@ -79,24 +181,37 @@ def create_employee(first_name, last_name, email, phone, role, password, hire_da
         VALUES (%s, %s, %s, %s, %s, %s, %s)
     """, (first_name, last_name, email, phone, role, employee.password_hash, hire_date))
     db.commit()
+    note_write()
+    invalidate_counts('employees')
 
     employee_id = cursor.lastrowid
     cursor.close()
     return employee_id
 
-def update_employee(employee_id, first_name, last_name, email, phone, role, active):
-    """Update an employee"""
+def update_employee(employee_id, first_name, last_name, email, phone, role, active, version=None):
+    """
+    Update an employee
+    With `version`, only updates if the row is still at that version and
+    raises StaleVersionError otherwise
+    """
     db = get_db()
     if not db:
         return False
 
+    check, check_params = _version_check(version)
     cursor = db.cursor()
     cursor.execute("""
         UPDATE employees
-        SET first_name = %s, last_name = %s, email = %s, phone = %s, role = %s, active = %s
+        SET first_name = %s, last_name = %s, email = %s, phone = %s, role = %s, active = %s,
+            version = version + 1
         WHERE employee_id = %s
-    """, (first_name, last_name, email, phone, role, active, employee_id))
+    """ + check, (first_name, last_name, email, phone, role, active, employee_id) + check_params)
+    if cursor.rowcount == 0:
+        return _update_missed(db, cursor, get_employee_by_id, employee_id)
+    bump_version(cursor, PRINCIPAL_VERSION_NAME)
     db.commit()
+    note_write()
+    invalidate_principal(employee_id)
     cursor.close()
     return True
 
@@ -108,7 +223,11 @@ def delete_employee(employee_id):
 
     cursor = db.cursor()
     cursor.execute("DELETE FROM employees WHERE employee_id = %s", (employee_id,))
+    bump_version(cursor, PRINCIPAL_VERSION_NAME)
     db.commit()
+    note_write()
+    invalidate_counts('employees')
+    invalidate_principal(employee_id)
     cursor.close()
     return True
 
@@ -124,19 +243,24 @@ def update_employee_password(employee_id, password_hash):
         SET password_hash = %s
         WHERE employee_id = %s
     """, (password_hash, employee_id))
+    bump_version(cursor, PRINCIPAL_VERSION_NAME)
     db.commit()
+    note_write()
+    invalidate_principal(employee_id)
     cursor.close()
     return True
 
 # ==================== CUSTOMER OPERATIONS ====================
 
+@coalesce
+@retry_on_disconnect
 def get_all_customers():
     """Get all non-archived customers"""
-    db = get_db()
+    db = get_read_db()
     if not db:
         return []
 
-    cursor = db.cursor()
+    cursor = tuple_cursor(db)
     cursor.execute("""
         SELECT customer_id, first_name, last_name, email, phone,
                address, city, state, zip_code, created_at
@@ -145,25 +269,63 @@ def get_all_customers():
     rows = cursor.fetchall()
     cursor.close()
 
-    return [Customer(**row) for row in rows]
+    return list(starmap(Customer, rows))
+
+def iter_customers():
+    """Yield every non-archived customer by name without buffering the result"""
+    return starmap(Customer, _stream_rows("""
+        SELECT customer_id, first_name, last_name, email, phone,
+               address, city, state, zip_code, created_at
+        FROM customers WHERE archived = FALSE ORDER BY last_name, first_name, customer_id
+    """))
+
+@coalesce
+@retry_on_disconnect
+def get_customers_page(cursor_token=None, page_size=None):
+    """Get one keyset page of non-archived customers, ordered by name"""
+    page_size = clamp_page_size(page_size)
+    db = get_read_db()
+    if not db:
+        return build_page([], None, None, page_size, 0)
+
+    cursor = tuple_cursor(db)
+    rows, next_token, prev_token = fetch_page(
+        cursor,
+        """
+        SELECT customer_id, first_name, last_name, email, phone,
+               address, city, state, zip_code, created_at
+        FROM customers
+        """,
+        sort_columns=('last_name', 'first_name', 'customer_id'),
+        key_indexes=(2, 1, 0),
+        where="archived = FALSE",
+        token=cursor_token,
+        page_size=page_size,
+    )
+    total = cached_count('customers', cursor, "SELECT COUNT(*) FROM customers WHERE archived = FALSE")
+    cursor.close()
+
+    return build_page(list(starmap(Customer, rows)), next_token, prev_token, page_size, total)
 
+@coalesce
+@retry_on_disconnect
 def get_customer_by_id(customer_id):
     """Get customer by ID"""
-    db = get_db()
+    db = get_read_db()
     if not db:
         return None
 
-    cursor = db.cursor()
+    cursor = tuple_cursor(db)
     cursor.execute("""
         SELECT customer_id, first_name, last_name, email, phone,
-               address, city, state, zip_code, created_at
+               address, city, state, zip_code, created_at, version
         FROM customers WHERE customer_id = %s
     """, (customer_id,))
     row = cursor.fetchone()
     cursor.close()
 
     if row:
-        return Customer(**row)
+        return Customer(*row)
     return None
 
 def create_customer(first_name, last_name, email, phone, address, city, state, zip_code):
@@ -178,25 +340,37 @@ def create_customer(first_name, last_name, email, phone, address, city, state, z
         VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
     """, (first_name, last_name, email, phone, address, city, state, zip_code))
     db.commit()
+    note_write()
+    invalidate_counts('customers')
+    invalidate(DASHBOARD_STATS_CACHE)
 
     customer_id = cursor.lastrowid
     cursor.close()
     return customer_id
 
-def update_customer(customer_id, first_name, last_name, email, phone, address, city, state, zip_code):
-    """Update a customer"""
+def update_customer(customer_id, first_name, last_name, email, phone, address, city, state, zip_code,
+                    version=None):
+    """
+    Update a customer
+    With `version`, only updates if the row is still at that version and
+    raises StaleVersionError otherwise
+    """
     db = get_db()
     if not db:
         return False
 
+    check, check_params = _version_check(version)
     cursor = db.cursor()
     cursor.execute("""
         UPDATE customers
         SET first_name = %s, last_name = %s, email = %s, phone = %s,
-            address = %s, city = %s, state = %s, zip_code = %s
+            address = %s, city = %s, state = %s, zip_code = %s, version = version + 1
         WHERE customer_id = %s
-    """, (first_name, last_name, email, phone, address, city, state, zip_code, customer_id))
+    """ + check, (first_name, last_name, email, phone, address, city, state, zip_code, customer_id) + check_params)
+    if cursor.rowcount == 0:
+        return _update_missed(db, cursor, get_customer_by_id, customer_id)
     db.commit()
+    note_write()
     cursor.close()
     return True
 
@@ -207,62 +381,89 @@ def delete_customer(customer_id):
         return False
 
     cursor = db.cursor()
-    cursor.execute("UPDATE customers SET archived = TRUE WHERE customer_id = %s", (customer_id,))
+    cursor.execute("UPDATE customers SET archived = TRUE, version = version + 1 WHERE customer_id = %s",
+                   (customer_id,))
     db.commit()
+    note_write()
+    invalidate_counts('customers')
+    invalidate(DASHBOARD_STATS_CACHE)
     cursor.close()
     return True
 
 # ==================== PIZZA OPERATIONS ====================
+# Menu reads are answered from the per-worker index in db_menu; every write
+# below bumps the menu version in its transaction and drops the local index
 
+@retry_on_disconnect
 def get_all_pizzas():
     """Get all non-archived pizzas"""
-    db = get_db()
-    if not db:
+    menu = get_menu_index()
+    if not menu:
         return []
+    return list(menu['active'])
+
+@coalesce
+@retry_on_disconnect
+def get_pizzas_page(cursor_token=None, page_size=None, archived=False):
+    """Get one keyset page of active (or archived) pizzas, ordered by category, name and size"""
+    page_size = clamp_page_size(page_size)
+    db = get_read_db()
+    if not db:
+        return build_page([], None, None, page_size, 0)
 
-    cursor = db.cursor()
-    cursor.execute("""
+    cursor = tuple_cursor(db)
+    rows, next_token, prev_token = fetch_page(
+        cursor,
+        """
         SELECT pizza_id, name, description, size, base_price, category, available, created_at
-        FROM pizzas WHERE archived = FALSE ORDER BY category, name, size
-    """)
-    rows = cursor.fetchall()
+        FROM pizzas
+        """,
+        sort_columns=('category', 'name', 'size', 'pizza_id'),
+        key_indexes=(5, 1, 3, 0),
+        where="archived = %s",
+        params=(archived,),
+        token=cursor_token,
+        page_size=page_size,
+    )
+    total = cached_count(
+        'pizzas:archived' if archived else 'pizzas:active', cursor,
+        "SELECT COUNT(*) FROM pizzas WHERE archived = %s", (archived,)
+    )
     cursor.close()
 
-    return [Pizza(**row) for row in rows]
+    return build_page(list(starmap(Pizza, rows)), next_token, prev_token, page_size, total)
 
+@retry_on_disconnect
 def get_available_pizzas():
     """Get all available non-archived pizzas"""
-    db = get_db()
-    if not db:
+    menu = get_menu_index()
+    if not menu:
         return []
+    return list(menu['available'])
 
-    cursor = db.cursor()
-    cursor.execute("""
-        SELECT pizza_id, name, description, size, base_price, category, available, created_at
-        FROM pizzas WHERE available = TRUE AND archived = FALSE ORDER BY category, name, size
-    """)
-    rows = cursor.fetchall()
-    cursor.close()
-
-    return [Pizza(**row) for row in rows]
-
+@retry_on_disconnect
 def get_pizza_by_id(pizza_id):
-    """Get pizza by ID"""
-    db = get_db()
-    if not db:
+    """Get pizza by ID (archived pizzas included)"""
+    menu = get_menu_index()
+    if not menu:
         return None
+    return menu['by_id'].get(pizza_id)
 
-    cursor = db.cursor()
-    cursor.execute("""
-        SELECT pizza_id, name, description, size, base_price, category, available, created_at
-        FROM pizzas WHERE pizza_id = %s
-    """, (pizza_id,))
-    row = cursor.fetchone()
-    cursor.close()
+@retry_on_disconnect
+def get_pizzas_by_category():
+    """Get non-archived pizzas grouped by category, as {category: [pizzas]}"""
+    menu = get_menu_index()
+    if not menu:
+        return {}
+    return {category: list(pizzas) for category, pizzas in menu['by_category'].items()}
 
-    if row:
-        return Pizza(**row)
-    return None
+@retry_on_disconnect
+def get_pizza_by_name_size(name, size):
+    """Get the non-archived pizza with this name and size, or None"""
+    menu = get_menu_index()
+    if not menu:
+        return None
+    return menu['by_name_size'].get((name, size))
 
 def create_pizza(name, description, size, base_price, category, available=True):
     """Create a new pizza"""
@@ -275,26 +476,40 @@ def create_pizza(name, description, size, base_price, category, available=True):
         INSERT INTO pizzas (name, description, size, base_price, category, available)
         VALUES (%s, %s, %s, %s, %s, %s)
     """, (name, description, size, base_price, category, available))
+    pizza_id = cursor.lastrowid
+    bump_version(cursor, MENU_VERSION_NAME)
     db.commit()
+    note_write()
+    invalidate_menu()
+    invalidate_counts('pizzas')
 
-    pizza_id = cursor.lastrowid
     cursor.close()
     return pizza_id
 
-def update_pizza(pizza_id, name, description, size, base_price, category, available):
-    """Update a pizza"""
+def update_pizza(pizza_id, name, description, size, base_price, category, available, version=None):
+    """
+    Update a pizza
+    With `version`, only updates if the row is still at that version and
+    raises StaleVersionError otherwise
+    """
     db = get_db()
     if not db:
         return False
 
+    check, check_params = _version_check(version)
     cursor = db.cursor()
     cursor.execute("""
         UPDATE pizzas
         SET name = %s, description = %s, size = %s, base_price = %s,
-            category = %s, available = %s
+            category = %s, available = %s, version = version + 1
         WHERE pizza_id = %s
-    """, (name, description, size, base_price, category, available, pizza_id))
+    """ + check, (name, description, size, base_price, category, available, pizza_id) + check_params)
+    if cursor.rowcount == 0:
+        return _update_missed(db, cursor, get_pizza_by_id, pizza_id)
+    bump_version(cursor, MENU_VERSION_NAME)
     db.commit()
+    note_write()
+    invalidate_menu()
     cursor.close()
     return True
 
@@ -305,26 +520,22 @@ def delete_pizza(pizza_id):
         return False
 
     cursor = db.cursor()
-    cursor.execute("UPDATE pizzas SET archived = TRUE WHERE pizza_id = %s", (pizza_id,))
+    cursor.execute("UPDATE pizzas SET archived = TRUE, version = version + 1 WHERE pizza_id = %s", (pizza_id,))
+    bump_version(cursor, MENU_VERSION_NAME)
     db.commit()
+    note_write()
+    invalidate_menu()
+    invalidate_counts('pizzas')
     cursor.close()
     return True
 
+@retry_on_disconnect
 def get_archived_pizzas():
     """Get all archived pizzas"""
-    db = get_db()
-    if not db:
+    menu = get_menu_index()
+    if not menu:
         return []
-
-    cursor = db.cursor()
-    cursor.execute("""
-        SELECT pizza_id, name, description, size, base_price, category, available, created_at
-        FROM pizzas WHERE archived = TRUE ORDER BY category, name, size
-    """)
-    rows = cursor.fetchall()
-    cursor.close()
-
-    return [Pizza(**row) for row in rows]
+    return list(menu['archived'])
 
 def restore_pizza(pizza_id):
     """Restore an archived pizza (unarchive)"""
@@ -333,8 +544,12 @@ def restore_pizza(pizza_id):
         return False
 
     cursor = db.cursor()
-    cursor.execute("UPDATE pizzas SET archived = FALSE WHERE pizza_id = %s", (pizza_id,))
+    cursor.execute("UPDATE pizzas SET archived = FALSE, version = version + 1 WHERE pizza_id = %s", (pizza_id,))
+    bump_version(cursor, MENU_VERSION_NAME)
     db.commit()
+    note_write()
+    invalidate_menu()
+    invalidate_counts('pizzas')
     cursor.close()
     return True
 
@@ -348,7 +563,11 @@ def permanently_delete_pizza(pizza_id):
     # This will fail if pizza is referenced in orders due to foreign key constraint
     try:
         cursor.execute("DELETE FROM pizzas WHERE pizza_id = %s", (pizza_id,))
+        bump_version(cursor, MENU_VERSION_NAME)
         db.commit()
+        note_write()
+        invalidate_menu()
+        invalidate_counts('pizzas')
         cursor.close()
         return True
     except Exception as e:
@@ -358,18 +577,20 @@ def permanently_delete_pizza(pizza_id):
 
 # ==================== ORDER OPERATIONS ====================
 
+@coalesce
+@retry_on_disconnect
 def get_all_orders():
     """Get all orders with customer and employee information"""
-    db = get_db()
+    db = get_read_db()
     if not db:
         return []
 
-    cursor = db.cursor()
+    cursor = tuple_cursor(db)
     cursor.execute("""
         SELECT o.order_id, o.customer_id, o.employee_id, o.order_date,
                o.subtotal, o.tax_rate, o.tax_amount, o.total_amount, o.status, o.notes,
                c.first_name as customer_first_name, c.last_name as customer_last_name,
-               e.first_name as employee_first_name, e.last_name as employee_last_name
+               e.first_name as employee_first_name, e.last_name as employee_last_name, o.version
         FROM orders o
         JOIN customers c ON o.customer_id = c.customer_id
         JOIN employees e ON o.employee_id = e.employee_id
@@ -378,45 +599,142 @@ def get_all_orders():
     rows = cursor.fetchall()
     cursor.close()
 
-    orders = []
+    # Columns 0-9 are the Order fields; 10-13 are the joined names, then the version
+    return [
+        Order(*row[:10], f"{row[10]} {row[11]}", f"{row[12]} {row[13]}", row[14])
+        for row in rows
+    ]
+
+def iter_orders():
+    """Yield every order with customer and employee names, newest first, without buffering the result"""
+    rows = _stream_rows("""
+        SELECT o.order_id, o.customer_id, o.employee_id, o.order_date,
+               o.subtotal, o.tax_rate, o.tax_amount, o.total_amount, o.status, o.notes,
+               c.first_name as customer_first_name, c.last_name as customer_last_name,
+               e.first_name as employee_first_name, e.last_name as employee_last_name
+        FROM orders o
+        JOIN customers c ON o.customer_id = c.customer_id
+        JOIN employees e ON o.employee_id = e.employee_id
+        ORDER BY o.order_date DESC, o.order_id DESC
+    """)
     for row in rows:
-        order = Order(
-            row['order_id'], row['customer_id'], row['employee_id'],
-            row['order_date'], row['subtotal'], row['tax_rate'],
-            row['tax_amount'], row['total_amount'], row['status'], row['notes']
-        )
-        order.customer_name = f"{row['customer_first_name']} {row['customer_last_name']}"
-        order.employee_name = f"{row['employee_first_name']} {row['employee_last_name']}"
-        orders.append(order)
+        yield Order(*row[:10], f"{row[10]} {row[11]}", f"{row[12]} {row[13]}")
+
+# Column order of the rows yielded by iter_order_export
+ORDER_EXPORT_COLUMNS = (
+    'order_id', 'order_date', 'status', 'customer_id', 'customer_name',
+    'employee_id', 'employee_name', 'subtotal', 'tax_rate', 'tax_amount',
+    'total_amount', 'notes', 'detail_id', 'pizza_id', 'pizza_name', 'pizza_size',
+    'quantity', 'unit_price', 'line_subtotal',
+)
+
+def iter_order_export(start=None, end=None, status=None, employee_id=None, after_order_id=None):
+    """
+    Yield orders joined with their line items and pizza names as tuples in
+    ORDER_EXPORT_COLUMNS order, one row per line item (line item columns are
+    None for an order without items), sorted by order_id then detail_id.
+    Filters: order_date >= start and < end, status, employee_id, and
+    order_id > after_order_id for resuming an interrupted export
+    """
+    conditions = []
+    params = []
+    for condition, value in (
+        ("o.order_date >= %s", start),
+        ("o.order_date < %s", end),
+        ("o.status = %s", status),
+        ("o.employee_id = %s", employee_id),
+        ("o.order_id > %s", after_order_id),
+    ):
+        if value is not None:
+            conditions.append(condition)
+            params.append(value)
+    where = "WHERE " + " AND ".join(conditions) if conditions else ""
+
+    # One ordered query over an unbuffered cursor; the order_id sort walks the
+    # primary key, so resuming from an order_id is a cheap range seek
+    rows = _stream_rows(f"""
+        SELECT o.order_id, o.order_date, o.status, o.customer_id,
+               c.first_name, c.last_name, o.employee_id, e.first_name, e.last_name,
+               o.subtotal, o.tax_rate, o.tax_amount, o.total_amount, o.notes,
+               d.detail_id, d.pizza_id, p.name, p.size, d.quantity, d.unit_price, d.subtotal
+        FROM orders o
+        JOIN customers c ON o.customer_id = c.customer_id
+        JOIN employees e ON o.employee_id = e.employee_id
+        LEFT JOIN order_details d ON d.order_id = o.order_id
+        LEFT JOIN pizzas p ON d.pizza_id = p.pizza_id
+        {where}
+        ORDER BY o.order_id, d.detail_id
+    """, params)
+    for row in rows:
+        yield row[:4] + (f"{row[4]} {row[5]}", row[6], f"{row[7]} {row[8]}") + row[9:]
+
+@coalesce
+@retry_on_disconnect
+def get_orders_page(cursor_token=None, page_size=None):
+    """Get one keyset page of orders with customer and employee names, newest first"""
+    page_size = clamp_page_size(page_size)
+    db = get_read_db()
+    if not db:
+        return build_page([], None, None, page_size, 0)
+
+    cursor = tuple_cursor(db)
+    rows, next_token, prev_token = fetch_page(
+        cursor,
+        """
+        SELECT o.order_id, o.customer_id, o.employee_id, o.order_date,
+               o.subtotal, o.tax_rate, o.tax_amount, o.total_amount, o.status, o.notes,
+               c.first_name as customer_first_name, c.last_name as customer_last_name,
+               e.first_name as employee_first_name, e.last_name as employee_last_name, o.version
+        FROM orders o
+        JOIN customers c ON o.customer_id = c.customer_id
+        JOIN employees e ON o.employee_id = e.employee_id
+        """,
+        # order_id breaks ties between orders placed in the same second
+        sort_columns=('o.order_date', 'o.order_id'),
+        key_indexes=(3, 0),
+        token=cursor_token,
+        page_size=page_size,
+        descending=True,
+    )
+    total = cached_count('orders', cursor, "SELECT COUNT(*) FROM orders")
+    cursor.close()
 
-    return orders
+    orders = [
+        Order(*row[:10], f"{row[10]} {row[11]}", f"{row[12]} {row[13]}", row[14])
+        for row in rows
+    ]
+    return build_page(orders, next_token, prev_token, page_size, total)
 
+@coalesce
+@retry_on_disconnect
 def get_order_by_id(order_id):
     """Get order by ID"""
-    db = get_db()
+    db = get_read_db()
     if not db:
         return None
 
-    cursor = db.cursor()
+    cursor = tuple_cursor(db)
     cursor.execute("""
         SELECT order_id, customer_id, employee_id, order_date,
-               subtotal, tax_rate, tax_amount, total_amount, status, notes
+               subtotal, tax_rate, tax_amount, total_amount, status, notes, version
         FROM orders WHERE order_id = %s
     """, (order_id,))
     row = cursor.fetchone()
     cursor.close()
 
     if row:
-        return Order(**row)
+        return Order(*row[:10], version=row[10])
     return None
 
+@coalesce
+@retry_on_disconnect
 def get_order_details(order_id):
     """Get all order details for a specific order"""
-    db = get_db()
+    db = get_read_db()
     if not db:
         return []
 
-    cursor = db.cursor()
+    cursor = tuple_cursor(db)
     cursor.execute("""
         SELECT od.detail_id, od.order_id, od.pizza_id, od.quantity,
                od.unit_price, od.subtotal,
@@ -428,143 +746,532 @@ def get_order_details(order_id):
     rows = cursor.fetchall()
     cursor.close()
 
-    details = []
-    for row in rows:
-        detail = OrderDetail(
-            row['detail_id'], row['order_id'], row['pizza_id'],
-            row['quantity'], row['unit_price'], row['subtotal']
-        )
-        detail.pizza_name = row['pizza_name']
-        detail.pizza_size = row['pizza_size']
-        details.append(detail)
+    return list(starmap(OrderDetail, rows))
+
+def _add_rollup_totals(cursor, daily, statuses, pizza_quantities):
+    """
+    Add running totals to the dashboard rollup tables on the caller's cursor,
+    so they commit or roll back with the orders they describe
+    daily: {sales_date: (order_count, total)}, statuses: {status: (order_count, total)},
+    pizza_quantities: {pizza_id: quantity}; negative values subtract
+    Every writer goes through here, and rows are upserted in key order, so
+    concurrent transactions lock rollup rows in the same order and cannot
+    deadlock on each other
+    """
+    cursor.executemany(
+        upsert_add_sql('rollup_daily_sales', 'sales_date', ('order_count', 'total_sales')),
+        [(sales_date, count, total) for sales_date, (count, total) in sorted(daily.items())]
+    )
+    cursor.executemany(
+        upsert_add_sql('rollup_status_sales', 'status', ('order_count', 'total_amount')),
+        [(status, count, total) for status, (count, total) in sorted(statuses.items())]
+    )
+    cursor.executemany(
+        upsert_add_sql('rollup_pizza_sales', 'pizza_id', ('quantity_sold',)),
+        sorted(pizza_quantities.items())
+    )
+
+def _adjust_rollups(cursor, sales_date, status, total_amount, pizza_quantities, sign):
+    """
+    Add (sign=1) or subtract (sign=-1) one order in the dashboard rollup tables
+    pizza_quantities: list of tuples (pizza_id, quantity)
+    """
+    quantities = {}
+    for pizza_id, quantity in pizza_quantities:
+        quantities[pizza_id] = quantities.get(pizza_id, 0) + sign * quantity
+    _add_rollup_totals(cursor, {sales_date: (sign, sign * total_amount)},
+                       {status: (sign, sign * total_amount)}, quantities)
+
+def _fetch_prices(cursor, pizza_ids):
+    """Return {pizza_id: base_price} for the orderable pizzas among pizza_ids, in one query"""
+    pizza_ids = sorted(pizza_ids)
+    if not pizza_ids:
+        return {}
+    placeholders = ', '.join(['%s'] * len(pizza_ids))
+    cursor.execute(f"""
+        SELECT pizza_id, base_price FROM pizzas
+        WHERE pizza_id IN ({placeholders}) AND available = TRUE AND archived = FALSE
+    """, pizza_ids)
+    return {row['pizza_id']: float(row['base_price']) for row in cursor.fetchall()}
+
+def _price_lines(prices, order_items):
+    """
+    Price an order's items from _fetch_prices' result
+    Returns a list of tuples (pizza_id, quantity, unit_price, subtotal); raises
+    ValueError for an empty order, a bad quantity or a pizza that is unknown,
+    archived or unavailable
+    """
+    if not order_items:
+        raise ValueError("An order needs at least one item")
+    lines = []
+    for pizza_id, quantity, *_ in order_items:
+        if pizza_id not in prices:
+            raise ValueError(f"Pizza {pizza_id} is not on the menu")
+        if quantity < 1:
+            raise ValueError(f"Quantity for pizza {pizza_id} must be at least 1")
+        unit_price = prices[pizza_id]
+        lines.append((pizza_id, quantity, unit_price, round(quantity * unit_price, 2)))
+    return lines
+
+def _order_totals(lines, tax_rate):
+    """Return (subtotal, tax_amount, total_amount) for priced order lines"""
+    subtotal = round(sum(line[3] for line in lines), 2)
+    tax_amount = round(subtotal * tax_rate, 2)
+    return subtotal, tax_amount, round(subtotal + tax_amount, 2)
+
+class IdempotencyKeyConflict(Exception):
+    """An idempotency key was reused for a request with different contents"""
 
-    return details
+# Per-worker time of the last sweep of expired idempotency keys
+_idempotency_cleanup = {'last_run': 0.0}
 
-def create_order(customer_id, employee_id, order_items, tax_rate=0.0700, notes=None):
+def _idempotency_ttl():
+    """How long an idempotency key is honoured (IDEMPOTENCY_KEY_TTL_HOURS)"""
+    return timedelta(hours=float(os.getenv('IDEMPOTENCY_KEY_TTL_HOURS', 24)))
+
+def _purge_expired_idempotency_keys(db):
     """
-    Create a new order with order details
-    order_items: list of tuples (pizza_id, quantity, unit_price)
+    Delete expired keys in their own short transaction, after an order has
+    committed, at most once every few minutes per worker. A failure here is
+    only logged; the next run catches up
+    """
+    now = time.monotonic()
+    if now - _idempotency_cleanup['last_run'] < 300:
+        return
+    _idempotency_cleanup['last_run'] = now
+    cursor = db.cursor()
+    try:
+        cursor.execute("DELETE FROM order_idempotency_keys WHERE created_at < %s",
+                       (datetime.now() - _idempotency_ttl(),))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error purging expired idempotency keys: {e}")
+    finally:
+        cursor.close()
+
+def _forget_expired_idempotency_key(db, idempotency_key):
+    """Delete one key that has outlived the TTL but not been purged yet, so it can be used again"""
+    cursor = db.cursor()
+    try:
+        cursor.execute("DELETE FROM order_idempotency_keys WHERE idempotency_key = %s AND created_at < %s",
+                       (idempotency_key, datetime.now() - _idempotency_ttl()))
+        db.commit()
+    finally:
+        cursor.close()
+
+def get_idempotent_order(idempotency_key, request_hash):
+    """
+    Return the order_id already created for this idempotency key, or None
+    once the key is older than the TTL (even if not purged yet). Reads the
+    primary, since a retry usually arrives before replicas catch up. Raises
+    IdempotencyKeyConflict if the key was used for another request
     """
     db = get_db()
     if not db:
         return None
 
     cursor = db.cursor()
+    cursor.execute("""
+        SELECT order_id, request_hash FROM order_idempotency_keys
+        WHERE idempotency_key = %s AND created_at >= %s
+    """, (idempotency_key, datetime.now() - _idempotency_ttl()))
+    row = cursor.fetchone()
+    cursor.close()
 
-    # Calculate subtotal
-    subtotal = sum(item[1] * item[2] for item in order_items)
-    tax_amount = round(subtotal * tax_rate, 2)
-    total_amount = round(subtotal + tax_amount, 2)
+    if not row:
+        return None
+    if row['request_hash'] != request_hash:
+        raise IdempotencyKeyConflict(idempotency_key)
+    return row['order_id']
 
-    # Create order
-    cursor.execute("""
-        INSERT INTO orders (customer_id, employee_id, subtotal, tax_rate, tax_amount, total_amount, status, notes)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-    """, (customer_id, employee_id, subtotal, tax_rate, tax_amount, total_amount, 'Pending', notes))
+def create_order(customer_id, employee_id, order_items, tax_rate=0.0700, notes=None,
+                 idempotency_key=None, request_hash=None):
+    """
+    Create a new order with order details
+    order_items: list of tuples (pizza_id, quantity); unit prices are taken
+    from the pizzas table, and any client-supplied third element is ignored
+    With an idempotency_key, the key is stored in the order's transaction; if
+    a concurrent retry stored it first, nothing is written and that retry's
+    order_id is returned instead. A key past the TTL starts a new order
+    """
+    if not order_items:
+        raise ValueError("An order needs at least one item")
+
+    db = get_db()
+    if not db:
+        return None
 
-    order_id = cursor.lastrowid
+    cursor = db.cursor()
+    try:
+        lines = _price_lines(_fetch_prices(cursor, {item[0] for item in order_items}), order_items)
+        subtotal, tax_amount, total_amount = _order_totals(lines, tax_rate)
 
-    # Create order details
-    for pizza_id, quantity, unit_price in order_items:
-        item_subtotal = round(quantity * unit_price, 2)
+        # Create order
         cursor.execute("""
+            INSERT INTO orders (customer_id, employee_id, subtotal, tax_rate, tax_amount, total_amount, status, notes)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, (customer_id, employee_id, subtotal, tax_rate, tax_amount, total_amount, 'Pending', notes))
+
+        order_id = cursor.lastrowid
+
+        # Create order details; PyMySQL sends this as one multi-row INSERT
+        cursor.executemany("""
             INSERT INTO order_details (order_id, pizza_id, quantity, unit_price, subtotal)
             VALUES (%s, %s, %s, %s, %s)
-        """, (order_id, pizza_id, quantity, unit_price, item_subtotal))
+        """, [(order_id,) + line for line in lines])
 
-    db.commit()
-    cursor.close()
+        # order_date is set by the database, so read it back for the daily rollup
+        cursor.execute("SELECT order_date FROM orders WHERE order_id = %s", (order_id,))
+        order_date = cursor.fetchone()['order_date']
+        _adjust_rollups(cursor, order_date.date(), 'Pending', total_amount,
+                        [line[:2] for line in lines], 1)
+
+        if idempotency_key:
+            # The unique key makes a concurrent retry wait here, then fail once this commits
+            cursor.execute("""
+                INSERT INTO order_idempotency_keys (idempotency_key, order_id, request_hash, created_at)
+                VALUES (%s, %s, %s, %s)
+            """, (idempotency_key, order_id, request_hash, datetime.now()))
+
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        if idempotency_key and is_duplicate_key_error(e):
+            existing = get_idempotent_order(idempotency_key, request_hash)
+            if existing is not None:
+                return existing
+            # The key is held by an expired row the purge has not reached yet
+            _forget_expired_idempotency_key(db, idempotency_key)
+            return create_order(customer_id, employee_id, order_items, tax_rate, notes,
+                                idempotency_key, request_hash)
+        raise
+    finally:
+        cursor.close()
+
+    if idempotency_key:
+        _purge_expired_idempotency_keys(db)
+    note_write()
+    invalidate_counts('orders')
+    invalidate(DASHBOARD_STATS_CACHE)
     return order_id
 
-def update_order_status(order_id, status):
-    """Update order status"""
+def _existing_ids(cursor, table, id_column, ids, condition='TRUE'):
+    """Return the subset of ids present in table (matching condition), in one query"""
+    ids = sorted(ids)
+    if not ids:
+        return set()
+    placeholders = ', '.join(['%s'] * len(ids))
+    cursor.execute(
+        f"SELECT {id_column} AS id FROM {table} WHERE {id_column} IN ({placeholders}) AND {condition}",
+        ids
+    )
+    return {row['id'] for row in cursor.fetchall()}
+
+# The server's auto_increment_increment, read by the first bulk insert
+_bulk_insert_ids = {'step': None}
+
+def _insert_order_chunk(cursor, chunk):
+    """
+    Insert a chunk of validated orders: one multi-row INSERT for the headers,
+    one for the details and one upsert per rollup table. One INSERT ... VALUES
+    gets consecutive order_ids, so they follow from the first id; on servers
+    that space ids apart (auto_increment_increment > 1) each header is
+    inserted on its own and takes lastrowid instead
+    chunk: list of tuples (order dict, priced lines). Returns the new order_ids
+    """
+    if _bulk_insert_ids['step'] is None:
+        _bulk_insert_ids['step'] = auto_increment_step(cursor)
+
+    headers = []
+    totals = []
+    for order, lines in chunk:
+        tax_rate = order.get('tax_rate', 0.0700)
+        subtotal, tax_amount, total_amount = _order_totals(lines, tax_rate)
+        totals.append(total_amount)
+        headers.append((order['customer_id'], order['employee_id'], order.get('order_date'),
+                        subtotal, tax_rate, tax_amount, total_amount, 'Pending', order.get('notes')))
+
+    # Offline orders may carry the time they were taken; the rest get the database's clock
+    insert_header = """
+        INSERT INTO orders (customer_id, employee_id, order_date, subtotal, tax_rate,
+                            tax_amount, total_amount, status, notes)
+        VALUES {}
+    """
+    row = "(%s, %s, COALESCE(%s, CURRENT_TIMESTAMP), %s, %s, %s, %s, %s, %s)"
+    if _bulk_insert_ids['step'] == 1:
+        cursor.execute(insert_header.format(', '.join([row] * len(headers))),
+                       [value for header in headers for value in header])
+        first = first_insert_id(cursor, len(headers))
+        order_ids = list(range(first, first + len(headers)))
+    else:
+        order_ids = []
+        for header in headers:
+            cursor.execute(insert_header.format(row), header)
+            order_ids.append(cursor.lastrowid)
+
+    cursor.executemany("""
+        INSERT INTO order_details (order_id, pizza_id, quantity, unit_price, subtotal)
+        VALUES (%s, %s, %s, %s, %s)
+    """, [(order_id,) + line for order_id, (_, lines) in zip(order_ids, chunk) for line in lines])
+
+    placeholders = ', '.join(['%s'] * len(order_ids))
+    cursor.execute(f"SELECT order_id, order_date FROM orders WHERE order_id IN ({placeholders})", order_ids)
+    order_dates = {row['order_id']: row['order_date'] for row in cursor.fetchall()}
+
+    daily = {}
+    quantities = {}
+    for order_id, total_amount, (_, lines) in zip(order_ids, totals, chunk):
+        sales_date = order_dates[order_id].date()
+        count, total = daily.get(sales_date, (0, 0))
+        daily[sales_date] = (count + 1, round(total + total_amount, 2))
+        for pizza_id, quantity, _, _ in lines:
+            quantities[pizza_id] = quantities.get(pizza_id, 0) + quantity
+    _add_rollup_totals(cursor, daily, {'Pending': (len(order_ids), round(sum(totals), 2))}, quantities)
+    return order_ids
+
+def create_orders_bulk(orders):
+    """
+    Create many orders at once, BULK_ORDER_CHUNK_SIZE orders per transaction
+    orders: list of dicts with customer_id, employee_id, items (list of
+    (pizza_id, quantity) tuples) and optional tax_rate, notes and order_date.
+    Customers, employees and prices for the whole batch are checked with one
+    query each. Returns one result per order, in order: the new order_id, or a
+    message saying why that order was not created
+    """
+    db = get_db()
+    if not db:
+        return ['Database unavailable'] * len(orders)
+
+    chunk_size = int(os.getenv('BULK_ORDER_CHUNK_SIZE', 100))
+    results = [None] * len(orders)
+    valid = []
+    cursor = db.cursor()
+    try:
+        customers = _existing_ids(cursor, 'customers', 'customer_id', {o['customer_id'] for o in orders})
+        employees = _existing_ids(cursor, 'employees', 'employee_id',
+                                  {o['employee_id'] for o in orders}, 'active = TRUE')
+        prices = _fetch_prices(cursor, {item[0] for o in orders for item in o['items']})
+        db.rollback()  # end the read snapshot; each chunk below is its own transaction
+
+        for index, order in enumerate(orders):
+            try:
+                if order['customer_id'] not in customers:
+                    raise ValueError(f"Customer {order['customer_id']} not found")
+                if order['employee_id'] not in employees:
+                    raise ValueError(f"Employee {order['employee_id']} not found or inactive")
+                valid.append((index, order, _price_lines(prices, order['items'])))
+            except ValueError as e:
+                results[index] = str(e)
+
+        for start in range(0, len(valid), chunk_size):
+            chunk = valid[start:start + chunk_size]
+            try:
+                order_ids = _insert_order_chunk(cursor, [(order, lines) for _, order, lines in chunk])
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                print(f"Error creating orders {chunk[0][0]}-{chunk[-1][0]}: {e}")
+                for index, _, _ in chunk:
+                    results[index] = "Order could not be saved; please retry"
+                continue
+            for (index, _, _), order_id in zip(chunk, order_ids):
+                results[index] = order_id
+    finally:
+        cursor.close()
+
+    if any(isinstance(result, int) for result in results):
+        note_write()
+        invalidate_counts('orders')
+        invalidate(DASHBOARD_STATS_CACHE)
+    return results
+
+def update_order_status(order_id, status, version=None):
+    """
+    Update order status (and move its total between the status rollups)
+    With `version`, raises StaleVersionError if the order has changed since
+    """
     db = get_db()
     if not db:
         return False
 
+    begin_write(db)
     cursor = db.cursor()
-    cursor.execute("""
-        UPDATE orders SET status = %s WHERE order_id = %s
-    """, (status, order_id))
+    cursor.execute(
+        "SELECT status, total_amount, version FROM orders WHERE order_id = %s" + for_update(db),
+        (order_id,)
+    )
+    order = cursor.fetchone()
+    if not order or (version is not None and order['version'] != int(version)):
+        return _update_missed(db, cursor, get_order_by_id, order_id)
+
+    if order['status'] != status:
+        cursor.execute("""
+            UPDATE orders SET status = %s, version = version + 1 WHERE order_id = %s
+        """, (status, order_id))
+        _add_rollup_totals(cursor, {}, {order['status']: (-1, -order['total_amount']),
+                                        status: (1, order['total_amount'])}, {})
     db.commit()
+    note_write()
+    invalidate(DASHBOARD_STATS_CACHE)
     cursor.close()
     return True
 
+# Statuses each status may move to through update_order_statuses (the kitchen's
+# bulk action); finished orders stay finished
+ORDER_STATUS_TRANSITIONS = {
+    'Pending': ('In Progress', 'Completed', 'Cancelled'),
+    'In Progress': ('Completed', 'Cancelled'),
+    'Completed': (),
+    'Cancelled': (),
+}
+
+def update_order_statuses(order_ids, status):
+    """
+    Move many orders to `status` in one transaction, set-based
+    Only orders whose current status may move to `status` (see
+    ORDER_STATUS_TRANSITIONS) change; the check is part of the SQL. Returns the
+    sorted order_ids that changed, or None if the database is unavailable.
+    Raises ValueError for an unknown status
+    """
+    if status not in ORDER_STATUS_TRANSITIONS:
+        raise ValueError(f"Unknown status '{status}'")
+    sources = [source for source, targets in ORDER_STATUS_TRANSITIONS.items() if status in targets]
+    order_ids = sorted(set(order_ids))
+    if not order_ids or not sources:
+        return []
+
+    db = get_db()
+    if not db:
+        return None
+
+    id_placeholders = ', '.join(['%s'] * len(order_ids))
+    source_placeholders = ', '.join(['%s'] * len(sources))
+    begin_write(db)
+    cursor = db.cursor()
+    try:
+        # Lock the orders that will move and read their totals for the status rollups
+        cursor.execute(f"""
+            SELECT order_id, status, total_amount FROM orders
+            WHERE order_id IN ({id_placeholders}) AND status IN ({source_placeholders})
+        """ + for_update(db), order_ids + sources)
+        moving = cursor.fetchall()
+        if moving:
+            changed = [row['order_id'] for row in moving]
+            cursor.execute(f"""
+                UPDATE orders SET status = %s, version = version + 1
+                WHERE order_id IN ({', '.join(['%s'] * len(changed))}) AND status IN ({source_placeholders})
+            """, [status] + changed + sources)
+
+            statuses = {status: (len(moving), sum(row['total_amount'] for row in moving))}
+            for row in moving:
+                count, total = statuses.get(row['status'], (0, 0))
+                statuses[row['status']] = (count - 1, total - row['total_amount'])
+            _add_rollup_totals(cursor, {}, statuses, {})
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    if not moving:
+        return []
+    note_write()
+    invalidate(DASHBOARD_STATS_CACHE)
+    return sorted(changed)
+
 def delete_order(order_id):
-    """Delete an order (and its details due to CASCADE)"""
+    """Delete an order (and its details due to CASCADE), removing it from the rollups"""
     db = get_db()
     if not db:
         return False
 
+    begin_write(db)
     cursor = db.cursor()
-    cursor.execute("DELETE FROM orders WHERE order_id = %s", (order_id,))
+    cursor.execute(
+        "SELECT order_date, status, total_amount FROM orders WHERE order_id = %s" + for_update(db),
+        (order_id,)
+    )
+    order = cursor.fetchone()
+    if order:
+        cursor.execute("""
+            SELECT pizza_id, SUM(quantity) as quantity
+            FROM order_details WHERE order_id = %s
+            GROUP BY pizza_id
+        """, (order_id,))
+        pizza_quantities = [(row['pizza_id'], row['quantity']) for row in cursor.fetchall()]
+        _adjust_rollups(cursor, order['order_date'].date(), order['status'],
+                        order['total_amount'], pizza_quantities, -1)
+        cursor.execute("DELETE FROM orders WHERE order_id = %s", (order_id,))
     db.commit()
+    note_write()
+    invalidate_counts('orders')
+    invalidate(DASHBOARD_STATS_CACHE)
     cursor.close()
     return True
 
 # ==================== DASHBOARD ANALYTICS ====================
 
+DASHBOARD_STATS_CACHE = 'dashboard_stats'
+
 def get_dashboard_stats():
-    """Get dashboard statistics"""
-    db = get_db()
+    """
+    Get dashboard statistics, shared by every dashboard view in this worker
+    for DASHBOARD_CACHE_SECONDS or until an order or customer changes
+    """
+    ttl = float(os.getenv('DASHBOARD_CACHE_SECONDS', 10))
+    return get_or_compute(DASHBOARD_STATS_CACHE, _compute_dashboard_stats, ttl)
+
+@retry_on_disconnect
+def _compute_dashboard_stats():
+    """
+    Get dashboard statistics in a single round trip. Sales figures come from
+    the rollup tables kept up to date by the order functions, so the cost
+    does not grow with order history; the order totals are summed from the
+    few status rollup rows
+    """
+    db = get_batch_read_db()
     if not db:
         return {}
 
     cursor = db.cursor()
-
-    # Total sales
-    cursor.execute("SELECT COALESCE(SUM(total_amount), 0) as total_sales FROM orders")
-    total_sales = cursor.fetchone()['total_sales']
-
-    # Total orders
-    cursor.execute("SELECT COUNT(*) as total_orders FROM orders")
-    total_orders = cursor.fetchone()['total_orders']
-
-    # Total customers
-    cursor.execute("SELECT COUNT(*) as total_customers FROM customers")
-    total_customers = cursor.fetchone()['total_customers']
-
-    # Pending orders
-    cursor.execute("SELECT COUNT(*) as pending_orders FROM orders WHERE status = 'Pending'")
-    pending_orders = cursor.fetchone()['pending_orders']
-
-    # Recent orders (last 5)
-    cursor.execute("""
+    customer_totals, recent_orders, top_pizzas, sales_by_status = fetch_result_sets(cursor, [
+        # Total customers
+        "SELECT COUNT(*) as total_customers FROM customers",
+        # Recent orders (last 5)
+        """
         SELECT o.order_id, o.order_date, o.total_amount, o.status,
                c.first_name, c.last_name
         FROM orders o
         JOIN customers c ON o.customer_id = c.customer_id
-        ORDER BY o.order_date DESC
+        ORDER BY o.order_date DESC, o.order_id DESC
         LIMIT 5
-    """)
-    recent_orders = cursor.fetchall()
-
-    # Top selling pizzas
-    cursor.execute("""
-        SELECT p.name, p.size, SUM(od.quantity) as total_sold
-        FROM order_details od
-        JOIN pizzas p ON od.pizza_id = p.pizza_id
-        GROUP BY p.pizza_id, p.name, p.size
-        ORDER BY total_sold DESC
+        """,
+        # Top selling pizzas
+        """
+        SELECT p.name, p.size, r.quantity_sold as total_sold
+        FROM rollup_pizza_sales r
+        JOIN pizzas p ON r.pizza_id = p.pizza_id
+        WHERE r.quantity_sold > 0
+        ORDER BY r.quantity_sold DESC
         LIMIT 5
-    """)
-    top_pizzas = cursor.fetchall()
-
-    # Sales by status
-    cursor.execute("""
-        SELECT status, COUNT(*) as count, COALESCE(SUM(total_amount), 0) as total
-        FROM orders
-        GROUP BY status
-    """)
-    sales_by_status = cursor.fetchall()
-
+        """,
+        # Sales by status - also the source of total sales, total and pending orders
+        """
+        SELECT status, order_count as count, total_amount as total
+        FROM rollup_status_sales
+        WHERE order_count > 0
+        ORDER BY status
+        """,
+    ])
     cursor.close()
 
     return {
-        'total_sales': float(total_sales),
-        'total_orders': total_orders,
-        'total_customers': total_customers,
-        'pending_orders': pending_orders,
+        'total_sales': float(sum(row['total'] for row in sales_by_status)),
+        'total_orders': sum(row['count'] for row in sales_by_status),
+        'total_customers': customer_totals[0]['total_customers'],
+        'pending_orders': next((row['count'] for row in sales_by_status if row['status'] == 'Pending'), 0),
         'recent_orders': recent_orders,
         'top_pizzas': top_pizzas,
         'sales_by_status': sales_by_status
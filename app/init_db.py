@@ -1,35 +1,277 @@
 """
 Database initialization script for Pizza Management System
 Creates five tables: employees, customers, pizzas, orders, order_details
+plus the dashboard rollup tables maintained by db_service, the
+cache_versions table used for cross-worker cache invalidation and the
+order_idempotency_keys table that lets clients retry order creation safely
+Works with either backend selected by DB_BACKEND (mysql or sqlite)
+
+Usage: python app/init_db.py                   (drop, recreate and seed everything)
+       python app/init_db.py --rebuild-rollups (create missing rollup tables and
+                                                recompute them from orders)
+       python app/init_db.py --upgrade         (add any missing support tables,
+                                                columns and indexes, leaving existing
+                                                data alone; new rollup tables are
+                                                backfilled from orders)
 """
 
-import pymysql
 import os
+import sys
 from dotenv import load_dotenv
 from werkzeug.security import generate_password_hash
 
+# Allow running as `python app/init_db.py` from the project root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db_backend import connect, get_sqlite_path, is_sqlite
+from app.passwords import get_hash_method
+
 load_dotenv()
 
-# Database connection configuration
-DB_CONFIG = {
-    'host': os.getenv('DB_HOST'),
-    'user': os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD'),
-    'database': os.getenv('DB_NAME'),
-}
+# SQLite version of the schema below; types map onto SQLite affinities and
+# updated_at is not maintained automatically (nothing in the app reads it)
+SQLITE_SCHEMA = """
+DROP TABLE IF EXISTS order_idempotency_keys;
+DROP TABLE IF EXISTS cache_versions;
+DROP TABLE IF EXISTS rollup_pizza_sales;
+DROP TABLE IF EXISTS rollup_status_sales;
+DROP TABLE IF EXISTS rollup_daily_sales;
+DROP TABLE IF EXISTS order_details;
+DROP TABLE IF EXISTS orders;
+DROP TABLE IF EXISTS pizzas;
+DROP TABLE IF EXISTS customers;
+DROP TABLE IF EXISTS employees;
+
+CREATE TABLE employees (
+    employee_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    phone VARCHAR(20),
+    role VARCHAR(50) NOT NULL,
+    password_hash VARCHAR(255) NOT NULL,
+    hire_date DATE NOT NULL,
+    active BOOLEAN DEFAULT TRUE,
+    version INTEGER NOT NULL DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_employees_active ON employees (active);
+CREATE INDEX idx_employees_name ON employees (last_name, first_name);
+
+CREATE TABLE customers (
+    customer_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    first_name VARCHAR(50) NOT NULL,
+    last_name VARCHAR(50) NOT NULL,
+    email VARCHAR(100) UNIQUE NOT NULL,
+    phone VARCHAR(20) NOT NULL,
+    address VARCHAR(255) NOT NULL,
+    city VARCHAR(100) NOT NULL,
+    state VARCHAR(2) NOT NULL,
+    zip_code VARCHAR(10) NOT NULL,
+    archived BOOLEAN DEFAULT FALSE,
+    version INTEGER NOT NULL DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_customers_last_name ON customers (last_name);
+CREATE INDEX idx_customers_archived ON customers (archived);
+CREATE INDEX idx_customers_archived_name ON customers (archived, last_name, first_name);
+
+CREATE TABLE pizzas (
+    pizza_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name VARCHAR(100) NOT NULL,
+    description TEXT,
+    size VARCHAR(20) NOT NULL,
+    base_price DECIMAL(10, 2) NOT NULL,
+    category VARCHAR(50) NOT NULL,
+    available BOOLEAN DEFAULT TRUE,
+    archived BOOLEAN DEFAULT FALSE,
+    version INTEGER NOT NULL DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_pizzas_category ON pizzas (category);
+CREATE INDEX idx_pizzas_available ON pizzas (available);
+CREATE INDEX idx_pizzas_archived ON pizzas (archived);
+CREATE INDEX idx_pizzas_archived_sort ON pizzas (archived, category, name, size);
+
+CREATE TABLE orders (
+    order_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id INTEGER NOT NULL REFERENCES customers(customer_id) ON DELETE RESTRICT,
+    employee_id INTEGER NOT NULL REFERENCES employees(employee_id) ON DELETE RESTRICT,
+    order_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    subtotal DECIMAL(10, 2) NOT NULL,
+    tax_rate DECIMAL(5, 4) NOT NULL DEFAULT 0.0700,
+    tax_amount DECIMAL(10, 2) NOT NULL,
+    total_amount DECIMAL(10, 2) NOT NULL,
+    status VARCHAR(50) NOT NULL DEFAULT 'Pending',
+    notes TEXT,
+    version INTEGER NOT NULL DEFAULT 1,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_orders_customer ON orders (customer_id);
+CREATE INDEX idx_orders_employee ON orders (employee_id);
+CREATE INDEX idx_orders_status ON orders (status);
+-- Secondary indexes end with the row id, so this also serves the (order_date, order_id) page seek
+CREATE INDEX idx_orders_order_date ON orders (order_date);
+
+CREATE TABLE order_details (
+    detail_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id INTEGER NOT NULL REFERENCES orders(order_id) ON DELETE CASCADE,
+    pizza_id INTEGER NOT NULL REFERENCES pizzas(pizza_id) ON DELETE RESTRICT,
+    quantity INTEGER NOT NULL DEFAULT 1,
+    unit_price DECIMAL(10, 2) NOT NULL,
+    subtotal DECIMAL(10, 2) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_order_details_order ON order_details (order_id);
+CREATE INDEX idx_order_details_pizza ON order_details (pizza_id);
+"""
+
+# Dashboard rollups: running totals that db_service adjusts in the same
+# transaction as every order insert, status change and delete, so the
+# dashboard never has to aggregate the whole order history
+SQLITE_ROLLUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_daily_sales (
+    sales_date DATE PRIMARY KEY,
+    order_count INTEGER NOT NULL DEFAULT 0,
+    total_sales DECIMAL(14, 2) NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rollup_status_sales (
+    status VARCHAR(50) PRIMARY KEY,
+    order_count INTEGER NOT NULL DEFAULT 0,
+    total_amount DECIMAL(14, 2) NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS rollup_pizza_sales (
+    pizza_id INTEGER PRIMARY KEY REFERENCES pizzas(pizza_id) ON DELETE CASCADE,
+    quantity_sold INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_pizza_sales_quantity ON rollup_pizza_sales (quantity_sold);
+"""
+
+MYSQL_ROLLUP_TABLES = [
+    """
+    CREATE TABLE IF NOT EXISTS rollup_daily_sales (
+        sales_date DATE PRIMARY KEY,
+        order_count INT NOT NULL DEFAULT 0,
+        total_sales DECIMAL(14, 2) NOT NULL DEFAULT 0
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rollup_status_sales (
+        status VARCHAR(50) PRIMARY KEY,
+        order_count INT NOT NULL DEFAULT 0,
+        total_amount DECIMAL(14, 2) NOT NULL DEFAULT 0
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS rollup_pizza_sales (
+        pizza_id INT PRIMARY KEY,
+        quantity_sold INT NOT NULL DEFAULT 0,
+        FOREIGN KEY (pizza_id) REFERENCES pizzas(pizza_id) ON DELETE CASCADE,
+        INDEX idx_quantity_sold (quantity_sold)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+    """,
+]
+
+# Version counters bumped by db_service writes; each worker compares them with
+# the version of its in-memory copy (e.g. the menu index) to notice changes
+# made by other workers
+SQLITE_CACHE_VERSIONS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_versions (
+    name VARCHAR(50) PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+MYSQL_CACHE_VERSIONS_TABLE = """
+CREATE TABLE IF NOT EXISTS cache_versions (
+    name VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+# Idempotency keys sent with /orders/create, stored in the order's own
+# transaction so a retried request returns the original order instead of
+# creating a duplicate; rows older than IDEMPOTENCY_KEY_TTL_HOURS are purged
+SQLITE_IDEMPOTENCY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS order_idempotency_keys (
+    idempotency_key VARCHAR(100) PRIMARY KEY,
+    order_id INTEGER NOT NULL REFERENCES orders(order_id) ON DELETE CASCADE,
+    request_hash CHAR(64) NOT NULL,
+    created_at TIMESTAMP NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_order_idempotency_keys_created ON order_idempotency_keys (created_at);
+"""
+
+MYSQL_IDEMPOTENCY_TABLE = """
+CREATE TABLE IF NOT EXISTS order_idempotency_keys (
+    idempotency_key VARCHAR(100) PRIMARY KEY,
+    order_id INT NOT NULL,
+    request_hash CHAR(64) NOT NULL,
+    created_at TIMESTAMP NOT NULL,
+    FOREIGN KEY (order_id) REFERENCES orders(order_id) ON DELETE CASCADE,
+    INDEX idx_created_at (created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
+"""
+
+# Recompute every rollup from the base tables
+REBUILD_ROLLUPS = [
+    "DELETE FROM rollup_daily_sales",
+    "DELETE FROM rollup_status_sales",
+    "DELETE FROM rollup_pizza_sales",
+    """
+    INSERT INTO rollup_daily_sales (sales_date, order_count, total_sales)
+    SELECT DATE(order_date), COUNT(*), COALESCE(SUM(total_amount), 0)
+    FROM orders GROUP BY DATE(order_date)
+    """,
+    """
+    INSERT INTO rollup_status_sales (status, order_count, total_amount)
+    SELECT status, COUNT(*), COALESCE(SUM(total_amount), 0)
+    FROM orders GROUP BY status
+    """,
+    """
+    INSERT INTO rollup_pizza_sales (pizza_id, quantity_sold)
+    SELECT pizza_id, SUM(quantity)
+    FROM order_details GROUP BY pizza_id
+    """,
+]
 
 def get_connection():
     """Get database connection"""
-    return pymysql.connect(**DB_CONFIG)
+    return connect()
+
+def create_sqlite_tables():
+    """Create all tables in the embedded SQLite database"""
+    conn = get_connection()
+    try:
+        print("Creating SQLite tables...")
+        # executescript commits first and runs the DDL in one go
+        conn.executescript(SQLITE_SCHEMA + SQLITE_ROLLUP_SCHEMA + SQLITE_CACHE_VERSIONS_SCHEMA
+                           + SQLITE_IDEMPOTENCY_SCHEMA)
+        conn.commit()
+        print("All tables created successfully!")
+    finally:
+        conn.close()
 
 def create_tables():
     """Create all database tables"""
+    if is_sqlite():
+        return create_sqlite_tables()
+
     conn = get_connection()
     cursor = conn.cursor()
 
     try:
         # Drop existing tables (in reverse order of dependencies)
         print("Dropping existing tables...")
+        cursor.execute("DROP TABLE IF EXISTS order_idempotency_keys")
+        cursor.execute("DROP TABLE IF EXISTS cache_versions")
+        cursor.execute("DROP TABLE IF EXISTS rollup_pizza_sales")
+        cursor.execute("DROP TABLE IF EXISTS rollup_status_sales")
+        cursor.execute("DROP TABLE IF EXISTS rollup_daily_sales")
         cursor.execute("DROP TABLE IF EXISTS order_details")
         cursor.execute("DROP TABLE IF EXISTS orders")
         cursor.execute("DROP TABLE IF EXISTS pizzas")
@@ -49,10 +291,12 @@ def create_tables():
                 password_hash VARCHAR(255) NOT NULL,
                 hire_date DATE NOT NULL,
                 active BOOLEAN DEFAULT TRUE,
+                version INT NOT NULL DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 INDEX idx_email (email),
-                INDEX idx_active (active)
+                INDEX idx_active (active),
+                INDEX idx_name (last_name, first_name)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
         """)
 
@@ -70,11 +314,13 @@ def create_tables():
                 state VARCHAR(2) NOT NULL,
                 zip_code VARCHAR(10) NOT NULL,
                 archived BOOLEAN DEFAULT FALSE,
+                version INT NOT NULL DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 INDEX idx_email (email),
                 INDEX idx_last_name (last_name),
-                INDEX idx_archived (archived)
+                INDEX idx_archived (archived),
+                INDEX idx_archived_name (archived, last_name, first_name)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
         """)
 
@@ -90,11 +336,13 @@ def create_tables():
                 category VARCHAR(50) NOT NULL,
                 available BOOLEAN DEFAULT TRUE,
                 archived BOOLEAN DEFAULT FALSE,
+                version INT NOT NULL DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 INDEX idx_category (category),
                 INDEX idx_available (available),
-                INDEX idx_archived (archived)
+                INDEX idx_archived (archived),
+                INDEX idx_archived_sort (archived, category, name, size)
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
         """)
 
@@ -112,6 +360,7 @@ def create_tables():
                 total_amount DECIMAL(10, 2) NOT NULL,
                 status VARCHAR(50) NOT NULL DEFAULT 'Pending',
                 notes TEXT,
+                version INT NOT NULL DEFAULT 1,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                 FOREIGN KEY (customer_id) REFERENCES customers(customer_id) ON DELETE RESTRICT,
@@ -141,6 +390,19 @@ def create_tables():
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4
         """)
 
+        # Create dashboard rollup tables
+        print("Creating rollup tables...")
+        for statement in MYSQL_ROLLUP_TABLES:
+            cursor.execute(statement)
+
+        # Create cache version counters
+        print("Creating cache_versions table...")
+        cursor.execute(MYSQL_CACHE_VERSIONS_TABLE)
+
+        # Create order idempotency keys
+        print("Creating order_idempotency_keys table...")
+        cursor.execute(MYSQL_IDEMPOTENCY_TABLE)
+
         conn.commit()
         print("All tables created successfully!")
 
@@ -152,6 +414,144 @@ def create_tables():
         cursor.close()
         conn.close()
 
+ROLLUP_TABLES = ['rollup_daily_sales', 'rollup_status_sales', 'rollup_pizza_sales']
+
+def table_exists(cursor, table):
+    """Check whether a table exists in the current database"""
+    if is_sqlite():
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = %s", (table,))
+    else:
+        cursor.execute("""
+            SELECT table_name FROM information_schema.tables
+            WHERE table_schema = DATABASE() AND table_name = %s
+        """, (table,))
+    return cursor.fetchone() is not None
+
+def create_rollup_tables():
+    """
+    Create the rollup tables if they are missing (for databases created before
+    them). Returns True if any table was created, since new rollups start
+    empty and must be rebuilt from the existing orders
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        missing = [table for table in ROLLUP_TABLES if not table_exists(cursor, table)]
+        if is_sqlite():
+            conn.executescript(SQLITE_ROLLUP_SCHEMA)
+        else:
+            for statement in MYSQL_ROLLUP_TABLES:
+                cursor.execute(statement)
+        conn.commit()
+        return bool(missing)
+    finally:
+        cursor.close()
+        conn.close()
+
+def create_cache_versions_table():
+    """Create the cache_versions table if it is missing (for databases created before it)"""
+    conn = get_connection()
+    try:
+        if is_sqlite():
+            conn.executescript(SQLITE_CACHE_VERSIONS_SCHEMA)
+        else:
+            cursor = conn.cursor()
+            cursor.execute(MYSQL_CACHE_VERSIONS_TABLE)
+            cursor.close()
+        conn.commit()
+    finally:
+        conn.close()
+
+def create_idempotency_table():
+    """Create the order_idempotency_keys table if it is missing (for databases created before it)"""
+    conn = get_connection()
+    try:
+        if is_sqlite():
+            conn.executescript(SQLITE_IDEMPOTENCY_SCHEMA)
+        else:
+            cursor = conn.cursor()
+            cursor.execute(MYSQL_IDEMPOTENCY_TABLE)
+            cursor.close()
+        conn.commit()
+    finally:
+        conn.close()
+
+# Tables whose rows carry a version number for optimistic concurrency: every
+# update bumps it, and edits based on an older version are refused
+VERSIONED_TABLES = ['employees', 'customers', 'pizzas', 'orders']
+
+def add_version_columns():
+    """Add the row version column to tables created before it"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        for table in VERSIONED_TABLES:
+            if is_sqlite():
+                cursor.execute(f"PRAGMA table_info({table})")
+                columns = [row['name'] for row in cursor.fetchall()]
+            else:
+                cursor.execute(f"SHOW COLUMNS FROM {table}")
+                columns = [row['Field'] for row in cursor.fetchall()]
+            if 'version' not in columns:
+                print(f"Adding version column to {table}...")
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN version INT NOT NULL DEFAULT 1")
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+# Composite indexes behind keyset pagination and sorted listings:
+# (table, MySQL index name, SQLite index name, columns)
+KEYSET_INDEXES = [
+    ('employees', 'idx_name', 'idx_employees_name', 'last_name, first_name'),
+    ('customers', 'idx_archived_name', 'idx_customers_archived_name', 'archived, last_name, first_name'),
+    ('pizzas', 'idx_archived_sort', 'idx_pizzas_archived_sort', 'archived, category, name, size'),
+]
+
+def create_keyset_indexes():
+    """Add the keyset pagination indexes to tables created before them"""
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        for table, mysql_name, sqlite_name, columns in KEYSET_INDEXES:
+            if is_sqlite():
+                cursor.execute(f"CREATE INDEX IF NOT EXISTS {sqlite_name} ON {table} ({columns})")
+                continue
+            # MySQL has no CREATE INDEX IF NOT EXISTS
+            cursor.execute("""
+                SELECT index_name FROM information_schema.statistics
+                WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s
+            """, (table, mysql_name))
+            if not cursor.fetchone():
+                print(f"Adding {mysql_name} index to {table}...")
+                cursor.execute(f"CREATE INDEX {mysql_name} ON {table} ({columns})")
+        conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+def rebuild_rollups():
+    """
+    Recompute the dashboard rollups from orders and order_details in one
+    transaction. Use it to backfill after creating the tables or after
+    loading orders directly into the database; run it while the app is idle
+    """
+    conn = get_connection()
+    cursor = conn.cursor()
+    try:
+        print("Rebuilding dashboard rollups...")
+        for statement in REBUILD_ROLLUPS:
+            cursor.execute(statement)
+        conn.commit()
+        print("Rollups rebuilt successfully!")
+    except Exception as e:
+        conn.rollback()
+        print(f"Error rebuilding rollups: {e}")
+        raise
+    finally:
+        cursor.close()
+        conn.close()
+
 def insert_sample_data():
     """Insert sample data for testing"""
     conn = get_connection()
@@ -161,9 +561,9 @@ def insert_sample_data():
         # Insert sample employees
         print("Inserting sample employees...")
         employees = [
-            ('John', 'Manager', 'john.manager@pizzashop.com', '555-0101', 'Manager', generate_password_hash('password123'), '2024-01-01'),
-            ('Sarah', 'Smith', 'sarah.smith@pizzashop.com', '555-0102', 'Cashier', generate_password_hash('password123'), '2024-02-15'),
-            ('Mike', 'Johnson', 'mike.johnson@pizzashop.com', '555-0103', 'Chef', generate_password_hash('password123'), '2024-03-01'),
+            ('John', 'Manager', 'john.manager@pizzashop.com', '555-0101', 'Manager', generate_password_hash('password123', get_hash_method()), '2024-01-01'),
+            ('Sarah', 'Smith', 'sarah.smith@pizzashop.com', '555-0102', 'Cashier', generate_password_hash('password123', get_hash_method()), '2024-02-15'),
+            ('Mike', 'Johnson', 'mike.johnson@pizzashop.com', '555-0103', 'Chef', generate_password_hash('password123', get_hash_method()), '2024-03-01'),
         ]
         cursor.executemany("""
             INSERT INTO employees (first_name, last_name, email, phone, role, password_hash, hire_date)
@@ -252,6 +652,8 @@ def insert_sample_data():
 
         conn.commit()
         print("Sample data inserted successfully!")
+        # The sample orders were inserted directly, so derive the rollups
+        rebuild_rollups()
 
     except Exception as e:
         conn.rollback()
@@ -266,6 +668,31 @@ def main():
     print("=" * 60)
     print("Pizza Management System - Database Initialization")
     print("=" * 60)
+    if is_sqlite():
+        print(f"Backend: SQLite ({get_sqlite_path()})")
+
+    if '--rebuild-rollups' in sys.argv[1:]:
+        try:
+            create_rollup_tables()
+            rebuild_rollups()
+        except Exception as e:
+            print(f"\nError rebuilding rollups: {e}")
+            return 1
+        return 0
+
+    if '--upgrade' in sys.argv[1:]:
+        try:
+            if create_rollup_tables():
+                rebuild_rollups()
+            create_cache_versions_table()
+            create_idempotency_table()
+            add_version_columns()
+            create_keyset_indexes()
+            print("Database schema is up to date.")
+        except Exception as e:
+            print(f"\nError upgrading database: {e}")
+            return 1
+        return 0
 
     try:
         create_tables()
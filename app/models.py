@@ -1,29 +1,37 @@
-from flask_login import UserMixin
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.passwords import hash_password, verify_password
 from datetime import datetime
 
-class Employee(UserMixin):
-    """Employee model for authentication and management"""
+# Models use __slots__ so large result lists do not carry a __dict__ per row.
+# Constructor arguments follow the column order of the db_service SELECTs, so
+# rows from a positional (tuple) cursor map straight onto Model(*row).
+# `version` is the row version used for optimistic concurrency; it is None
+# for rows read by queries that do not select it.
+
+class EmployeePrincipal:
+    """
+    The signed-in employee as Flask-Login sees it: everything but the
+    password hash, so it can be cached between requests (see db_principal)
+    """
 
-    def __init__(self, employee_id, first_name, last_name, email, phone, role, password_hash=None, hire_date=None, active=True):
-        self.id = employee_id
+    __slots__ = ('employee_id', 'first_name', 'last_name', 'email', 'phone', 'role',
+                 'hire_date', 'active', 'version')
+
+    def __init__(self, employee_id, first_name, last_name, email, phone, role, hire_date=None, active=True,
+                 version=None):
         self.employee_id = employee_id
         self.first_name = first_name
         self.last_name = last_name
         self.email = email
         self.phone = phone
         self.role = role
-        self.password_hash = password_hash
         self.hire_date = hire_date
         self.active = active
+        self.version = version
 
-    def set_password(self, password):
-        """Hash and set the password"""
-        self.password_hash = generate_password_hash(password)
-
-    def check_password(self, password):
-        """Check if the provided password matches the hash"""
-        return check_password_hash(self.password_hash, password)
+    @property
+    def id(self):
+        """Alias of employee_id"""
+        return self.employee_id
 
     def get_id(self):
         """Required by Flask-Login"""
@@ -34,6 +42,23 @@ class Employee(UserMixin):
         """Required by Flask-Login"""
         return self.active
 
+    @property
+    def is_authenticated(self):
+        """Required by Flask-Login (same as flask_login.UserMixin)"""
+        return self.is_active
+
+    @property
+    def is_anonymous(self):
+        """Required by Flask-Login"""
+        return False
+
+    def __eq__(self, other):
+        if isinstance(other, EmployeePrincipal):
+            return self.get_id() == other.get_id()
+        return NotImplemented
+
+    __hash__ = object.__hash__
+
     @property
     def full_name(self):
         """Return the employee's full name"""
@@ -42,11 +67,33 @@ class Employee(UserMixin):
     def __repr__(self):
         return f'<Employee {self.first_name} {self.last_name}>'
 
+class Employee(EmployeePrincipal):
+    """Employee model for authentication and management"""
+
+    __slots__ = ('password_hash',)
+
+    def __init__(self, employee_id, first_name, last_name, email, phone, role, password_hash=None, hire_date=None, active=True,
+                 version=None):
+        super().__init__(employee_id, first_name, last_name, email, phone, role, hire_date, active, version)
+        self.password_hash = password_hash
+
+    def set_password(self, password):
+        """Hash and set the password (in the hashing pool; may raise PasswordHasherBusy)"""
+        self.password_hash = hash_password(password)
+
+    def check_password(self, password):
+        """Check if the provided password matches the hash (in the hashing pool)"""
+        return verify_password(self.password_hash, password)
+
 
 class Customer:
     """Customer model"""
 
-    def __init__(self, customer_id, first_name, last_name, email, phone, address, city, state, zip_code, created_at=None):
+    __slots__ = ('customer_id', 'first_name', 'last_name', 'email', 'phone', 'address',
+                 'city', 'state', 'zip_code', 'created_at', 'version')
+
+    def __init__(self, customer_id, first_name, last_name, email, phone, address, city, state, zip_code, created_at=None,
+                 version=None):
         self.customer_id = customer_id
         self.first_name = first_name
         self.last_name = last_name
@@ -57,6 +104,7 @@ class Customer:
         self.state = state
         self.zip_code = zip_code
         self.created_at = created_at
+        self.version = version
 
     @property
     def full_name(self):
@@ -75,7 +123,11 @@ class Customer:
 class Pizza:
     """Pizza model"""
 
-    def __init__(self, pizza_id, name, description, size, base_price, category, available=True, created_at=None):
+    __slots__ = ('pizza_id', 'name', 'description', 'size', 'base_price', 'category',
+                 'available', 'created_at', 'version')
+
+    def __init__(self, pizza_id, name, description, size, base_price, category, available=True, created_at=None,
+                 version=None):
         self.pizza_id = pizza_id
         self.name = name
         self.description = description
@@ -84,6 +136,7 @@ class Pizza:
         self.category = category
         self.available = available
         self.created_at = created_at
+        self.version = version
 
     def __repr__(self):
         return f'<Pizza {self.name} ({self.size})>'
@@ -92,7 +145,13 @@ class Pizza:
 class Order:
     """Order model"""
 
-    def __init__(self, order_id, customer_id, employee_id, order_date, subtotal, tax_rate, tax_amount, total_amount, status, notes=None):
+    __slots__ = ('order_id', 'customer_id', 'employee_id', 'order_date', 'subtotal',
+                 'tax_rate', 'tax_amount', 'total_amount', 'status', 'notes',
+                 # Optional join fields filled in by order listings
+                 'customer_name', 'employee_name', 'version')
+
+    def __init__(self, order_id, customer_id, employee_id, order_date, subtotal, tax_rate, tax_amount, total_amount, status, notes=None,
+                 customer_name=None, employee_name=None, version=None):
         self.order_id = order_id
         self.customer_id = customer_id
         self.employee_id = employee_id
@@ -103,6 +162,9 @@ class Order:
         self.total_amount = float(total_amount)
         self.status = status
         self.notes = notes
+        self.customer_name = customer_name
+        self.employee_name = employee_name
+        self.version = version
 
     def calculate_tax(self):
         """Calculate tax amount based on subtotal and tax rate"""
@@ -121,13 +183,19 @@ class Order:
 class OrderDetail:
     """Order Detail model - represents individual pizzas in an order"""
 
-    def __init__(self, detail_id, order_id, pizza_id, quantity, unit_price, subtotal):
+    __slots__ = ('detail_id', 'order_id', 'pizza_id', 'quantity', 'unit_price', 'subtotal',
+                 # Optional join fields filled in from the pizzas table
+                 'pizza_name', 'pizza_size')
+
+    def __init__(self, detail_id, order_id, pizza_id, quantity, unit_price, subtotal, pizza_name=None, pizza_size=None):
         self.detail_id = detail_id
         self.order_id = order_id
         self.pizza_id = pizza_id
         self.quantity = int(quantity)
         self.unit_price = float(unit_price)
         self.subtotal = float(subtotal)
+        self.pizza_name = pizza_name
+        self.pizza_size = pizza_size
 
     def calculate_subtotal(self):
         """Calculate subtotal for this line item"""
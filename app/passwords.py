@@ -0,0 +1,153 @@
+"""
+Password hashing off the request threads
+Werkzeug's password hashes (scrypt by default) are deliberately slow and hold
+the GIL while they run, so a burst of logins at shift change would stall
+every other request in the worker. Hashing and verification run instead in a
+small process pool (PASSWORD_HASH_WORKERS processes, 0 to hash inline). At
+most PASSWORD_HASH_QUEUE_LIMIT jobs may wait for a free process; beyond that,
+or when a job takes longer than PASSWORD_HASH_TIMEOUT seconds, the caller
+gets PasswordHasherBusy and should ask the user to try again.
+
+New hashes use PASSWORD_HASH_METHOD (any Werkzeug method string, e.g.
+"scrypt:32768:8:1" or "pbkdf2:sha256:600000"). needs_rehash() tells the login
+route when a stored hash was made with other parameters, so it is upgraded
+the next time its owner signs in.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+_pool = {'pid': None, 'executor': None, 'slots': None}
+_pool_lock = threading.Lock()
+
+_hash_stats = {
+    'hashed': 0,
+    'verified': 0,
+    'rejected_busy': 0,
+    'timeouts': 0,
+    'time_total': 0.0,
+}
+_hash_stats_lock = threading.Lock()
+
+
+class PasswordHasherBusy(Exception):
+    """The password hashing pool is saturated or did not answer in time"""
+
+    def __init__(self):
+        super().__init__("The server is busy signing people in. Please try again in a moment.")
+
+
+def get_hash_method():
+    """Werkzeug method string used for new password hashes"""
+    return os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+
+
+def _workers():
+    """Processes in the hashing pool (0 hashes on the calling thread)"""
+    return int(os.getenv('PASSWORD_HASH_WORKERS', min(2, os.cpu_count() or 1)))
+
+
+def _queue_limit():
+    """Jobs that may wait for a free hashing process"""
+    return int(os.getenv('PASSWORD_HASH_QUEUE_LIMIT', 16))
+
+
+def _timeout():
+    """Seconds a caller waits for its hash before giving up"""
+    return float(os.getenv('PASSWORD_HASH_TIMEOUT', 5))
+
+
+def _normalized_method(method):
+    """
+    Expand a Werkzeug method string to the full form written into hashes,
+    e.g. "scrypt" -> "scrypt:32768:8:1"
+    """
+    name, *args = method.split(':')
+    if name == 'scrypt' and not args:
+        return 'scrypt:32768:8:1'
+    if name == 'pbkdf2':
+        hash_name = args[0] if args else 'sha256'
+        iterations = args[1] if len(args) > 1 else DEFAULT_PBKDF2_ITERATIONS
+        return f"pbkdf2:{hash_name}:{iterations}"
+    return method
+
+
+def _get_executor():
+    """Return this process's hashing pool and its slot semaphore, creating them on first use"""
+    pid = os.getpid()
+    if _pool['pid'] != pid:
+        with _pool_lock:
+            if _pool['pid'] != pid:
+                workers = _workers()
+                _pool['executor'] = None
+                if workers > 0:
+                    # spawn: forking a threaded server can copy locks held by other threads
+                    _pool['executor'] = ProcessPoolExecutor(
+                        max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+                _pool['slots'] = threading.BoundedSemaphore(workers + _queue_limit())
+                _pool['pid'] = pid
+    return _pool['executor'], _pool['slots']
+
+
+def _run(func, *args):
+    """Run func(*args) in the hashing pool, bounded by the queue limit and timeout"""
+    executor, slots = _get_executor()
+    started = time.monotonic()
+    if executor is None:
+        result = func(*args)
+    else:
+        if not slots.acquire(blocking=False):
+            with _hash_stats_lock:
+                _hash_stats['rejected_busy'] += 1
+            raise PasswordHasherBusy()
+        try:
+            future = executor.submit(func, *args)
+        except Exception:
+            slots.release()
+            raise
+        # The slot stays taken until the process has really finished the job
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            result = future.result(timeout=_timeout())
+        except FutureTimeoutError:
+            future.cancel()
+            with _hash_stats_lock:
+                _hash_stats['timeouts'] += 1
+            raise PasswordHasherBusy() from None
+    with _hash_stats_lock:
+        _hash_stats['hashed' if func is generate_password_hash else 'verified'] += 1
+        _hash_stats['time_total'] += time.monotonic() - started
+    return result
+
+
+def hash_password(password):
+    """Hash a password with the configured method"""
+    return _run(generate_password_hash, password, get_hash_method())
+
+
+def verify_password(password_hash, password):
+    """Check a password against a stored hash"""
+    if not password_hash or password is None:
+        return False
+    return _run(check_password_hash, password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """Check whether a stored hash was made with other parameters than the configured ones"""
+    return password_hash.split('$', 1)[0] != _normalized_method(get_hash_method())
+
+
+def get_password_stats():
+    """Return hashing pool counters"""
+    with _hash_stats_lock:
+        stats = dict(_hash_stats)
+    jobs = stats['hashed'] + stats['verified']
+    stats['avg_ms'] = round(stats.pop('time_total') / jobs * 1000, 2) if jobs else 0.0
+    stats['workers'] = _workers()
+    return stats
@@ -1,6 +1,13 @@
-from flask import render_template, redirect, url_for
-from flask_login import current_user
+from flask import render_template, redirect, url_for, jsonify
+from flask_login import current_user, login_required
 from . import app
+from .db_cache import get_cache_stats
+from .db_coalesce import get_coalesce_stats
+from .db_connect import get_database_health, get_pool_stats, get_request_stats, is_database_available
+from .db_menu import get_menu_stats
+from .db_principal import get_principal_stats
+from .db_router import get_router_stats
+from .passwords import get_password_stats
 
 @app.route('/')
 def index():
@@ -12,3 +19,30 @@ def index():
 @app.route('/about')
 def about():
     return render_template('about.html')
+
+@app.route('/db-stats')
+@login_required
+def db_stats():
+    """Connection pool, read routing and result cache counters for tuning"""
+    return jsonify({
+        'pool': get_pool_stats(),
+        'requests': get_request_stats(),
+        'reads': get_router_stats(),
+        'cache': get_cache_stats(),
+        'coalescing': get_coalesce_stats(),
+        'menu': get_menu_stats(),
+        'principals': get_principal_stats(),
+        'passwords': get_password_stats(),
+    })
+
+@app.route('/healthz')
+def healthz():
+    """Liveness probe - the worker is up; reports breaker state without querying MySQL"""
+    return jsonify({'status': 'ok', 'database': get_database_health()})
+
+@app.route('/readyz')
+def readyz():
+    """Readiness probe - 503 while the database circuit breaker is open"""
+    ready = is_database_available()
+    body = {'status': 'ready' if ready else 'unavailable', 'database': get_database_health()}
+    return jsonify(body), 200 if ready else 503
@@ -0,0 +1,76 @@
+"""
+Streaming responses for pages and exports too large to build in memory
+Templates are rendered chunk by chunk while rows are still arriving from the
+database, so the first bytes go out immediately and worker memory does not
+grow with the number of rows.
+"""
+
+import zlib
+
+from flask import Response, get_flashed_messages, request, stream_template, stream_with_context
+
+# Jinja yields a string per template statement; group them into writes of
+# about this many characters instead of sending each one separately
+STREAM_CHUNK_SIZE = 16 * 1024
+
+
+def buffered(chunks, size=STREAM_CHUNK_SIZE):
+    """Join small string chunks into pieces of roughly `size` characters"""
+    pending = []
+    pending_size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size >= size:
+            yield ''.join(pending)
+            pending = []
+            pending_size = 0
+    if pending:
+        yield ''.join(pending)
+
+
+def gzip_stream(chunks, level=6):
+    """Gzip string chunks on the fly, yielding compressed bytes as they fill up"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def client_accepts_gzip():
+    """Check whether the current request's Accept-Encoding allows gzip"""
+    return request.accept_encodings['gzip'] > 0
+
+
+def stream_download(chunks, mimetype, filename):
+    """
+    Stream string chunks as a file download, gzipped when the client accepts it
+    The generator is consumed inside the request context while the body is sent
+    """
+    body = buffered(stream_with_context(chunks))
+    compress = client_accepts_gzip()
+    response = Response(gzip_stream(body) if compress else body, mimetype=mimetype)
+    if compress:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def stream_page(template_name, **context):
+    """
+    Render a template as a streamed HTML response
+    Pass generators (e.g. db_service.iter_orders()) in `context`; they are
+    consumed while the page is sent, inside the request context
+    """
+    # The session cookie is written before the body streams, so take the
+    # flashed messages out of the session now; the template reads them from
+    # the request's cache and they are not shown again on the next page
+    get_flashed_messages(with_categories=True)
+    response = Response(buffered(stream_template(template_name, **context)), mimetype='text/html')
+    # Ask nginx-style proxies not to hold the whole body before forwarding it
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
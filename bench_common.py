@@ -0,0 +1,70 @@
+"""
+Shared setup for the bench_*.py scripts: pointing the app at a scratch
+database before it is imported, and seeding a simple dataset
+"""
+
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+STATUSES = ['Pending', 'In Progress', 'Completed', 'Completed', 'Cancelled']
+SEED_BATCH = 50_000
+
+
+def configure_backend(backend):
+    """Point the app at a scratch database before it is imported"""
+    os.environ['DB_BACKEND'] = backend
+    if backend == 'sqlite':
+        os.environ['SQLITE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='bench_'), 'bench.sqlite3')
+        return os.environ['SQLITE_PATH']
+    scratch = os.getenv('BENCH_DB_NAME')
+    if not scratch:
+        sys.exit("Set BENCH_DB_NAME to a scratch MySQL database (its tables are dropped).")
+    os.environ['DB_NAME'] = scratch
+    return f"mysql database {scratch}"
+
+
+def seed(conn, orders, customers=1000, employees=10):
+    """Recreate the schema and fill it with `orders` orders of two line items each"""
+    from app.init_db import create_tables, rebuild_rollups
+    create_tables()
+
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO employees (first_name, last_name, email, phone, role, password_hash, hire_date) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+        [(f"Emp{i}", 'Staff', f"e{i}@bench.test", '555-0100', 'Staff', 'x', '2024-01-01') for i in range(employees)]
+    )
+    cursor.executemany(
+        "INSERT INTO customers (first_name, last_name, email, phone, address, city, state, zip_code) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+        [(f"First{i}", f"Last{i}", f"c{i}@bench.test", '555-0100', '1 Main St', 'Milledgeville', 'GA', '31061')
+         for i in range(customers)]
+    )
+    cursor.executemany(
+        "INSERT INTO pizzas (name, description, size, base_price, category) VALUES (%s, %s, %s, %s, %s)",
+        [(f"Pizza{i}", None, size, 10 + i, 'Classic') for i in range(5) for size in ('Small', 'Medium', 'Large')]
+    )
+    conn.commit()
+
+    rng = random.Random(42)
+    start = datetime(2024, 1, 1)
+    for batch_start in range(0, orders, SEED_BATCH):
+        batch = range(batch_start, min(batch_start + SEED_BATCH, orders))
+        cursor.executemany(
+            "INSERT INTO orders (order_id, customer_id, employee_id, order_date, subtotal, tax_rate, "
+            "tax_amount, total_amount, status) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)",
+            [(i + 1, rng.randint(1, customers), rng.randint(1, employees),
+              start + timedelta(minutes=i), 25.98, 0.07, 1.82, 27.80, rng.choice(STATUSES)) for i in batch]
+        )
+        cursor.executemany(
+            "INSERT INTO order_details (order_id, pizza_id, quantity, unit_price, subtotal) "
+            "VALUES (%s, %s, %s, %s, %s)",
+            [(i + 1, rng.randint(1, 15), q, 12.99, 12.99 * q) for i in batch for q in (1, 2)]
+        )
+        conn.commit()
+    cursor.close()
+    # Orders were inserted directly, bypassing create_order
+    rebuild_rollups()
@@ -0,0 +1,100 @@
+"""
+Benchmark: order creation latency by order size
+Compares the original create_order (one INSERT per line item, client-supplied
+prices) with the current one (prices looked up in one IN query, all line items
+in one multi-row INSERT) for 1, 10 and 200-line orders.
+
+Runs on a throwaway SQLite database by default. SQLite is in-process, so the
+saved round trips show up far more on MySQL; point BENCH_DB_NAME at a scratch
+database to measure there - its tables are dropped and recreated:
+    BENCH_DB_NAME=pizza_bench python bench_create_order.py --backend mysql
+
+Usage: python bench_create_order.py [--lines 1 10 200] [--repeat 50]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+from bench_common import configure_backend, seed
+
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+
+def create_order_before(customer_id, employee_id, order_items, tax_rate=0.0700, notes=None):
+    """create_order as it was: one INSERT per line item, prices from the caller"""
+    from app.db_connect import get_db
+    from app.db_service import _adjust_rollups
+    db = get_db()
+    cursor = db.cursor()
+    subtotal = sum(item[1] * item[2] for item in order_items)
+    tax_amount = round(subtotal * tax_rate, 2)
+    total_amount = round(subtotal + tax_amount, 2)
+    cursor.execute("""
+        INSERT INTO orders (customer_id, employee_id, subtotal, tax_rate, tax_amount, total_amount, status, notes)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, (customer_id, employee_id, subtotal, tax_rate, tax_amount, total_amount, 'Pending', notes))
+    order_id = cursor.lastrowid
+    for pizza_id, quantity, unit_price in order_items:
+        cursor.execute("""
+            INSERT INTO order_details (order_id, pizza_id, quantity, unit_price, subtotal)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (order_id, pizza_id, quantity, unit_price, round(quantity * unit_price, 2)))
+    cursor.execute("SELECT order_date FROM orders WHERE order_id = %s", (order_id,))
+    order_date = cursor.fetchone()['order_date']
+    _adjust_rollups(cursor, order_date.date(), 'Pending', total_amount,
+                    [(pizza_id, quantity) for pizza_id, quantity, _ in order_items], 1)
+    db.commit()
+    cursor.close()
+    return order_id
+
+
+def make_items(lines):
+    """`lines` line items spread over the 15 seeded pizzas"""
+    return [(1 + i % 15, 1 + i % 3, 10.0 + i % 5) for i in range(lines)]
+
+
+def measure(func, items, repeat):
+    """Return (p50 ms, p95 ms) for creating `repeat` orders"""
+    from app import app
+    timings = []
+    with app.test_request_context():
+        func(1, 1, items)  # warm the pool and the statement caches
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func(1, 1, items)
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[max(int(len(timings) * 0.95) - 1, 0)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, nargs='+', default=[1, 10, 200])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--backend', choices=['sqlite', 'mysql'], default='sqlite')
+    args = parser.parse_args()
+
+    print(f"Using {configure_backend(args.backend)}")
+    from app.db_backend import connect
+    from app.db_service import create_order
+
+    conn = connect()
+    seed(conn, orders=1000)
+    conn.close()
+
+    print(f"\n{'lines':>6}  {'version':<8}{'trips':>7}{'p50 ms':>10}{'p95 ms':>10}")
+    print("-" * 43)
+    for lines in args.lines:
+        items = make_items(lines)
+        p50_before, p95_before = measure(create_order_before, items, args.repeat)
+        p50_after, p95_after = measure(create_order, items, args.repeat)
+        # Statements sent before COMMIT: the old version paid one per line item
+        print(f"{lines:>6}  {'before':<8}{lines + 5:>7}{p50_before:>10.2f}{p95_before:>10.2f}")
+        print(f"{'':>6}  {'after':<8}{7:>7}{p50_after:>10.2f}{p95_after:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark: dashboard statistics latency
+Compares the original get_dashboard_stats (seven sequential queries over the
+full order history) with the current one (four queries in one round trip on
+MySQL, reading the rollup tables) at several order-history sizes.
+
+Runs on a throwaway SQLite database by default. To measure against MySQL,
+where the saved round trips matter most, point BENCH_DB_NAME at a scratch
+database - its tables are dropped and recreated:
+    BENCH_DB_NAME=pizza_bench python bench_dashboard.py --backend mysql
+
+Usage: python bench_dashboard.py [--orders 10000 1000000] [--repeat 20]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from bench_common import configure_backend, seed
+
+def dashboard_stats_before():
+    """get_dashboard_stats as it was: seven queries, one round trip each"""
+    from app.db_router import get_read_db
+    db = get_read_db()
+    cursor = db.cursor()
+    cursor.execute("SELECT COALESCE(SUM(total_amount), 0) as total_sales FROM orders")
+    total_sales = cursor.fetchone()['total_sales']
+    cursor.execute("SELECT COUNT(*) as total_orders FROM orders")
+    total_orders = cursor.fetchone()['total_orders']
+    cursor.execute("SELECT COUNT(*) as total_customers FROM customers")
+    total_customers = cursor.fetchone()['total_customers']
+    cursor.execute("SELECT COUNT(*) as pending_orders FROM orders WHERE status = 'Pending'")
+    pending_orders = cursor.fetchone()['pending_orders']
+    cursor.execute("""
+        SELECT o.order_id, o.order_date, o.total_amount, o.status, c.first_name, c.last_name
+        FROM orders o JOIN customers c ON o.customer_id = c.customer_id
+        ORDER BY o.order_date DESC LIMIT 5
+    """)
+    recent_orders = cursor.fetchall()
+    cursor.execute("""
+        SELECT p.name, p.size, SUM(od.quantity) as total_sold
+        FROM order_details od JOIN pizzas p ON od.pizza_id = p.pizza_id
+        GROUP BY p.pizza_id, p.name, p.size ORDER BY total_sold DESC LIMIT 5
+    """)
+    top_pizzas = cursor.fetchall()
+    cursor.execute("""
+        SELECT status, COUNT(*) as count, COALESCE(SUM(total_amount), 0) as total
+        FROM orders GROUP BY status
+    """)
+    sales_by_status = cursor.fetchall()
+    cursor.close()
+    return {
+        'total_sales': float(total_sales), 'total_orders': total_orders,
+        'total_customers': total_customers, 'pending_orders': pending_orders,
+        'recent_orders': recent_orders, 'top_pizzas': top_pizzas, 'sales_by_status': sales_by_status,
+    }
+
+
+def measure(func, repeat):
+    """Return (p50 ms, p95 ms, result of the last call)"""
+    from app import app
+    timings = []
+    result = None
+    with app.test_request_context():
+        func()  # warm the pool and the page cache
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95) - 1], result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, nargs='+', default=[10_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--backend', choices=['sqlite', 'mysql'], default='sqlite')
+    args = parser.parse_args()
+
+    print(f"Using {configure_backend(args.backend)}")
+    from app.db_backend import connect
+    from app.db_service import get_dashboard_stats
+    # Statements sent per call: MySQL gets the current version's four as one batch
+    round_trips_after = 4 if args.backend == 'sqlite' else 1
+
+    print(f"\n{'orders':>10}  {'version':<8}{'trips':>9}{'p50 ms':>10}{'p95 ms':>10}")
+    print("-" * 49)
+    for orders in args.orders:
+        conn = connect()
+        seed(conn, orders)
+        conn.close()
+
+        p50_before, p95_before, before = measure(dashboard_stats_before, args.repeat)
+        p50_after, p95_after, after = measure(get_dashboard_stats, args.repeat)
+        for key in ('total_sales', 'total_orders', 'total_customers', 'pending_orders'):
+            assert round(before[key], 2) == round(after[key], 2), f"{key} differs: {before[key]} vs {after[key]}"
+
+        print(f"{orders:>10,}  {'before':<8}{7:>9}{p50_before:>10.1f}{p95_before:>10.1f}")
+        print(f"{'':>10}  {'after':<8}{round_trips_after:>9}{p50_after:>10.1f}{p95_after:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,355 @@
+"""
+Benchmark: every db_service function, with a regression gate
+Seeds a database at each --orders size with generate_data.py, then calls
+every public db_service function --repeat times: the getters, the iter_*
+generators (read to the end), every create, update, delete and restore,
+and get_dashboard_stats, create_order and the bulk functions at several
+sizes. Rows a delete or restore acts on are created untimed before each
+call. For every call it records the latency and the queries and rows that
+went over the connection. The figures are saved as JSON so they can be
+compared across commits.
+
+Statements are counted per execute() (per round trip on MySQL, where
+PyMySQL splits executemany into batched INSERTs). Rows are counted as they
+are fetched. Functions served from a worker cache (the menu index, the
+dashboard cache) run no queries once warm; get_dashboard_stats is measured
+both cold and cached.
+
+With --baseline, each function's p50 is compared with the saved run. The
+script exits with status 1 when a function is more than --threshold slower
+(and at least --min-delta-ms) or issues more queries than before.
+
+Runs on a throwaway SQLite database by default; for MySQL see bench_dashboard.py.
+
+Usage: python bench_db_service.py [--orders 1000 100000] [--repeat 50]
+                                  [--output results.json]
+                                  [--baseline old.json] [--threshold 0.25]
+"""
+
+import argparse
+import functools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from argparse import Namespace
+from datetime import date, datetime, timezone
+
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from bench_common import configure_backend
+
+RESULTS_DIR = 'bench_results'
+
+_io = {'queries': 0, 'rows': 0}
+
+
+# ==================== QUERY AND ROW COUNTING ====================
+
+def _count_execute(method):
+    """Wrap a cursor execute method so each call counts as one query"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        _io['queries'] += 1
+        return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _count_fetch(method, single=False):
+    """Wrap a cursor fetch method so the rows it returns are counted"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        if single:
+            _io['rows'] += result is not None
+        elif result:
+            _io['rows'] += len(result)
+        return result
+    return wrapper
+
+
+def install_io_counters():
+    """Count queries and fetched rows on every cursor class db_service uses"""
+    import pymysql.cursors
+    from app.db_backend import SQLiteCursor
+
+    SQLiteCursor.execute = _count_execute(SQLiteCursor.execute)
+    SQLiteCursor.executemany = _count_execute(SQLiteCursor.executemany)
+    # pymysql's executemany calls execute once per statement it sends
+    pymysql.cursors.Cursor.execute = _count_execute(pymysql.cursors.Cursor.execute)
+    for cls in (SQLiteCursor, pymysql.cursors.Cursor, pymysql.cursors.SSCursor):
+        cls.fetchone = _count_fetch(cls.fetchone, single=True)
+        cls.fetchmany = _count_fetch(cls.fetchmany)
+        cls.fetchall = _count_fetch(cls.fetchall)
+
+
+# ==================== CASES ====================
+
+def build_cases(size):
+    """
+    Return [(name, setup, call)] for one seeded dataset. setup() runs
+    untimed before each call, e.g. to drop a cache or to create the row
+    that the call deletes
+    """
+    from collections import deque
+    from app import db_service as s
+    from app.db_cache import invalidate
+    from app.passwords import hash_password
+    from generate_data import pizza_rows
+
+    customers, orders = size['customers'], size['orders']
+    order_id = max(1, orders // 2)
+    items = [(pizza_id, 1 + pizza_id % 2) for pizza_id in range(1, 21)]
+    counter = iter(range(10 ** 9))
+    nothing = lambda: None
+    cold_dashboard = lambda: invalidate(s.DASHBOARD_STATS_CACHE)
+    drain = lambda rows: deque(rows, maxlen=0)
+    password_hash = hash_password('password123')
+    menu_name, _, menu_size, _, _ = next(pizza_rows())
+    idempotency_key, request_hash = 'bench-idempotent-order', '0' * 64
+    # Id(s) created by the last setup(), for the call that follows it
+    target = {}
+
+    def created(create):
+        """A setup() that creates a row with create() and remembers its id"""
+        return lambda: target.update(id=create())
+
+    def new_employee():
+        return s.create_employee('Bench', 'Employee', f"bench.employee.{next(counter)}@bench.test", None,
+                                 'Staff', 'password123', date(2024, 1, 1))
+
+    def new_customer():
+        return s.create_customer('Bench', 'Customer', f"bench.customer.{next(counter)}@bench.test",
+                                 '555-0100', '1 Main St', 'Milledgeville', 'GA', '31061')
+
+    def new_pizza():
+        return s.create_pizza(f"Bench Pizza {next(counter)}", None, 'Large', 12.99, 'Classic')
+
+    def archived_pizza():
+        pizza_id = new_pizza()
+        s.delete_pizza(pizza_id)
+        return pizza_id
+
+    def bulk_orders(count):
+        return [{'customer_id': 1 + i % customers, 'employee_id': 1, 'items': items[i % 18:i % 18 + 3]}
+                for i in range(count)]
+
+    def keyed_order():
+        if 'keyed_order' not in target:
+            target['keyed_order'] = s.create_order(1, 1, items[:1], idempotency_key=idempotency_key,
+                                                   request_hash=request_hash)
+
+    bulk_10, bulk_100 = bulk_orders(10), bulk_orders(100)
+
+    return [
+        # Employees
+        ('get_employee_by_id', nothing, lambda: s.get_employee_by_id(1)),
+        ('get_employee_by_email', nothing, lambda: s.get_employee_by_email('john.manager@pizzashop.com')),
+        ('get_all_employees', nothing, s.get_all_employees),
+        ('get_employees_page', nothing, s.get_employees_page),
+        ('create_employee', nothing, new_employee),
+        ('update_employee', nothing, lambda: s.update_employee(
+            1, 'John', 'Manager', 'john.manager@pizzashop.com', f"555-{next(counter) % 10000:04d}", 'Manager', True)),
+        ('update_employee_password', nothing, lambda: s.update_employee_password(1, password_hash)),
+        ('delete_employee', created(new_employee), lambda: s.delete_employee(target['id'])),
+        # Customers
+        ('get_all_customers', nothing, s.get_all_customers),
+        ('iter_customers', nothing, lambda: drain(s.iter_customers())),
+        ('get_customers_page', nothing, s.get_customers_page),
+        ('get_customer_by_id', nothing, lambda: s.get_customer_by_id(customers // 2 or 1)),
+        ('create_customer', nothing, new_customer),
+        ('update_customer', nothing, lambda: s.update_customer(
+            1, 'Bench', 'Customer', 'bench.regular@bench.test', f"555-{next(counter) % 10000:04d}",
+            '1 Main St', 'Milledgeville', 'GA', '31061')),
+        ('delete_customer', created(new_customer), lambda: s.delete_customer(target['id'])),
+        # Pizzas
+        ('get_all_pizzas', nothing, s.get_all_pizzas),
+        ('get_available_pizzas', nothing, s.get_available_pizzas),
+        ('get_pizza_by_id', nothing, lambda: s.get_pizza_by_id(1)),
+        ('get_pizza_by_name_size', nothing, lambda: s.get_pizza_by_name_size(menu_name, menu_size)),
+        ('get_pizzas_by_category', nothing, s.get_pizzas_by_category),
+        ('get_pizzas_page', nothing, s.get_pizzas_page),
+        ('get_archived_pizzas', nothing, s.get_archived_pizzas),
+        ('create_pizza', nothing, new_pizza),
+        ('update_pizza', nothing, lambda: s.update_pizza(
+            36, 'Mediterranean', 'Feta, olives, artichokes, sun-dried tomato', 'Large',
+            18.49 + next(counter) % 2, 'Vegetarian', True)),
+        ('delete_pizza', created(new_pizza), lambda: s.delete_pizza(target['id'])),
+        ('restore_pizza', created(archived_pizza), lambda: s.restore_pizza(target['id'])),
+        ('permanently_delete_pizza', created(new_pizza), lambda: s.permanently_delete_pizza(target['id'])),
+        # Orders
+        ('get_all_orders', nothing, s.get_all_orders),
+        ('iter_orders', nothing, lambda: drain(s.iter_orders())),
+        ('iter_order_export', nothing, lambda: drain(s.iter_order_export())),
+        ('get_orders_page', nothing, s.get_orders_page),
+        ('get_order_by_id', nothing, lambda: s.get_order_by_id(order_id)),
+        ('get_order_details', nothing, lambda: s.get_order_details(order_id)),
+        ('get_idempotent_order', keyed_order, lambda: s.get_idempotent_order(idempotency_key, request_hash)),
+        ('create_order[1 line]', nothing, lambda: s.create_order(1, 1, items[:1])),
+        ('create_order[5 lines]', nothing, lambda: s.create_order(1, 1, items[:5])),
+        ('create_order[20 lines]', nothing, lambda: s.create_order(1, 1, items[:20])),
+        ('create_orders_bulk[10 orders]', nothing, lambda: s.create_orders_bulk(bulk_10)),
+        ('create_orders_bulk[100 orders]', nothing, lambda: s.create_orders_bulk(bulk_100)),
+        ('update_order_status', nothing, lambda: s.update_order_status(
+            order_id, ('Pending', 'In Progress')[next(counter) % 2])),
+        ('update_order_statuses[20 orders]', created(lambda: s.create_orders_bulk(bulk_orders(20))),
+         lambda: s.update_order_statuses(target['id'], 'In Progress')),
+        ('delete_order', created(lambda: s.create_order(1, 1, items[:3])), lambda: s.delete_order(target['id'])),
+        # Dashboard
+        ('get_dashboard_stats[cold]', cold_dashboard, s.get_dashboard_stats),
+        ('get_dashboard_stats[cached]', nothing, s.get_dashboard_stats),
+    ]
+
+
+def measure(setup, call, repeat):
+    """Run one case; returns latency percentiles and per-call queries and rows"""
+    from app import app
+    timings = []
+    queries = rows = 0
+    # A fresh request per case, so writes in one case do not make the next
+    # one read-your-writes sticky
+    with app.test_request_context():
+        setup()
+        call()  # warm the pool, caches and the page cache
+        for _ in range(repeat):
+            setup()
+            before = dict(_io)
+            start = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - start) * 1000)
+            queries += _io['queries'] - before['queries']
+            rows += _io['rows'] - before['rows']
+    timings.sort()
+    return {
+        'p50_ms': round(statistics.median(timings), 4),
+        'p95_ms': round(timings[max(0, int(len(timings) * 0.95) - 1)], 4),
+        'p99_ms': round(timings[max(0, int(len(timings) * 0.99) - 1)], 4),
+        'mean_ms': round(statistics.fmean(timings), 4),
+        'max_ms': round(timings[-1], 4),
+        'queries': round(queries / repeat, 2),
+        'rows': round(rows / repeat, 2),
+    }
+
+
+def seed_dataset(orders, seed):
+    """Recreate the database with `orders` generated orders; returns its size"""
+    import generate_data
+    from app.db_cache import invalidate
+    from app.db_menu import invalidate_menu
+    from app.db_pagination import invalidate_counts
+    from app.db_service import DASHBOARD_STATS_CACHE
+
+    size = {'orders': orders, 'customers': max(100, orders // 20), 'employees': 25}
+    generate_data.generate(Namespace(
+        customers=size['customers'], employees=size['employees'], orders=orders, days=365,
+        end='2025-01-01', seed=seed, batch_size=50_000, method='executemany'))
+    # The tables were replaced underneath this process's caches
+    invalidate_menu()
+    invalidate(DASHBOARD_STATS_CACHE)
+    for table in ('employees', 'customers', 'pizzas', 'orders'):
+        invalidate_counts(table)
+    return size
+
+
+# ==================== REPORTING ====================
+
+def git_commit():
+    """Short hash of the checked-out commit, or None outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold, min_delta_ms):
+    """Return (size, case, message) for every regression against the baseline"""
+    regressions = []
+    for size, cases in results['results'].items():
+        for name, now in cases.items():
+            before = baseline.get('results', {}).get(size, {}).get(name)
+            if before is None:
+                continue
+            slower = now['p50_ms'] - before['p50_ms']
+            if slower > min_delta_ms and now['p50_ms'] > before['p50_ms'] * (1 + threshold):
+                regressions.append((size, name, f"p50 {before['p50_ms']:.3f} -> {now['p50_ms']:.3f} ms"))
+            if now['queries'] > before['queries']:
+                regressions.append((size, name, f"queries {before['queries']:g} -> {now['queries']:g}"))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, nargs='+', default=[1_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--backend', choices=['sqlite', 'mysql'], default='sqlite')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--only', help='run only the functions whose name contains this text')
+    parser.add_argument('--output', help=f'JSON results file (default: {RESULTS_DIR}/<commit>.json)')
+    parser.add_argument('--baseline', help='earlier JSON results to compare with')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='allowed p50 slowdown as a fraction (default: 0.25)')
+    parser.add_argument('--min-delta-ms', type=float, default=0.05,
+                        help='ignore slowdowns smaller than this many milliseconds (default: 0.05)')
+    args = parser.parse_args()
+
+    print(f"Using {configure_backend(args.backend)}")
+    # Cheap hashes inline, so create_employee measures the database work
+    os.environ['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+    os.environ['PASSWORD_HASH_WORKERS'] = '0'
+    install_io_counters()
+
+    commit = git_commit()
+    results = {
+        'meta': {
+            'commit': commit,
+            'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'backend': args.backend,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': {},
+    }
+
+    for orders in args.orders:
+        size = seed_dataset(orders, args.seed)
+        label = str(orders)
+        results['results'][label] = {}
+        print(f"\n{orders:,} orders, {size['customers']:,} customers")
+        print(f"{'function':<34}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>9}{'rows':>10}")
+        print("-" * 83)
+        for name, setup, call in build_cases(size):
+            if args.only and args.only not in name:
+                continue
+            stats = measure(setup, call, args.repeat)
+            results['results'][label][name] = stats
+            print(f"{name:<34}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}{stats['p99_ms']:>10.3f}"
+                  f"{stats['queries']:>9g}{stats['rows']:>10g}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'results'}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+        print(f"Compared with {args.baseline} ({baseline['meta'].get('commit')}): "
+              f"{len(regressions)} regression(s)")
+        for size, name, message in regressions:
+            print(f"  ✗ {name} at {int(size):,} orders: {message}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
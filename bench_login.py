@@ -0,0 +1,98 @@
+"""
+Benchmark: login throughput and its effect on other requests
+Runs a burst of concurrent logins (as at shift change) while another thread
+keeps calling a cheap endpoint, first with passwords hashed on the request
+threads (PASSWORD_HASH_WORKERS=0, the original behaviour) and then in the
+hashing process pool. Reports logins per second and the latency of the cheap
+requests that had to share the worker with them.
+
+Runs on a throwaway SQLite database.
+
+Usage: python bench_login.py [--logins 40] [--threads 8] [--workers 2]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from bench_common import configure_backend, seed
+
+PASSWORD = 'password123'
+
+
+def login(app, email):
+    """Sign in once with a fresh client; returns True on success"""
+    response = app.test_client().post('/auth/login', data={'email': email, 'password': PASSWORD})
+    return response.status_code == 302
+
+
+def run(app, emails, threads):
+    """Return (logins/s, p50 ms, p95 ms of /healthz during the burst)"""
+    done = threading.Event()
+    latencies = []
+
+    def probe():
+        client = app.test_client()
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get('/healthz')
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.005)
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda email: login(app, email), emails))
+    elapsed = time.perf_counter() - start
+    done.set()
+    prober.join()
+
+    assert all(results), "every login should succeed"
+    latencies.sort()
+    return len(emails) / elapsed, statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--logins', type=int, default=40)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=min(2, os.cpu_count() or 1),
+                        help='hashing processes for the pooled run')
+    args = parser.parse_args()
+
+    print(f"Using {configure_backend('sqlite')}")
+    from app import app, passwords
+    from app.db_backend import connect
+    from app.passwords import hash_password
+
+    conn = connect()
+    seed(conn, 0, customers=10, employees=args.threads)
+    cursor = conn.cursor()
+    os.environ['PASSWORD_HASH_WORKERS'] = '0'
+    cursor.execute("UPDATE employees SET password_hash = %s", (hash_password(PASSWORD),))
+    conn.commit()
+    cursor.close()
+    conn.close()
+    emails = [f"e{i % args.threads}@bench.test" for i in range(args.logins)]
+
+    print(f"\n{'hashing':<12}{'logins/s':>10}{'probe p50 ms':>14}{'probe p95 ms':>14}")
+    print("-" * 50)
+    for label, workers in (('inline', 0), (f'pool x{args.workers}', args.workers)):
+        os.environ['PASSWORD_HASH_WORKERS'] = str(workers)
+        os.environ['PASSWORD_HASH_QUEUE_LIMIT'] = str(args.logins)
+        passwords._pool['pid'] = None  # rebuild the pool for this run
+        login(app, emails[0])  # start the hashing processes
+        rate, p50, p95 = run(app, emails, args.threads)
+        print(f"{label:<12}{rate:>10.1f}{p50:>14.1f}{p95:>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
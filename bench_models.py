@@ -0,0 +1,197 @@
+"""
+Benchmark: row mapping for large db_service result lists
+Compares the old path (DictCursor rows -> dict-backed model objects) with the
+new one (tuple cursor rows -> __slots__ models) on the same rows.
+Runs on a throwaway embedded SQLite database so no server is needed.
+
+Usage: python bench_models.py [--rows 100000] [--repeat 3]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from itertools import starmap
+
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from app.db_backend import connect_sqlite, tuple_cursor
+from app.models import Customer, Order
+
+CUSTOMER_QUERY = """
+    SELECT customer_id, first_name, last_name, email, phone,
+           address, city, state, zip_code, created_at
+    FROM customers ORDER BY last_name, first_name
+"""
+
+ORDER_QUERY = """
+    SELECT o.order_id, o.customer_id, o.employee_id, o.order_date,
+           o.subtotal, o.tax_rate, o.tax_amount, o.total_amount, o.status, o.notes,
+           c.first_name as customer_first_name, c.last_name as customer_last_name,
+           e.first_name as employee_first_name, e.last_name as employee_last_name
+    FROM orders o
+    JOIN customers c ON o.customer_id = c.customer_id
+    JOIN employees e ON o.employee_id = e.employee_id
+    ORDER BY o.order_date DESC
+"""
+
+
+# ---- The models as they were before __slots__ (one __dict__ per object) ----
+
+class LegacyCustomer:
+    def __init__(self, customer_id, first_name, last_name, email, phone, address, city, state, zip_code, created_at=None):
+        self.customer_id = customer_id
+        self.first_name = first_name
+        self.last_name = last_name
+        self.email = email
+        self.phone = phone
+        self.address = address
+        self.city = city
+        self.state = state
+        self.zip_code = zip_code
+        self.created_at = created_at
+
+
+class LegacyOrder:
+    def __init__(self, order_id, customer_id, employee_id, order_date, subtotal, tax_rate, tax_amount, total_amount, status, notes=None):
+        self.order_id = order_id
+        self.customer_id = customer_id
+        self.employee_id = employee_id
+        self.order_date = order_date
+        self.subtotal = float(subtotal)
+        self.tax_rate = float(tax_rate)
+        self.tax_amount = float(tax_amount)
+        self.total_amount = float(total_amount)
+        self.status = status
+        self.notes = notes
+
+
+def seed(conn, rows):
+    """Create minimal customers/employees/orders tables with `rows` rows each"""
+    conn.executescript("""
+        CREATE TABLE customers (
+            customer_id INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT, email TEXT,
+            phone TEXT, address TEXT, city TEXT, state TEXT, zip_code TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE employees (employee_id INTEGER PRIMARY KEY, first_name TEXT, last_name TEXT);
+        CREATE TABLE orders (
+            order_id INTEGER PRIMARY KEY, customer_id INTEGER, employee_id INTEGER,
+            order_date TIMESTAMP, subtotal DECIMAL(10, 2), tax_rate DECIMAL(5, 4),
+            tax_amount DECIMAL(10, 2), total_amount DECIMAL(10, 2), status TEXT, notes TEXT);
+    """)
+    cursor = conn.cursor()
+    cursor.executemany(
+        "INSERT INTO customers (first_name, last_name, email, phone, address, city, state, zip_code) "
+        "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+        ((f"First{i}", f"Last{i % 5000}", f"c{i}@example.com", '555-0100',
+          f"{i} Main St", 'Milledgeville', 'GA', '31061') for i in range(rows))
+    )
+    cursor.executemany("INSERT INTO employees (first_name, last_name) VALUES (%s, %s)",
+                       [(f"Emp{i}", 'Staff') for i in range(20)])
+    cursor.executemany(
+        "INSERT INTO orders (customer_id, employee_id, order_date, subtotal, tax_rate, "
+        "tax_amount, total_amount, status) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+        ((i % rows + 1, i % 20 + 1, f"2025-01-01 {i % 24:02d}:{i % 60:02d}:00",
+          25.98, 0.07, 1.82, 27.80, 'Completed') for i in range(rows))
+    )
+    conn.commit()
+    cursor.close()
+
+
+# ---- The two mapping paths being compared ----
+
+def customers_before(conn):
+    cursor = conn.cursor()
+    cursor.execute(CUSTOMER_QUERY)
+    rows = cursor.fetchall()
+    cursor.close()
+    return [LegacyCustomer(**row) for row in rows]
+
+
+def customers_after(conn):
+    cursor = tuple_cursor(conn)
+    cursor.execute(CUSTOMER_QUERY)
+    rows = cursor.fetchall()
+    cursor.close()
+    return list(starmap(Customer, rows))
+
+
+def orders_before(conn):
+    cursor = conn.cursor()
+    cursor.execute(ORDER_QUERY)
+    rows = cursor.fetchall()
+    cursor.close()
+    orders = []
+    for row in rows:
+        order = LegacyOrder(
+            row['order_id'], row['customer_id'], row['employee_id'],
+            row['order_date'], row['subtotal'], row['tax_rate'],
+            row['tax_amount'], row['total_amount'], row['status'], row['notes']
+        )
+        order.customer_name = f"{row['customer_first_name']} {row['customer_last_name']}"
+        order.employee_name = f"{row['employee_first_name']} {row['employee_last_name']}"
+        orders.append(order)
+    return orders
+
+
+def orders_after(conn):
+    cursor = tuple_cursor(conn)
+    cursor.execute(ORDER_QUERY)
+    rows = cursor.fetchall()
+    cursor.close()
+    return [
+        Order(*row[:10], f"{row[10]} {row[11]}", f"{row[12]} {row[13]}")
+        for row in rows
+    ]
+
+
+def measure(func, conn, repeat):
+    """Return (best seconds, peak MB during the call, MB retained by the result)"""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func(conn)
+        best = min(best, time.perf_counter() - start)
+        del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = func(conn)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, peak / 2**20, retained / 2**20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix='bench_models_'), 'bench.sqlite3')
+    conn = connect_sqlite(path)
+    print(f"Seeding {args.rows:,} customers and orders into {path} ...")
+    seed(conn, args.rows)
+
+    print(f"\n{'case':<22}{'time (s)':>10}{'rows/s':>12}{'peak MB':>10}{'kept MB':>10}")
+    print("-" * 64)
+    for label, func in [
+        ('customers  before', customers_before),
+        ('customers  after', customers_after),
+        ('orders     before', orders_before),
+        ('orders     after', orders_after),
+    ]:
+        seconds, peak, retained = measure(func, conn, args.repeat)
+        print(f"{label:<22}{seconds:>10.3f}{args.rows / seconds:>12,.0f}{peak:>10.1f}{retained:>10.1f}")
+
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
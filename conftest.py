@@ -0,0 +1,108 @@
+"""
+Shared pytest setup for the test_*.py scripts
+Unless DB_BACKEND is set, tests run against a throwaway SQLite database
+seeded with the sample data, so no MySQL server is needed. Also provides the
+logged_in_client, query, orderable_pizza_ids, count_orders and
+rollups_match_orders fixtures; scripts run directly import the functions of
+the same names (login_client, run_query, ...) from here instead
+"""
+
+import os
+import tempfile
+import pytest
+from dotenv import load_dotenv
+
+load_dotenv()
+
+if not os.getenv('DB_BACKEND'):
+    os.environ['DB_BACKEND'] = 'sqlite'
+
+if os.environ['DB_BACKEND'] == 'sqlite':
+    # Never touch a developer's SQLITE_PATH database from the tests
+    os.environ['SQLITE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='pizza_test_'), 'pizza.sqlite3')
+
+    from app.init_db import create_tables, insert_sample_data
+    create_tables()
+    insert_sample_data()
+
+from app import app
+from app.db_backend import connect
+
+
+def login_client(employee_id=1):
+    """Test client with an employee (employee 1 by default) signed in"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(employee_id)
+        session['_fresh'] = True
+    return client
+
+
+def run_query(sql, params=()):
+    """Run a query on a fresh connection and return all rows"""
+    conn = connect()
+    cursor = conn.cursor()
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return rows
+
+
+def orderable_pizza_ids():
+    """Ids of the pizzas that can be ordered, lowest first"""
+    return [row['pizza_id'] for row in run_query(
+        "SELECT pizza_id FROM pizzas WHERE available = TRUE AND archived = FALSE ORDER BY pizza_id")]
+
+
+def count_orders():
+    """Count rows in orders and order_details, as an (orders, details) pair"""
+    return (run_query("SELECT COUNT(*) AS n FROM orders")[0]['n'],
+            run_query("SELECT COUNT(*) AS n FROM order_details")[0]['n'])
+
+
+def rollups_match_orders():
+    """Check the status, daily and pizza rollups against aggregates over orders"""
+    direct = {row['status']: (row['n'], round(float(row['total']), 2)) for row in run_query(
+        "SELECT status, COUNT(*) AS n, SUM(total_amount) AS total FROM orders GROUP BY status")}
+    by_status = {row['status']: (row['order_count'], round(float(row['total_amount']), 2)) for row in run_query(
+        "SELECT status, order_count, total_amount FROM rollup_status_sales WHERE order_count <> 0")}
+    overall = run_query("SELECT COUNT(*) AS n, COALESCE(SUM(total_amount), 0) AS total FROM orders")[0]
+    by_day = run_query("SELECT COALESCE(SUM(order_count), 0) AS n, COALESCE(SUM(total_sales), 0) AS total "
+                       "FROM rollup_daily_sales")[0]
+    quantity = run_query("SELECT COALESCE(SUM(quantity), 0) AS q FROM order_details")[0]['q']
+    rolled_quantity = run_query("SELECT COALESCE(SUM(quantity_sold), 0) AS q FROM rollup_pizza_sales")[0]['q']
+    return (direct == by_status
+            and by_day['n'] == overall['n']
+            and round(float(by_day['total']), 2) == round(float(overall['total']), 2)
+            and quantity == rolled_quantity)
+
+
+@pytest.fixture
+def logged_in_client():
+    """login_client, for tests that make signed-in requests"""
+    return login_client
+
+
+@pytest.fixture
+def query():
+    """run_query, for tests that check rows directly"""
+    return run_query
+
+
+@pytest.fixture(name='orderable_pizza_ids')
+def orderable_pizza_ids_fixture():
+    """orderable_pizza_ids, for tests that place orders"""
+    return orderable_pizza_ids
+
+
+@pytest.fixture(name='count_orders')
+def count_orders_fixture():
+    """count_orders, for tests that check how many orders were written"""
+    return count_orders
+
+
+@pytest.fixture(name='rollups_match_orders')
+def rollups_match_orders_fixture():
+    """rollups_match_orders, for tests that change orders in bulk"""
+    return rollups_match_orders
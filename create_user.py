@@ -1,7 +1,22 @@
 """
-Create a new employee account
+Create a new employee account, or many at once from a CSV file
+
+Usage: python create_user.py
+       python create_user.py --csv staff.csv [--workers 4] [--chunk-size 200]
+
+The CSV needs a header row with first_name, last_name, email, role and
+password columns; phone and hire_date (YYYY-MM-DD, default today) are
+optional. Emails are stored in lower case; emails already in the database
+(in any case) or repeated in the file are skipped as duplicates, and rows
+with missing or malformed values as invalid, each reported by line.
+Passwords are hashed across a process pool and rows are inserted
+--chunk-size at a time, one transaction per chunk.
 """
+import argparse
+import csv
+import os
 import sys
+import time
 if sys.platform == 'win32':
     sys.stdout.reconfigure(encoding='utf-8')
 
@@ -9,10 +24,16 @@ from dotenv import load_dotenv
 load_dotenv()
 
 from app import app
+from app.db_backend import case_insensitive, is_duplicate_key_error
 from app.db_connect import get_db
+from app.passwords import get_hash_method
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from werkzeug.security import generate_password_hash
 from datetime import date
 
+REQUIRED_COLUMNS = ('first_name', 'last_name', 'email', 'role', 'password')
+
 def create_employee(first_name, last_name, email, phone, role, password):
     """Create a new employee"""
     with app.app_context():
@@ -23,15 +44,16 @@ def create_employee(first_name, last_name, email, phone, role, password):
 
         cursor = db.cursor()
 
-        # Check if employee already exists
-        cursor.execute("SELECT email FROM employees WHERE email = %s", (email,))
+        # Check if employee already exists (emails are compared and stored in lower case)
+        email = email.lower()
+        cursor.execute(f"SELECT email FROM employees WHERE {case_insensitive('email')} = %s", (email,))
         if cursor.fetchone():
             print(f"✓ Employee with email {email} already exists")
             cursor.close()
             return True
 
         # Create new employee
-        password_hash = generate_password_hash(password)
+        password_hash = generate_password_hash(password, get_hash_method())
         hire_date = date.today()
 
         cursor.execute("""
@@ -48,7 +70,159 @@ def create_employee(first_name, last_name, email, phone, role, password):
         print(f"  Role: {role}")
         return True
 
+def read_employee_csv(path):
+    """
+    Read and check the employee rows of a CSV file
+    Returns (rows, invalid, duplicates): rows are dicts ready to insert
+    (minus the password hash); invalid and duplicates are (line number,
+    message) pairs for rows that are malformed or repeat an earlier email
+    """
+    rows = []
+    invalid = []
+    duplicates = []
+    seen = set()
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.DictReader(f)
+        missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+        if missing:
+            return [], [(1, f"missing column(s): {', '.join(missing)}")], []
+        for line, record in enumerate(reader, start=2):
+            record = {key: (value or '').strip() for key, value in record.items() if key}
+            empty = [column for column in REQUIRED_COLUMNS if not record[column]]
+            if empty:
+                invalid.append((line, f"empty {', '.join(empty)}"))
+                continue
+            email = record['email'].lower()
+            if email in seen:
+                duplicates.append((line, f"{email} appears earlier in the file"))
+                continue
+            try:
+                hire_date = date.fromisoformat(record['hire_date']) if record.get('hire_date') else date.today()
+            except ValueError:
+                invalid.append((line, f"bad hire_date '{record['hire_date']}'"))
+                continue
+            seen.add(email)
+            rows.append({
+                'line': line,
+                'first_name': record['first_name'],
+                'last_name': record['last_name'],
+                'email': email,
+                'phone': record.get('phone') or None,
+                'role': record['role'],
+                'password': record['password'],
+                'hire_date': hire_date,
+            })
+    return rows, invalid, duplicates
+
+def existing_emails(cursor, emails):
+    """
+    Return which of the (lower-case) emails are already taken, in one query
+    Compares in lower case, since older accounts may have been stored as typed
+    """
+    if not emails:
+        return set()
+    placeholders = ', '.join(['%s'] * len(emails))
+    cursor.execute(f"SELECT email FROM employees WHERE {case_insensitive('email')} IN ({placeholders})",
+                   sorted(emails))
+    return {row['email'].lower() for row in cursor.fetchall()}
+
+def hash_passwords(passwords, workers):
+    """Hash passwords across `workers` processes (inline when workers is 1)"""
+    method = get_hash_method()
+    if workers <= 1:
+        return [generate_password_hash(password, method) for password in passwords]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunksize = max(1, len(passwords) // (workers * 4))
+        return list(pool.map(generate_password_hash, passwords, repeat(method), chunksize=chunksize))
+
+def create_employees_bulk(path, workers, chunk_size):
+    """
+    Create every new employee in a CSV file
+    Returns a summary dict: created, duplicates, invalid and failed counts,
+    problems ((line number, message) pairs for all of them) and timings
+    """
+    started = time.perf_counter()
+    rows, invalid, duplicates = read_employee_csv(path)
+    problems = invalid + duplicates
+    summary = {'created': 0, 'duplicates': len(duplicates), 'invalid': len(invalid), 'failed': 0,
+               'problems': problems, 'hash_seconds': 0.0, 'insert_seconds': 0.0}
+
+    with app.app_context():
+        db = get_db()
+        if not db:
+            print("✗ Could not connect to database")
+            summary['failed'] = len(rows)
+            return summary
+
+        cursor = db.cursor()
+        taken = existing_emails(cursor, {row['email'] for row in rows})
+        db.rollback()  # end the read snapshot; each chunk below is its own transaction
+        for row in rows:
+            if row['email'] in taken:
+                problems.append((row['line'], f"{row['email']} already has an account"))
+                summary['duplicates'] += 1
+        rows = [row for row in rows if row['email'] not in taken]
+
+        hash_start = time.perf_counter()
+        hashes = hash_passwords([row['password'] for row in rows], workers)
+        summary['hash_seconds'] = time.perf_counter() - hash_start
+
+        insert_start = time.perf_counter()
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start:start + chunk_size]
+            try:
+                cursor.executemany("""
+                    INSERT INTO employees (first_name, last_name, email, phone, role, password_hash, hire_date, active)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                """, [(row['first_name'], row['last_name'], row['email'], row['phone'], row['role'],
+                       password_hash, row['hire_date'], True)
+                      for row, password_hash in zip(chunk, hashes[start:start + chunk_size])])
+                db.commit()
+                summary['created'] += len(chunk)
+            except Exception as e:
+                db.rollback()
+                summary['failed'] += len(chunk)
+                # Most likely an account created since the duplicate check
+                reason = 'an email was taken meanwhile' if is_duplicate_key_error(e) else str(e)
+                problems.append((chunk[0]['line'], f"lines {chunk[0]['line']}-{chunk[-1]['line']} not created: {reason}"))
+        summary['insert_seconds'] = time.perf_counter() - insert_start
+        cursor.close()
+
+    summary['total_seconds'] = time.perf_counter() - started
+    return summary
+
+def print_bulk_summary(summary):
+    """Print the outcome of a bulk import"""
+    for line, message in sorted(summary['problems']):
+        print(f"  line {line}: {message}")
+    created = summary['created']
+    print(f"\n✓ Created {created} employee(s), skipped {summary['duplicates']} duplicate(s) "
+          f"and {summary['invalid']} invalid row(s), failed {summary['failed']}")
+    for label, key in (('hashing', 'hash_seconds'), ('inserting', 'insert_seconds'), ('total', 'total_seconds')):
+        seconds = summary.get(key, 0.0)
+        rate = f"{created / seconds:,.0f} rows/s" if created and seconds else '-'
+        print(f"  {label:<10} {seconds:8.2f}s  {rate}")
+
+def parse_args():
+    """Command line options"""
+    parser = argparse.ArgumentParser(description='Create employee accounts')
+    parser.add_argument('--csv', help='create every employee listed in this CSV file')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='processes used to hash passwords (default: one per CPU)')
+    parser.add_argument('--chunk-size', type=int, default=200,
+                        help='employees inserted per transaction (default: 200)')
+    return parser.parse_args()
+
 if __name__ == '__main__':
+    args = parse_args()
+    if args.csv:
+        print("\n" + "="*60)
+        print(f"BULK CREATE EMPLOYEES FROM {args.csv}")
+        print("="*60)
+        summary = create_employees_bulk(args.csv, args.workers, max(1, args.chunk_size))
+        print_bulk_summary(summary)
+        sys.exit(0 if not summary['failed'] else 1)
+
     print("\n" + "="*60)
     print("CREATE EMPLOYEE ACCOUNT")
     print("="*60)
@@ -0,0 +1,447 @@
+"""
+Generate a large synthetic dataset for load testing
+The sample data from app/init_db.py is a handful of rows, which hides every
+scaling problem. This script drops and recreates the schema, then fills it
+with as many customers, employees and orders as asked for, with realistic
+shapes:
+- orders follow the week (busy Fridays and Saturdays), grow over the period,
+  and peak at lunch and dinner
+- a few regular customers place most orders, and a few pizzas outsell the rest
+- most orders have two to four pizzas; nearly all are Completed, a few
+  Cancelled, and the newest ones are still Pending or In Progress
+
+The same --seed and --end always produce the same rows. Rows are written in
+batches of --batch-size with foreign key and unique checks off and the
+secondary indexes dropped; the indexes are rebuilt once at the end, then the
+dashboard rollups. On MySQL, --method load-data streams each batch through
+LOAD DATA LOCAL INFILE (the server must allow local_infile) instead of
+executemany.
+
+The first employee is john.manager@pizzashop.com; every employee's password
+is password123.
+
+Usage: python generate_data.py --yes [--customers 1000000] [--orders 20000000]
+                               [--employees 50] [--days 730] [--seed 42]
+                               [--end 2025-01-01] [--batch-size 50000]
+                               [--method executemany|load-data]
+"""
+
+import argparse
+import bisect
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from itertools import accumulate
+
+if sys.platform == 'win32':
+    sys.stdout.reconfigure(encoding='utf-8')
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from werkzeug.security import generate_password_hash
+
+from app.db_backend import connect, connect_mysql, get_sqlite_path, is_sqlite
+from app.init_db import create_tables, rebuild_rollups
+from app.passwords import get_hash_method
+
+# Tables loaded in bulk; their secondary indexes are dropped while loading
+BULK_TABLES = ['customers', 'orders', 'order_details']
+
+FIRST_NAMES = ['James', 'Mary', 'Robert', 'Patricia', 'John', 'Jennifer', 'Michael', 'Linda', 'David',
+               'Elizabeth', 'William', 'Barbara', 'Richard', 'Susan', 'Joseph', 'Jessica', 'Thomas', 'Sarah',
+               'Charles', 'Karen', 'Daniel', 'Lisa', 'Matthew', 'Nancy', 'Anthony', 'Betty', 'Mark', 'Sandra',
+               'Donald', 'Ashley', 'Steven', 'Emily', 'Andrew', 'Donna', 'Joshua', 'Michelle', 'Kevin', 'Carol']
+LAST_NAMES = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez',
+              'Martinez', 'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore',
+              'Jackson', 'Martin', 'Lee', 'Perez', 'Thompson', 'White', 'Harris', 'Sanchez', 'Clark', 'Lewis']
+STREETS = ['Main St', 'Oak Ave', 'Pine Rd', 'Elm St', 'Maple Dr', 'Cedar Ln', 'Hancock St', 'Jefferson St',
+           'Columbia St', 'Greene St', 'Wayne St', 'Franklin St', 'Liberty St', 'College Ave']
+# (city, zip code, share of customers)
+CITIES = [('Milledgeville', '31061', 60), ('Eatonton', '31024', 12), ('Sparta', '31087', 8),
+          ('Gray', '31032', 8), ('Sandersville', '31082', 7), ('Macon', '31201', 5)]
+ROLES = [('Cashier', 40), ('Chef', 25), ('Driver', 25), ('Manager', 10)]
+
+# (name, description, category, small price); medium and large cost more
+RECIPES = [
+    ('Pepperoni', 'Tomato sauce, mozzarella, pepperoni', 'Classic', 9.99),
+    ('Cheese', 'Tomato sauce, mozzarella', 'Classic', 8.49),
+    ('Margherita', 'Classic tomato sauce, fresh mozzarella, basil', 'Classic', 8.99),
+    ('Meat Lovers', 'Tomato sauce, mozzarella, pepperoni, sausage, bacon, ham', 'Specialty', 12.99),
+    ('Supreme', 'Pepperoni, sausage, peppers, onions, mushrooms, olives', 'Specialty', 12.49),
+    ('Hawaiian', 'Tomato sauce, mozzarella, ham, pineapple', 'Specialty', 10.99),
+    ('BBQ Chicken', 'BBQ sauce, chicken, red onion, cilantro', 'Specialty', 11.99),
+    ('Veggie Supreme', 'Tomato sauce, mozzarella, peppers, onions, mushrooms, olives', 'Vegetarian', 11.99),
+    ('Buffalo Chicken', 'Buffalo sauce, chicken, ranch, mozzarella', 'Specialty', 11.99),
+    ('White Garden', 'Garlic cream, spinach, tomato, ricotta', 'Vegetarian', 10.99),
+    ('Sausage & Mushroom', 'Tomato sauce, mozzarella, Italian sausage, mushrooms', 'Classic', 10.49),
+    ('Mediterranean', 'Feta, olives, artichokes, sun-dried tomato', 'Vegetarian', 11.49),
+]
+SIZES = [('Small', 0.0, 25), ('Medium', 4.0, 40), ('Large', 7.0, 35)]
+
+# Relative order volume by weekday (Monday first) and by hour of the day
+WEEKDAY_WEIGHTS = [0.8, 0.8, 0.9, 1.0, 1.4, 1.5, 1.1]
+HOUR_WEIGHTS = {11: 8, 12: 12, 13: 8, 14: 3, 15: 3, 16: 5, 17: 10, 18: 16, 19: 15, 20: 10, 21: 6, 22: 4}
+# Pizzas per order (1..6) and quantity per line (1..3)
+LINES_PER_ORDER = [(1, 20), (2, 25), (3, 22), (4, 15), (5, 10), (6, 8)]
+QUANTITY_WEIGHTS = [(1, 80), (2, 15), (3, 5)]
+NOTES = ['Extra napkins', 'Well done', 'Light sauce', 'No onions', 'Ring the doorbell', 'Cut in squares']
+TAX_RATE = 0.07
+# Share of the newest orders still open when the data ends
+OPEN_ORDER_SHARE = 0.002
+
+
+def weighted_picker(rng, choices):
+    """
+    Return a function making a weighted random choice from (value, weight)
+    pairs, with the cumulative weights computed once
+    """
+    values = [value for value, _ in choices]
+    cumulative = list(accumulate(weight for _, weight in choices))
+    total = cumulative[-1]
+
+    def pick():
+        return values[bisect.bisect(cumulative, rng.random() * total)]
+    return pick
+
+
+# ==================== GENERATORS ====================
+
+def employee_rows(rng, count):
+    """Employees, starting with the default manager login"""
+    password_hash = generate_password_hash('password123', get_hash_method())
+    role = weighted_picker(rng, ROLES)
+    yield ('John', 'Manager', 'john.manager@pizzashop.com', '555-0101', 'Manager', password_hash,
+           date(2020, 1, 1), True)
+    for i in range(1, count):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        yield (first, last, f"{first}.{last}.{i}@pizzashop.com".lower(), f"555-{rng.randint(0, 9999):04d}",
+               role(), password_hash, date(2020, 1, 1) + timedelta(days=rng.randint(0, 1800)),
+               rng.random() > 0.1)
+
+
+def customer_rows(rng, count):
+    """Customers spread over nearby towns"""
+    city = weighted_picker(rng, [((name, zip_code), share) for name, zip_code, share in CITIES])
+    for i in range(1, count + 1):
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        town, zip_code = city()
+        yield (first, last, f"{first}.{last}.{i}@example.com".lower(), f"555-{rng.randint(0, 9999):04d}",
+               f"{rng.randint(1, 9999)} {rng.choice(STREETS)}", town, 'GA', zip_code)
+
+
+def pizza_rows():
+    """The menu: every recipe in every size"""
+    for name, description, category, price in RECIPES:
+        for size, extra, _ in SIZES:
+            yield (name, description, size, round(price + extra, 2), category)
+
+
+def pizza_picker(rng):
+    """
+    Pick pizza ids with a skewed popularity: recipes follow a Zipf-like
+    curve in a seed-dependent order, sizes their own mix
+    """
+    ranks = list(range(len(RECIPES)))
+    rng.shuffle(ranks)
+    choices = []
+    for recipe, rank in enumerate(ranks):
+        for size_index, (_, _, size_weight) in enumerate(SIZES):
+            pizza_id = recipe * len(SIZES) + size_index + 1
+            choices.append((pizza_id, size_weight / (rank + 1) ** 1.1))
+    return weighted_picker(rng, choices)
+
+
+def orders_per_day(count, days, end):
+    """Split `count` orders over the days before `end` by weekday and growth"""
+    first_day = end - timedelta(days=days)
+    weights = [WEEKDAY_WEIGHTS[(first_day + timedelta(days=d)).weekday()] * (0.7 + 0.3 * d / max(days - 1, 1))
+               for d in range(days)]
+    total = sum(weights)
+    counts = [int(count * weight / total) for weight in weights]
+    # Hand out the rounding remainder to the busiest days
+    for d in sorted(range(days), key=lambda d: -weights[d])[:count - sum(counts)]:
+        counts[d] += 1
+    return [(first_day + timedelta(days=d), n) for d, n in enumerate(counts)]
+
+
+def order_rows(rng, count, customers, employees, days, end):
+    """
+    Yield (order row, detail rows) in order_date order, with explicit ids so
+    details can reference their order without reading ids back
+    """
+    prices = {pizza_id: row[3] for pizza_id, row in enumerate(pizza_rows(), start=1)}
+    pizza = pizza_picker(rng)
+    hour = weighted_picker(rng, list(HOUR_WEIGHTS.items()))
+    lines = weighted_picker(rng, LINES_PER_ORDER)
+    quantity = weighted_picker(rng, QUANTITY_WEIGHTS)
+    open_from = count - int(count * OPEN_ORDER_SHARE)
+
+    order_id = 0
+    for day, day_count in orders_per_day(count, days, end):
+        midnight = datetime(day.year, day.month, day.day)
+        times = sorted(midnight + timedelta(hours=hour(), seconds=rng.randrange(3600)) for _ in range(day_count))
+        for order_date in times:
+            order_id += 1
+            items = {}
+            for _ in range(lines()):
+                pizza_id = pizza()
+                items[pizza_id] = items.get(pizza_id, 0) + quantity()
+            details = [(order_id, pizza_id, qty, prices[pizza_id], round(prices[pizza_id] * qty, 2))
+                       for pizza_id, qty in items.items()]
+            subtotal = round(sum(detail[4] for detail in details), 2)
+            tax_amount = round(subtotal * TAX_RATE, 2)
+            if order_id > open_from:
+                status = rng.choice(['Pending', 'In Progress'])
+            else:
+                status = 'Cancelled' if rng.random() < 0.05 else 'Completed'
+            yield ((order_id,
+                    # Regulars: low customer ids are drawn far more often
+                    int(customers * rng.random() ** 2.5) + 1,
+                    rng.randint(1, employees), order_date, subtotal, TAX_RATE, tax_amount,
+                    round(subtotal + tax_amount, 2), status,
+                    rng.choice(NOTES) if rng.random() < 0.03 else None),
+                   details)
+
+
+# ==================== WRITERS ====================
+
+EMPLOYEE_COLUMNS = ('first_name', 'last_name', 'email', 'phone', 'role', 'password_hash', 'hire_date', 'active')
+CUSTOMER_COLUMNS = ('first_name', 'last_name', 'email', 'phone', 'address', 'city', 'state', 'zip_code')
+PIZZA_COLUMNS = ('name', 'description', 'size', 'base_price', 'category')
+ORDER_COLUMNS = ('order_id', 'customer_id', 'employee_id', 'order_date', 'subtotal', 'tax_rate',
+                 'tax_amount', 'total_amount', 'status', 'notes')
+DETAIL_COLUMNS = ('order_id', 'pizza_id', 'quantity', 'unit_price', 'subtotal')
+
+
+def insert_batch(conn, table, columns, rows):
+    """Insert one batch with executemany and commit it"""
+    cursor = conn.cursor()
+    cursor.executemany(
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})", rows)
+    conn.commit()
+    cursor.close()
+
+
+def _infile_value(value):
+    """Text form of one value for LOAD DATA (\\N is NULL)"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, datetime):
+        return value.isoformat(' ')
+    return str(value)
+
+
+def load_data_batch(conn, table, columns, rows):
+    """Write one batch to a tab-separated file and LOAD DATA LOCAL INFILE it"""
+    fd, path = tempfile.mkstemp(prefix=f'generate_{table}_', suffix='.tsv')
+    try:
+        # Generated values never contain tabs, newlines or backslashes
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+            f.writelines('\t'.join(map(_infile_value, row)) + '\n' for row in rows)
+        cursor = conn.cursor()
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(columns)})", (path,))
+        conn.commit()
+        cursor.close()
+    finally:
+        os.remove(path)
+
+
+def write_rows(write, conn, table, columns, rows, batch_size):
+    """Write an iterable of rows in batches; returns the row count"""
+    written = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            write(conn, table, columns, batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        write(conn, table, columns, batch)
+        written += len(batch)
+    return written
+
+
+def write_orders(write, conn, orders, batch_size):
+    """Write orders and their details in step; returns (orders, details) counts"""
+    order_batch, detail_batch = [], []
+    counts = [0, 0]
+
+    def flush():
+        # Headers first so the details' order ids exist if checks are on
+        write(conn, 'orders', ORDER_COLUMNS, order_batch)
+        write(conn, 'order_details', DETAIL_COLUMNS, detail_batch)
+        counts[0] += len(order_batch)
+        counts[1] += len(detail_batch)
+        order_batch.clear()
+        detail_batch.clear()
+
+    for order, details in orders:
+        order_batch.append(order)
+        detail_batch.extend(details)
+        if len(order_batch) >= batch_size:
+            flush()
+            print(f"  {counts[0]:,} orders written", end='\r', flush=True)
+    if order_batch:
+        flush()
+    print(f"  {counts[0]:,} orders written")
+    return counts
+
+
+# ==================== DEFERRED INDEXES ====================
+
+def relax_checks(conn):
+    """Turn off per-row checks for this loading connection"""
+    cursor = conn.cursor()
+    if is_sqlite():
+        cursor.execute('PRAGMA foreign_keys = OFF')
+        cursor.execute('PRAGMA synchronous = OFF')
+    else:
+        cursor.execute('SET foreign_key_checks = 0, unique_checks = 0')
+    cursor.close()
+
+
+def drop_secondary_indexes(conn, table):
+    """
+    Drop the table's secondary indexes and return what rebuild_indexes needs
+    to put them back. MySQL keeps unique indexes and those backing a foreign key
+    """
+    cursor = conn.cursor()
+    if is_sqlite():
+        cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = %s "
+                       "AND sql IS NOT NULL", (table,))
+        indexes = [(row['name'], row['sql']) for row in cursor.fetchall()]
+        for name, _ in indexes:
+            cursor.execute(f"DROP INDEX {name}")
+    else:
+        cursor.execute("""
+            SELECT COLUMN_NAME AS column_name FROM information_schema.KEY_COLUMN_USAGE
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND REFERENCED_TABLE_NAME IS NOT NULL
+        """, (table,))
+        foreign_keys = {row['column_name'] for row in cursor.fetchall()}
+        cursor.execute("""
+            SELECT INDEX_NAME AS name, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) AS columns
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND NON_UNIQUE = 1
+            GROUP BY INDEX_NAME
+        """, (table,))
+        indexes = [(row['name'], row['columns']) for row in cursor.fetchall()
+                   if row['columns'].split(',')[0] not in foreign_keys]
+        if indexes:
+            cursor.execute(f"ALTER TABLE {table} " + ', '.join(f"DROP INDEX {name}" for name, _ in indexes))
+    conn.commit()
+    cursor.close()
+    return indexes
+
+
+def rebuild_indexes(conn, table, indexes):
+    """Recreate indexes dropped by drop_secondary_indexes (one pass per table on MySQL)"""
+    if not indexes:
+        return
+    cursor = conn.cursor()
+    if is_sqlite():
+        for _, sql in indexes:
+            cursor.execute(sql)
+    else:
+        cursor.execute(f"ALTER TABLE {table} " +
+                       ', '.join(f"ADD INDEX {name} ({columns})" for name, columns in indexes))
+    conn.commit()
+    cursor.close()
+
+
+# ==================== MAIN ====================
+
+def generate(args):
+    """Recreate the schema and load the synthetic data; returns per-step timings"""
+    rng = random.Random(args.seed)
+    end = date.fromisoformat(args.end) if args.end else date.today()
+    load_data = args.method == 'load-data'
+    write = load_data_batch if load_data else insert_batch
+
+    create_tables()
+    conn = connect_mysql(local_infile=True) if load_data else connect()
+    timings = []
+
+    def timed(label, func):
+        """Run one step; func returns the rows it wrote, or None if it writes none"""
+        started = time.perf_counter()
+        rows = func()
+        timings.append((label, rows, time.perf_counter() - started))
+
+    def rebuild_all_indexes():
+        for table in BULK_TABLES:
+            rebuild_indexes(conn, table, dropped[table])
+
+    try:
+        relax_checks(conn)
+        dropped = {table: drop_secondary_indexes(conn, table) for table in BULK_TABLES}
+        timed('employees', lambda: write_rows(insert_batch, conn, 'employees', EMPLOYEE_COLUMNS,
+                                              employee_rows(rng, args.employees), args.batch_size))
+        timed('pizzas', lambda: write_rows(insert_batch, conn, 'pizzas', PIZZA_COLUMNS, pizza_rows(),
+                                           args.batch_size))
+        timed('customers', lambda: write_rows(write, conn, 'customers', CUSTOMER_COLUMNS,
+                                              customer_rows(rng, args.customers), args.batch_size))
+        orders = order_rows(rng, args.orders, args.customers, args.employees, args.days, end)
+        # Orders and their details are written together; the rate covers both
+        timed('orders+details', lambda: sum(write_orders(write, conn, orders, args.batch_size)))
+        timed('rebuild indexes', rebuild_all_indexes)
+    finally:
+        conn.close()
+
+    timed('rollups', rebuild_rollups)
+    return timings
+
+
+def parse_args(argv=None):
+    """Command line options"""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--yes', action='store_true', help='confirm that every table may be dropped')
+    parser.add_argument('--customers', type=int, default=100_000)
+    parser.add_argument('--employees', type=int, default=50)
+    parser.add_argument('--orders', type=int, default=1_000_000)
+    parser.add_argument('--days', type=int, default=730, help='days of order history')
+    parser.add_argument('--end', help='day after the last order, YYYY-MM-DD (default: today)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=50_000)
+    parser.add_argument('--method', choices=['executemany', 'load-data'], default='executemany')
+    args = parser.parse_args(argv)
+    if args.method == 'load-data' and is_sqlite():
+        parser.error('--method load-data needs the MySQL backend')
+    if min(args.customers, args.employees, args.days, args.batch_size) < 1 or args.orders < 0:
+        parser.error('counts must be positive')
+    return args
+
+
+def main():
+    args = parse_args()
+    target = f"SQLite ({get_sqlite_path()})" if is_sqlite() else f"MySQL database {os.getenv('DB_NAME')}"
+    if not args.yes:
+        print(f"This drops and recreates every table in {target}. Re-run with --yes to continue.")
+        return 1
+
+    print(f"Generating into {target} (seed {args.seed})")
+    started = time.perf_counter()
+    timings = generate(args)
+    total = time.perf_counter() - started
+
+    print(f"\n{'step':<18}{'rows':>14}{'seconds':>10}{'rows/s':>12}")
+    print("-" * 54)
+    for label, rows, seconds in timings:
+        if rows is None:
+            print(f"{label:<18}{'':>14}{seconds:>10.1f}{'':>12}")
+        else:
+            print(f"{label:<18}{rows:>14,}{seconds:>10.1f}{rows / seconds if seconds else 0:>12,.0f}")
+    print(f"{'total':<18}{'':>14}{total:>10.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,6 @@
 """
 Test script to verify archiving functionality for pizzas and customers
 """
-import pymysql
-import os
 import sys
 from dotenv import load_dotenv
 
@@ -12,16 +10,11 @@ if sys.platform == 'win32':
 
 load_dotenv()
 
-DB_CONFIG = {
-    'host': os.getenv('DB_HOST'),
-    'user': os.getenv('DB_USER'),
-    'password': os.getenv('DB_PASSWORD'),
-    'database': os.getenv('DB_NAME'),
-}
+from app.db_backend import connect
 
 def get_connection():
-    """Get database connection"""
-    return pymysql.connect(**DB_CONFIG, cursorclass=pymysql.cursors.DictCursor)
+    """Get database connection (dict rows on either backend)"""
+    return connect()
 
 def test_pizza_archiving():
     """Test pizza archiving functionality"""
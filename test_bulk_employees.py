@@ -0,0 +1,94 @@
+"""
+Test script for bulk employee provisioning (create_user.py --csv)
+Checks that new staff are created with working passwords and that repeated,
+existing and malformed rows are reported instead of inserted
+"""
+
+import os
+import sys
+import tempfile
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app import app
+from app.db_backend import connect
+from app.passwords import verify_password
+from create_user import create_employees_bulk
+
+def write_csv(lines):
+    """Write CSV lines to a temporary file and return its path"""
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    with os.fdopen(fd, 'w', newline='') as f:
+        f.write('\n'.join(lines) + '\n')
+    return path
+
+def test_new_store_is_onboarded(query):
+    """Valid rows are created in chunks; duplicate and invalid rows are skipped with a reason"""
+    lines = ['first_name,last_name,email,phone,role,password,hire_date']
+    lines += [f'Staff{i},Onboard,onboard{i}@store.test,555-01{i:02d},Cashier,secret{i},2024-06-01' for i in range(7)]
+    lines += [
+        'Again,Onboard,ONBOARD3@store.test,,Cashier,secret,',         # repeated in the file
+        'Existing,Onboard,john.manager@pizzashop.com,,Cashier,secret,',  # already has an account
+        'Mixed,Onboard,mixed.onboard@store.test,,Cashier,secret,',     # has an account in another case
+        'Late,Onboard,late@store.test,,Cashier,secret,06/01/2024',     # bad date
+        'Blank,Onboard,blank@store.test,,Cashier,,',                   # no password
+    ]
+    path = write_csv(lines)
+    os.environ['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+    try:
+        # An account from before emails were lower-cased
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            INSERT INTO employees (first_name, last_name, email, phone, role, password_hash, hire_date)
+            VALUES ('Mixed', 'Onboard', 'Mixed.Onboard@Store.test', NULL, 'Cashier', 'x', '2024-01-01')
+        """)
+        conn.commit()
+        cursor.close()
+        conn.close()
+        summary = create_employees_bulk(path, workers=2, chunk_size=3)
+    finally:
+        del os.environ['PASSWORD_HASH_METHOD']
+        os.remove(path)
+
+    assert (summary['created'], summary['duplicates'], summary['invalid'], summary['failed']) == (7, 3, 2, 0), summary
+    assert sorted(line for line, _ in summary['problems']) == [9, 10, 11, 12, 13]
+
+    created = query("SELECT email, password_hash, hire_date FROM employees WHERE email LIKE %s ORDER BY email",
+                    ('onboard%@store.test',))
+    assert len(created) == 7
+    assert verify_password(created[0]['password_hash'], 'secret0')
+    assert str(created[0]['hire_date']) == '2024-06-01'
+
+    # Running the same file again creates nobody
+    path = write_csv(lines)
+    try:
+        assert create_employees_bulk(path, workers=1, chunk_size=3)['created'] == 0
+    finally:
+        os.remove(path)
+    print("✅ A CSV of new staff is created in chunks, duplicate and invalid rows reported")
+
+def test_missing_columns_are_reported():
+    """A file without the required columns creates nothing"""
+    path = write_csv(['first_name,email', 'Solo,solo@store.test'])
+    try:
+        summary = create_employees_bulk(path, workers=1, chunk_size=10)
+    finally:
+        os.remove(path)
+    assert summary['created'] == 0
+    assert 'missing column' in summary['problems'][0][1]
+    print("✅ Missing CSV columns are reported")
+
+def test_login_ignores_email_case():
+    """Signing in works however the email's case is typed"""
+    response = app.test_client().post('/auth/login', data={
+        'email': ' John.Manager@PizzaShop.com ', 'password': 'password123'})
+    assert response.status_code == 302
+    assert response.headers['Location'].endswith('/dashboard/')
+    print("✅ Login emails are matched regardless of case")
+
+if __name__ == '__main__':
+    from conftest import run_query
+    test_new_store_is_onboarded(run_query)
+    test_missing_columns_are_reported()
+    test_login_ignores_email_case()
+    print("\n🎉 All bulk employee tests passed!")
@@ -0,0 +1,91 @@
+"""
+Test script for bulk order ingestion (/orders/bulk)
+Checks per-order results, chunked inserts and the dashboard rollups
+"""
+
+import sys
+import time
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app import app, db_service
+from app.db_service import get_order_by_id, get_order_details
+
+def test_bulk_sync_of_1000_orders(logged_in_client, orderable_pizza_ids, rollups_match_orders):
+    """1,000 orders are created in one request, with rollups kept in step"""
+    pizza_ids = orderable_pizza_ids()
+    orders = [{
+        'customer_id': 1 + i % 5,
+        'items': [{'pizza_id': pizza_ids[(i + k) % len(pizza_ids)], 'quantity': 1 + k} for k in range(3)],
+        'notes': f'sync {i}',
+    } for i in range(1000)]
+
+    started = time.perf_counter()
+    response = logged_in_client().post('/orders/bulk', json={'orders': orders})
+    elapsed = time.perf_counter() - started
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body['created'] == 1000 and body['failed'] == 0
+    order_ids = [result['order_id'] for result in body['results']]
+    assert len(set(order_ids)) == 1000
+    with app.test_request_context():
+        last = get_order_by_id(order_ids[-1])
+        assert last.notes == 'sync 999'
+        assert len(get_order_details(order_ids[-1])) == 3
+    assert rollups_match_orders()
+    print(f"✅ 1,000 orders synced in {elapsed:.2f}s with rollups in step")
+
+def test_bad_orders_fail_individually(logged_in_client, orderable_pizza_ids, rollups_match_orders):
+    """Invalid orders are reported by index while the rest are created"""
+    pizza_id = orderable_pizza_ids()[0]
+    good = {'customer_id': 1, 'items': [{'pizza_id': pizza_id, 'quantity': 1}]}
+    orders = [
+        good,
+        {'customer_id': 999999, 'items': [{'pizza_id': pizza_id, 'quantity': 1}]},
+        {'customer_id': 1, 'items': [{'pizza_id': 999999, 'quantity': 1}]},
+        {'customer_id': 1, 'items': []},
+        {'items': [{'pizza_id': pizza_id, 'quantity': 1}]},
+        dict(good, order_date='2024-03-01T12:30:00'),
+    ]
+    body = logged_in_client().post('/orders/bulk', json={'orders': orders}).get_json()
+
+    assert [result['success'] for result in body['results']] == [True, False, False, False, False, True]
+    assert 'Customer 999999' in body['results'][1]['message']
+    assert 'Pizza 999999' in body['results'][2]['message']
+    with app.test_request_context():
+        backdated = get_order_by_id(body['results'][5]['order_id'])
+    assert backdated.order_date.isoformat() == '2024-03-01T12:30:00'
+    assert rollups_match_orders()
+    print("✅ Bad orders fail individually and back-dated orders keep their date")
+
+def test_ids_match_orders_on_either_insert_path(logged_in_client, orderable_pizza_ids, query):
+    """Each result's order_id is the row holding that order, batched or inserted one by one"""
+    pizza_id = orderable_pizza_ids()[0]
+    for step in (1, 2):
+        db_service._bulk_insert_ids['step'] = step  # 2 takes the one-header-per-INSERT fallback
+        try:
+            orders = [{'customer_id': 1, 'items': [{'pizza_id': pizza_id, 'quantity': 1}],
+                       'notes': f'step {step} order {i}'} for i in range(5)]
+            body = logged_in_client().post('/orders/bulk', json={'orders': orders}).get_json()
+        finally:
+            db_service._bulk_insert_ids['step'] = None
+        for i, result in enumerate(body['results']):
+            notes = query("SELECT notes FROM orders WHERE order_id = %s", (result['order_id'],))[0]['notes']
+            assert notes == f'step {step} order {i}'
+    print("✅ Batched and per-row header inserts both return the right order ids")
+
+def test_rejects_oversized_or_empty_requests(logged_in_client):
+    """Requests without orders, or over the size limit, are refused"""
+    client = logged_in_client()
+    assert client.post('/orders/bulk', json={}).status_code == 400
+    too_many = [{'customer_id': 1, 'items': []}] * 1001
+    assert client.post('/orders/bulk', json={'orders': too_many}).status_code == 413
+    print("✅ Empty and oversized bulk requests are refused")
+
+if __name__ == '__main__':
+    from conftest import login_client, orderable_pizza_ids, rollups_match_orders, run_query
+    test_bulk_sync_of_1000_orders(login_client, orderable_pizza_ids, rollups_match_orders)
+    test_bad_orders_fail_individually(login_client, orderable_pizza_ids, rollups_match_orders)
+    test_ids_match_orders_on_either_insert_path(login_client, orderable_pizza_ids, run_query)
+    test_rejects_oversized_or_empty_requests(login_client)
+    print("\n🎉 All bulk order tests passed!")
@@ -0,0 +1,56 @@
+"""
+Test script for bulk order status changes (/orders/bulk-status)
+Checks allowed transitions, per-order results and the status rollups
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app import app
+from app.db_service import create_order, update_order_status
+
+def make_orders(orderable_pizza_ids, count):
+    """Create `count` pending orders and return their ids"""
+    pizza_id = orderable_pizza_ids()[0]
+    with app.test_request_context():
+        return [create_order(1, 1, [(pizza_id, 1 + i)]) for i in range(count)]
+
+def test_rush_is_cleared_in_one_request(logged_in_client, query, orderable_pizza_ids, rollups_match_orders):
+    """Pending and in-progress orders move together; finished ones are skipped"""
+    order_ids = make_orders(orderable_pizza_ids, 5)
+    with app.test_request_context():
+        update_order_status(order_ids[1], 'In Progress')
+        update_order_status(order_ids[2], 'Cancelled')
+
+    response = logged_in_client().post('/orders/bulk-status', json={
+        'order_ids': order_ids + [999999], 'status': 'Completed'})
+    body = response.get_json()
+
+    assert response.status_code == 200
+    assert body['updated'] == sorted(set(order_ids) - {order_ids[2]})
+    assert body['skipped'] == sorted([order_ids[2], 999999])
+    statuses = {row['order_id']: row['status'] for row in query(
+        f"SELECT order_id, status FROM orders WHERE order_id IN ({', '.join(['%s'] * len(order_ids))})", order_ids)}
+    assert statuses[order_ids[2]] == 'Cancelled'
+    assert all(statuses[order_id] == 'Completed' for order_id in body['updated'])
+    assert rollups_match_orders()
+    print("✅ A rush of orders is completed in one request")
+
+def test_finished_orders_do_not_reopen(logged_in_client, orderable_pizza_ids, rollups_match_orders):
+    """No order can be moved back to Pending, and unknown statuses are refused"""
+    order_ids = make_orders(orderable_pizza_ids, 1)
+    client = logged_in_client()
+    body = client.post('/orders/bulk-status', json={'order_ids': order_ids, 'status': 'Pending'}).get_json()
+    assert body['updated'] == [] and body['skipped'] == order_ids
+
+    response = client.post('/orders/bulk-status', json={'order_ids': order_ids, 'status': 'Lost'})
+    assert response.status_code == 400
+    assert client.post('/orders/bulk-status', json={'order_ids': [], 'status': 'Completed'}).status_code == 400
+    assert rollups_match_orders()
+    print("✅ Disallowed transitions and bad requests change nothing")
+
+if __name__ == '__main__':
+    from conftest import login_client, orderable_pizza_ids, rollups_match_orders, run_query
+    test_rush_is_cleared_in_one_request(login_client, run_query, orderable_pizza_ids, rollups_match_orders)
+    test_finished_orders_do_not_reopen(login_client, orderable_pizza_ids, rollups_match_orders)
+    print("\n🎉 All bulk status tests passed!")
@@ -0,0 +1,75 @@
+"""
+Test script for the dashboard statistics
+Checks the rollup-backed figures against plain aggregates over the order
+tables, before and after orders are created, updated and deleted
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app import app
+from app.db_backend import connect
+from app.db_service import create_order, delete_order, get_dashboard_stats, update_order_status
+from app.init_db import rebuild_rollups
+
+def scalar(cursor, sql):
+    """Run a one-value query"""
+    cursor.execute(sql)
+    return list(cursor.fetchone().values())[0]
+
+def assert_stats_match_base_tables():
+    """Compare get_dashboard_stats with aggregates computed from the order tables"""
+    conn = connect()
+    cursor = conn.cursor()
+    expected = {
+        'total_sales': float(scalar(cursor, "SELECT COALESCE(SUM(total_amount), 0) FROM orders")),
+        'total_orders': scalar(cursor, "SELECT COUNT(*) FROM orders"),
+        'total_customers': scalar(cursor, "SELECT COUNT(*) FROM customers"),
+        'pending_orders': scalar(cursor, "SELECT COUNT(*) FROM orders WHERE status = 'Pending'"),
+    }
+    cursor.execute("""
+        SELECT pizza_id, SUM(quantity) as total_sold FROM order_details
+        GROUP BY pizza_id ORDER BY total_sold DESC LIMIT 1
+    """)
+    best_seller = cursor.fetchone()
+    cursor.close()
+    conn.close()
+
+    with app.test_request_context():
+        stats = get_dashboard_stats()
+
+    for key, value in expected.items():
+        assert round(stats[key], 2) == round(value, 2), f"{key}: {stats[key]} != {value}"
+    assert len(stats['recent_orders']) == min(5, expected['total_orders'])
+    assert stats['top_pizzas'][0]['total_sold'] == best_seller['total_sold']
+    return stats
+
+def test_dashboard_totals_match_direct_queries():
+    """Rollup-backed totals equal the direct aggregates"""
+    assert_stats_match_base_tables()
+    print("✅ Dashboard totals match the direct queries")
+
+def test_rollups_follow_order_changes():
+    """Creating, updating and deleting an order keeps every rollup in step"""
+    with app.test_request_context():
+        order_id = create_order(1, 1, [(15, 40, 19.99), (1, 2, 8.99)])
+    stats = assert_stats_match_base_tables()
+    assert stats['top_pizzas'][0]['name'] == 'Meat Lovers'
+
+    with app.test_request_context():
+        assert update_order_status(order_id, 'Completed')
+        assert update_order_status(order_id, 'Completed'), "Re-saving a status is a no-op"
+    assert_stats_match_base_tables()
+
+    with app.test_request_context():
+        assert delete_order(order_id)
+    assert_stats_match_base_tables()
+
+    rebuild_rollups()
+    assert_stats_match_base_tables()
+    print("✅ Rollups follow order create, status change and delete")
+
+if __name__ == '__main__':
+    test_dashboard_totals_match_direct_queries()
+    test_rollups_follow_order_changes()
+    print("\n🎉 All dashboard stats tests passed!")
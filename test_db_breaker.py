@@ -0,0 +1,100 @@
+"""
+Test script for the database circuit breaker
+Runs without a MySQL server
+"""
+
+import os
+import sys
+import threading
+import time
+sys.stdout.reconfigure(encoding='utf-8')
+
+os.environ['DB_BREAKER_FAILURE_THRESHOLD'] = '2'
+os.environ['DB_BREAKER_RESET_TIMEOUT'] = '0.05'
+
+from app import app, db_breaker, db_connect
+
+def test_opens_after_threshold():
+    """The breaker opens after consecutive failures and rejects attempts"""
+    name = 'test-threshold'
+    db_breaker.record_failure(name)
+    assert db_breaker.allow(name), "One failure should not open the breaker"
+    db_breaker.record_failure(name)
+
+    assert not db_breaker.allow(name)
+    assert db_breaker.is_open(name)
+    assert db_breaker.get_breaker_state(name)['state'] == db_breaker.OPEN
+    print("✅ Breaker opens after reaching the failure threshold")
+
+def test_half_open_allows_single_probe():
+    """After the backoff exactly one probe is let through"""
+    name = 'test-probe'
+    db_breaker.record_failure(name)
+    db_breaker.record_failure(name)
+    time.sleep(0.06)
+
+    assert not db_breaker.is_open(name), "Requests may probe once the backoff expires"
+    assert db_breaker.allow(name), "First caller should get the probe"
+    assert not db_breaker.allow(name), "Second caller must wait for the probe"
+
+    db_breaker.record_success(name)
+    assert db_breaker.get_breaker_state(name)['state'] == db_breaker.CLOSED
+    assert db_breaker.allow(name)
+    print("✅ Half-open breaker lets one probe through and closes on success")
+
+def test_failed_probe_doubles_backoff():
+    """A failed probe reopens the breaker with a longer backoff"""
+    name = 'test-backoff'
+    db_breaker.record_failure(name)
+    db_breaker.record_failure(name)
+    time.sleep(0.06)
+    assert db_breaker.allow(name)
+    db_breaker.record_failure(name)
+
+    state = db_breaker.get_breaker_state(name)
+    assert state['state'] == db_breaker.OPEN
+    assert state['backoff'] == 0.1
+    print("✅ Failed probe reopens the breaker with doubled backoff")
+
+def test_availability_check_leaves_pool_alone():
+    """The per-request availability check and health report never create the pool"""
+    pool = db_connect._pool
+    db_connect._pool = None
+    try:
+        assert db_connect.is_database_available() in (True, False)
+        assert db_connect.get_database_health()['pool'] is None
+        assert db_connect._pool is None
+    finally:
+        db_connect._pool = pool
+    print("✅ Checking availability does not create the connection pool")
+
+def test_only_the_probe_request_gets_through(logged_in_client):
+    """Once the backoff ends one request probes the primary; the others still get 503"""
+    name = db_connect.PRIMARY_POOL_NAME
+    breaker = db_breaker._get_breaker(name)
+    while db_breaker.get_breaker_state(name)['state'] != db_breaker.OPEN:
+        db_breaker.record_failure(name)
+    breaker['opened_at'] -= breaker['backoff']  # skip the wait
+    try:
+        with app.test_request_context('/customers/'):
+            assert db_connect.admit_request(), "The first request should get the probe"
+            responses = []
+            other = threading.Thread(target=lambda: responses.append(logged_in_client().get('/customers/')))
+            other.start()
+            other.join()
+            assert responses[0].status_code == 503
+        # The probe above was never used, so the next request may probe - and closes the breaker
+        assert logged_in_client().get('/customers/').status_code == 200
+        assert db_breaker.get_breaker_state(name)['state'] == db_breaker.CLOSED
+    finally:
+        db_breaker.record_success(name)
+    print("✅ Half-open requests other than the probe fail fast")
+
+if __name__ == '__main__':
+    test_opens_after_threshold()
+    test_half_open_allows_single_probe()
+    test_failed_probe_doubles_backoff()
+    test_availability_check_leaves_pool_alone()
+    from conftest import login_client
+    test_only_the_probe_request_gets_through(login_client)
+    print("\n🎉 All circuit breaker tests passed!")
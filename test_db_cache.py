@@ -0,0 +1,81 @@
+"""
+Test script for the query result cache
+Runs without a MySQL server
+"""
+
+import sys
+import threading
+import time
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app import db_cache
+
+def test_hit_until_invalidated():
+    """Values are reused within the TTL and recomputed after invalidate()"""
+    name = 'test-invalidate'
+    calls = []
+    compute = lambda: calls.append(1) or {'n': len(calls)}
+
+    assert db_cache.get_or_compute(name, compute, ttl=60) == {'n': 1}
+    assert db_cache.get_or_compute(name, compute, ttl=60) == {'n': 1}
+    db_cache.invalidate(name)
+    assert db_cache.get_or_compute(name, compute, ttl=60) == {'n': 2}
+
+    stats = db_cache.get_cache_stats()[name]
+    assert (stats['hits'], stats['misses'], stats['invalidated']) == (1, 2, 1)
+    print("✅ Cached value is reused until invalidated")
+
+def test_expires_after_ttl():
+    """Values expire after the TTL and falsy results are never cached"""
+    name = 'test-ttl'
+    calls = []
+    compute = lambda: calls.append(1) or {'n': len(calls)}
+    db_cache.get_or_compute(name, compute, ttl=0.02)
+    time.sleep(0.03)
+    assert db_cache.get_or_compute(name, compute, ttl=0.02) == {'n': 2}
+    assert db_cache.get_cache_stats()[name]['expired'] == 1
+
+    empty = 'test-empty'
+    db_cache.get_or_compute(empty, dict, ttl=60)
+    db_cache.get_or_compute(empty, dict, ttl=60)
+    assert db_cache.get_cache_stats()[empty]['computations'] == 2
+    print("✅ Values expire and empty results are not cached")
+
+def test_concurrent_misses_share_one_computation():
+    """Requests that miss together wait for a single computation"""
+    name = 'test-coalesce'
+    calls = []
+
+    def slow_compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return {'ok': True}
+
+    threads = [threading.Thread(target=db_cache.get_or_compute, args=(name, slow_compute, 60)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert db_cache.get_cache_stats()[name]['coalesced'] == 7
+    print("✅ Concurrent misses share one computation")
+
+def test_invalidation_during_compute_is_not_cached():
+    """A result computed while an invalidation arrives is not stored"""
+    name = 'test-race'
+
+    def compute_then_invalidate():
+        db_cache.invalidate(name)
+        return {'old': True}
+
+    assert db_cache.get_or_compute(name, compute_then_invalidate, ttl=60) == {'old': True}
+    assert db_cache.get_or_compute(name, lambda: {'new': True}, ttl=60) == {'new': True}
+    print("✅ Results overtaken by an invalidation are discarded")
+
+if __name__ == '__main__':
+    test_hit_until_invalidated()
+    test_expires_after_ttl()
+    test_concurrent_misses_share_one_computation()
+    test_invalidation_during_compute_is_not_cached()
+    print("\n🎉 All cache tests passed!")
@@ -0,0 +1,90 @@
+"""
+Test script for single-flight coalescing of db_service reads
+Runs without a MySQL server
+"""
+
+import sys
+import threading
+import time
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app.db_coalesce import coalesce, get_coalesce_stats
+from app.db_router import note_write
+
+def run_together(func, args_list):
+    """Call func once per args tuple from parallel threads; return the results"""
+    results = [None] * len(args_list)
+
+    def call(index, args):
+        results[index] = func(*args)
+
+    threads = [threading.Thread(target=call, args=(i, args)) for i, args in enumerate(args_list)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def make_slow_read(calls, delay=0.05):
+    """A read that records each real execution and takes `delay` seconds"""
+    def slow_read(key):
+        calls.append(key)
+        time.sleep(delay)
+        return [key]
+    return slow_read
+
+def test_identical_calls_share_one_query():
+    """Concurrent calls with the same arguments run the function once"""
+    calls = []
+    read = coalesce(make_slow_read(calls))
+    results = run_together(read, [(1,)] * 6 + [(2,)] * 2)
+
+    assert sorted(calls) == [1, 2]
+    assert results == [[1]] * 6 + [[2]] * 2
+    assert results[0] is not results[1], "Waiters get their own copy of the list"
+    counters = get_coalesce_stats()['functions']['slow_read']
+    assert counters['executed'] == 2 and counters['coalesced'] == 6
+    print("✅ Identical concurrent reads share one query")
+
+def test_write_starts_a_new_flight():
+    """A call made after a local write does not join a query started before it"""
+    calls = []
+    read = coalesce(make_slow_read(calls, delay=0.1))
+    first = threading.Thread(target=read, args=('menu',))
+    first.start()
+    time.sleep(0.02)
+    note_write()
+    read('menu')
+    first.join()
+    assert calls == ['menu', 'menu']
+    print("✅ Reads after a write are not coalesced with older queries")
+
+def test_errors_reach_every_waiter():
+    """If the shared query fails, every caller sees the error"""
+    def failing_read(key):
+        time.sleep(0.05)
+        raise RuntimeError('database went away')
+
+    read = coalesce(failing_read)
+    errors = []
+
+    def call():
+        try:
+            read('x')
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 3
+    assert get_coalesce_stats()['in_flight'] == 0
+    print("✅ Errors propagate to all waiting callers")
+
+if __name__ == '__main__':
+    test_identical_calls_share_one_query()
+    test_write_starts_a_new_flight()
+    test_errors_reach_every_waiter()
+    print("\n🎉 All coalescing tests passed!")
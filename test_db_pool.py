@@ -0,0 +1,188 @@
+"""
+Test script for the database connection pool
+Uses fake connections so it runs without a MySQL server
+"""
+
+import sys
+import threading
+import time
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app import db_pool
+
+def make_fake_connect():
+    """Return a connect function that hands out numbered fake connections"""
+    opened = []
+
+    class FakeConnection:
+        def __init__(self):
+            self.closed = False
+            self.resets = 0
+            self.pings = 0
+            self.alive = True
+
+        def close(self):
+            self.closed = True
+
+    def connect():
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    return connect, opened
+
+def reset(conn):
+    conn.resets += 1
+
+def ping(conn):
+    conn.pings += 1
+    if not conn.alive:
+        raise ConnectionError("server has gone away")
+
+def test_reuses_connections():
+    """A returned connection is handed to the next borrower"""
+    connect, opened = make_fake_connect()
+    pool = db_pool.create_pool(connect, reset=reset, min_size=0, max_size=2)
+
+    first = db_pool.acquire(pool)
+    db_pool.release(pool, first)
+    second = db_pool.acquire(pool)
+
+    assert first is second, "Idle connection should be reused"
+    assert len(opened) == 1
+    assert first.resets == 1, "Connection should be reset on return"
+    print("✅ Connections are reused and reset on return")
+
+def test_checkout_timeout():
+    """Borrowing from an exhausted pool times out"""
+    connect, _ = make_fake_connect()
+    pool = db_pool.create_pool(connect, min_size=0, max_size=1, checkout_timeout=0.05)
+
+    db_pool.acquire(pool)
+    try:
+        db_pool.acquire(pool)
+        assert False, "Second checkout should time out"
+    except db_pool.PoolTimeoutError:
+        pass
+
+    stats = db_pool.get_pool_stats(pool)
+    assert stats['timeouts'] == 1
+    assert stats['in_use'] == 1
+    print("✅ Exhausted pool raises PoolTimeoutError")
+
+def test_waiter_gets_returned_connection():
+    """A waiting borrower is woken when a connection is returned"""
+    connect, opened = make_fake_connect()
+    pool = db_pool.create_pool(connect, min_size=0, max_size=1, checkout_timeout=2)
+    held = db_pool.acquire(pool)
+    result = {}
+
+    def borrower():
+        result['conn'] = db_pool.acquire(pool)
+
+    thread = threading.Thread(target=borrower)
+    thread.start()
+    time.sleep(0.05)
+    db_pool.release(pool, held)
+    thread.join(1)
+
+    assert result.get('conn') is held
+    assert len(opened) == 1
+    assert db_pool.get_pool_stats(pool)['waits'] == 1
+    print("✅ Waiting borrower receives the returned connection")
+
+def test_expired_connections_are_replaced():
+    """Connections past max_lifetime are closed instead of reused"""
+    connect, opened = make_fake_connect()
+    pool = db_pool.create_pool(connect, min_size=0, max_size=2, max_lifetime=0.01)
+
+    first = db_pool.acquire(pool)
+    time.sleep(0.02)
+    db_pool.release(pool, first)
+    second = db_pool.acquire(pool)
+
+    assert first.closed, "Expired connection should be closed"
+    assert second is not first
+    assert len(opened) == 2
+    print("✅ Expired connections are recycled")
+
+def test_failed_reset_discards_connection():
+    """A connection whose reset fails is not put back in the pool"""
+    connect, _ = make_fake_connect()
+
+    def failing_reset(conn):
+        raise RuntimeError("connection lost")
+
+    pool = db_pool.create_pool(connect, reset=failing_reset, min_size=0, max_size=1)
+    conn = db_pool.acquire(pool)
+    db_pool.release(pool, conn)
+
+    stats = db_pool.get_pool_stats(pool)
+    assert conn.closed
+    assert stats['size'] == 0 and stats['idle'] == 0
+    print("✅ Broken connections are discarded on return")
+
+def test_fill_pool_opens_min_size():
+    """fill_pool pre-opens min_size connections"""
+    connect, opened = make_fake_connect()
+    pool = db_pool.create_pool(connect, min_size=3, max_size=5)
+    db_pool.fill_pool(pool)
+
+    stats = db_pool.get_pool_stats(pool)
+    assert len(opened) == 3
+    assert stats['idle'] == 3 and stats['size'] == 3
+    print("✅ Pool pre-opens min_size connections")
+
+def test_recent_connections_skip_ping():
+    """Connections reused within validate_idle are not pinged"""
+    connect, _ = make_fake_connect()
+    pool = db_pool.create_pool(connect, validate=ping, min_size=0, max_size=1, validate_idle=60)
+
+    for _ in range(3):
+        conn = db_pool.acquire(pool)
+        db_pool.release(pool, conn)
+
+    stats = db_pool.get_pool_stats(pool)
+    assert conn.pings == 0
+    assert stats['pings_avoided'] == 2 and stats['pings_performed'] == 0
+    print("✅ Recently used connections are trusted without a ping")
+
+def test_idle_connection_is_pinged_and_replaced():
+    """A dead connection found after idling is replaced transparently"""
+    connect, opened = make_fake_connect()
+    pool = db_pool.create_pool(connect, validate=ping, min_size=0, max_size=1, validate_idle=0.01)
+
+    first = db_pool.acquire(pool)
+    db_pool.release(pool, first)
+    first.alive = False
+    time.sleep(0.02)
+    second = db_pool.acquire(pool)
+
+    stats = db_pool.get_pool_stats(pool)
+    assert second is not first and first.closed
+    assert len(opened) == 2
+    assert stats['pings_performed'] == 1 and stats['ping_failures'] == 1
+    print("✅ Idle dead connections are detected and replaced")
+
+def test_connection_returned_after_error_is_pinged():
+    """needs_check forces a ping on the next checkout"""
+    connect, _ = make_fake_connect()
+    pool = db_pool.create_pool(connect, validate=ping, min_size=0, max_size=1, validate_idle=60)
+
+    conn = db_pool.acquire(pool)
+    db_pool.release(pool, conn, needs_check=True)
+    assert db_pool.acquire(pool) is conn
+    assert conn.pings == 1
+    print("✅ Connections returned after an error are validated")
+
+if __name__ == '__main__':
+    test_reuses_connections()
+    test_checkout_timeout()
+    test_waiter_gets_returned_connection()
+    test_expired_connections_are_replaced()
+    test_failed_reset_discards_connection()
+    test_fill_pool_opens_min_size()
+    test_recent_connections_skip_ping()
+    test_idle_connection_is_pinged_and_replaced()
+    test_connection_returned_after_error_is_pinged()
+    print("\n🎉 All connection pool tests passed!")
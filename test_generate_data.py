@@ -0,0 +1,72 @@
+"""
+Test script for the synthetic data generator (generate_data.py)
+Checks the generated rows without loading them, since loading recreates the
+schema: determinism, volumes, totals and the shape of the distributions
+"""
+
+import random
+import sys
+from collections import Counter
+from datetime import date
+sys.stdout.reconfigure(encoding='utf-8')
+
+from generate_data import TAX_RATE, order_rows, orders_per_day, pizza_rows
+
+END = date(2025, 1, 1)
+
+def generate(seed, count=5000):
+    """Materialise `count` generated orders for 500 customers over 60 days"""
+    return list(order_rows(random.Random(seed), count, customers=500, employees=10, days=60, end=END))
+
+def test_same_seed_same_rows():
+    """A seed always produces the same orders, and another seed does not"""
+    assert generate(7) == generate(7)
+    assert generate(7) != generate(8)
+    print("✅ Generated data is deterministic per seed")
+
+def test_volumes_and_totals():
+    """Order counts, ids, dates and money add up"""
+    per_day = orders_per_day(12345, 30, END)
+    assert sum(n for _, n in per_day) == 12345 and per_day[-1][0] < END
+
+    prices = {pizza_id: row[3] for pizza_id, row in enumerate(pizza_rows(), start=1)}
+    orders = generate(1)
+    assert [order[0] for order, _ in orders] == list(range(1, len(orders) + 1))
+    assert [order[3] for order, _ in orders] == sorted(order[3] for order, _ in orders)
+    for order, details in orders:
+        assert details and all(detail[0] == order[0] for detail in details)
+        assert all(detail[3] == prices[detail[1]] for detail in details)
+        assert order[4] == round(sum(detail[4] for detail in details), 2)
+        assert order[6] == round(order[4] * TAX_RATE, 2)
+        assert order[7] == round(order[4] + order[6], 2)
+        assert 1 <= order[1] <= 500 and 1 <= order[2] <= 10
+    print("✅ Volumes, ids and order totals are consistent")
+
+def test_distributions_are_skewed():
+    """Dinner beats mid-afternoon, regulars and favourite pizzas dominate"""
+    orders = generate(3, count=20000)
+    hours = Counter(order[3].hour for order, _ in orders)
+    assert hours[18] > 3 * hours[15]
+    assert set(hours) <= set(range(11, 23))
+
+    # The first tenth of the customers place a large share of the orders
+    regulars = sum(1 for order, _ in orders if order[1] <= 50)
+    assert regulars > 0.3 * len(orders)
+
+    sold = Counter()
+    for _, details in orders:
+        for detail in details:
+            sold[detail[1]] += detail[2]
+    ranked = sorted(sold.values(), reverse=True)
+    assert ranked[0] > 5 * ranked[-1]
+
+    statuses = Counter(order[8] for order, _ in orders)
+    assert statuses['Completed'] > 0.9 * len(orders) and statuses['Cancelled'] > 0
+    assert all(order[8] in ('Pending', 'In Progress') for order, _ in orders[-10:])
+    print("✅ Time-of-day, customer and pizza distributions are skewed")
+
+if __name__ == '__main__':
+    test_same_seed_same_rows()
+    test_volumes_and_totals()
+    test_distributions_are_skewed()
+    print("\n🎉 All generator tests passed!")
@@ -0,0 +1,125 @@
+"""
+Test script for idempotent order creation (Idempotency-Key on /orders/create)
+Checks replays, concurrent retries, key reuse and expiry
+"""
+
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app import db_service
+from app.db_backend import connect
+
+def order_payload(pizza_id, quantity=1):
+    """A one-line order for pizza_id"""
+    return {'customer_id': 1, 'tax_rate': 0.07, 'notes': 'idempotency test',
+            'items': [{'pizza_id': pizza_id, 'quantity': quantity}]}
+
+def test_retry_returns_original_order(logged_in_client, orderable_pizza_ids, count_orders):
+    """A retry with the same key returns the first order without creating another"""
+    client = logged_in_client()
+    key = str(uuid.uuid4())
+    payload = order_payload(orderable_pizza_ids()[0])
+    before = count_orders()
+
+    first = client.post('/orders/create', json=payload, headers={'Idempotency-Key': key})
+    retry = client.post('/orders/create', json=payload, headers={'Idempotency-Key': key})
+
+    assert first.status_code == retry.status_code == 200
+    assert first.get_json() == retry.get_json()
+    assert 'Idempotent-Replayed' not in first.headers
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert count_orders() == (before[0] + 1, before[1] + 1)
+    print("✅ Retries replay the original response")
+
+def test_concurrent_retries_create_one_order(logged_in_client, orderable_pizza_ids, count_orders):
+    """Retries racing the original request still produce a single order"""
+    key = str(uuid.uuid4())
+    payload = order_payload(orderable_pizza_ids()[0])
+    before = count_orders()
+    responses = []
+
+    def send():
+        responses.append(logged_in_client().post('/orders/create', json=payload, headers={'Idempotency-Key': key}))
+
+    threads = [threading.Thread(target=send) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(response.status_code == 200 for response in responses)
+    assert len({response.get_json()['order_id'] for response in responses}) == 1
+    assert count_orders() == (before[0] + 1, before[1] + 1)
+    print("✅ Concurrent retries create one order")
+
+def test_key_reused_for_different_order_is_rejected(logged_in_client, orderable_pizza_ids):
+    """Sending a different order with a used key is refused"""
+    client = logged_in_client()
+    key = str(uuid.uuid4())
+    pizza_id = orderable_pizza_ids()[0]
+    client.post('/orders/create', json=order_payload(pizza_id, 1), headers={'Idempotency-Key': key})
+    response = client.post('/orders/create', json=order_payload(pizza_id, 2), headers={'Idempotency-Key': key})
+    assert response.status_code == 422
+    print("✅ Reusing a key for a different order is rejected")
+
+def test_expired_keys_are_purged(logged_in_client, orderable_pizza_ids):
+    """Keys older than the TTL are removed by the next keyed order"""
+    client = logged_in_client()
+    old_key = str(uuid.uuid4())
+    client.post('/orders/create', json=order_payload(orderable_pizza_ids()[0]), headers={'Idempotency-Key': old_key})
+
+    conn = connect()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE order_idempotency_keys SET created_at = %s WHERE idempotency_key = %s",
+                   (datetime.now() - timedelta(days=2), old_key))
+    conn.commit()
+
+    db_service._idempotency_cleanup['last_run'] = 0.0
+    client.post('/orders/create', json=order_payload(orderable_pizza_ids()[0]), headers={'Idempotency-Key': str(uuid.uuid4())})
+
+    cursor.execute("SELECT COUNT(*) AS n FROM order_idempotency_keys WHERE idempotency_key = %s", (old_key,))
+    assert cursor.fetchone()['n'] == 0
+    cursor.close()
+    conn.close()
+    print("✅ Expired idempotency keys are purged")
+
+def test_expired_key_is_not_replayed(logged_in_client, orderable_pizza_ids, count_orders):
+    """A key past the TTL creates a new order even before the purge removes it"""
+    client = logged_in_client()
+    key = str(uuid.uuid4())
+    payload = order_payload(orderable_pizza_ids()[0])
+    first = client.post('/orders/create', json=payload, headers={'Idempotency-Key': key})
+
+    conn = connect()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE order_idempotency_keys SET created_at = %s WHERE idempotency_key = %s",
+                   (datetime.now() - timedelta(days=2), key))
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+    db_service._idempotency_cleanup['last_run'] = time.monotonic()  # keep the purge out of it
+    before = count_orders()
+    again = client.post('/orders/create', json=payload, headers={'Idempotency-Key': key})
+    assert again.status_code == 200
+    assert 'Idempotent-Replayed' not in again.headers
+    assert again.get_json()['order_id'] != first.get_json()['order_id']
+    assert count_orders() == (before[0] + 1, before[1] + 1)
+
+    retry = client.post('/orders/create', json=payload, headers={'Idempotency-Key': key})
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert retry.get_json()['order_id'] == again.get_json()['order_id']
+    print("✅ Expired keys are not replayed")
+
+if __name__ == '__main__':
+    from conftest import count_orders, login_client, orderable_pizza_ids
+    test_retry_returns_original_order(login_client, orderable_pizza_ids, count_orders)
+    test_concurrent_retries_create_one_order(login_client, orderable_pizza_ids, count_orders)
+    test_key_reused_for_different_order_is_rejected(login_client, orderable_pizza_ids)
+    test_expired_keys_are_purged(login_client, orderable_pizza_ids)
+    test_expired_key_is_not_replayed(login_client, orderable_pizza_ids, count_orders)
+    print("\n🎉 All idempotency tests passed!")
@@ -0,0 +1,96 @@
+"""
+Test script for the in-memory pizza menu index
+Checks that menu reads stop querying once loaded, and that writes from this
+worker and from other workers (via cache_versions) are picked up
+"""
+
+import os
+import sys
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app import app
+from app.db_backend import connect
+from app.db_cache import bump_version
+from app.db_menu import MENU_VERSION_NAME, get_menu_stats
+from app.db_service import (
+    create_pizza, get_all_pizzas, get_available_pizzas, get_pizza_by_id,
+    get_pizza_by_name_size, get_pizzas_by_category, permanently_delete_pizza
+)
+
+def test_reads_are_served_from_memory():
+    """Once loaded, menu reads run no queries"""
+    with app.test_request_context():
+        pizzas = get_all_pizzas()
+        before = get_menu_stats()
+        for _ in range(50):
+            get_available_pizzas()
+            get_pizza_by_id(pizzas[0].pizza_id)
+            get_pizzas_by_category()
+        after = get_menu_stats()
+
+    assert pizzas, "Sample data should include pizzas"
+    assert (after['loads'], after['version_checks']) == (before['loads'], before['version_checks'])
+    assert after['hits'] >= before['hits'] + 150
+    print("✅ Menu reads are served from memory")
+
+def test_indexes_agree_with_menu():
+    """The category and name/size indexes cover the same pizzas as the list"""
+    with app.test_request_context():
+        pizzas = get_all_pizzas()
+        by_category = get_pizzas_by_category()
+        first = pizzas[0]
+        found = get_pizza_by_name_size(first.name, first.size)
+
+    assert sum(len(group) for group in by_category.values()) == len(pizzas)
+    assert all(p.category == category for category, group in by_category.items() for p in group)
+    assert found.pizza_id == first.pizza_id
+    print("✅ Category and name/size indexes match the menu")
+
+def test_local_write_invalidates():
+    """A pizza created by this worker is visible immediately"""
+    with app.test_request_context():
+        get_all_pizzas()
+        pizza_id = create_pizza('Index Test', None, 'Small', 9.99, 'Specialty')
+        try:
+            assert get_pizza_by_id(pizza_id).name == 'Index Test'
+            assert any(p.pizza_id == pizza_id for p in get_available_pizzas())
+        finally:
+            permanently_delete_pizza(pizza_id)
+        assert get_pizza_by_id(pizza_id) is None
+    print("✅ Local pizza writes refresh the index immediately")
+
+def test_other_worker_write_is_noticed():
+    """A write that bumps the shared menu version is picked up at the next check"""
+    with app.test_request_context():
+        pizza = get_all_pizzas()[0]
+
+    # Simulate another worker renaming the pizza
+    conn = connect()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE pizzas SET name = %s WHERE pizza_id = %s", ('Renamed Elsewhere', pizza.pizza_id))
+    bump_version(cursor, MENU_VERSION_NAME)
+    conn.commit()
+
+    os.environ['MENU_VERSION_CHECK_SECONDS'] = '0'
+    try:
+        with app.test_request_context():
+            assert get_pizza_by_id(pizza.pizza_id).name == 'Renamed Elsewhere'
+            # An unchanged version costs one check but no reload
+            loads = get_menu_stats()['loads']
+            get_all_pizzas()
+            assert get_menu_stats()['loads'] == loads
+    finally:
+        del os.environ['MENU_VERSION_CHECK_SECONDS']
+        cursor.execute("UPDATE pizzas SET name = %s WHERE pizza_id = %s", (pizza.name, pizza.pizza_id))
+        bump_version(cursor, MENU_VERSION_NAME)
+        conn.commit()
+        cursor.close()
+        conn.close()
+    print("✅ Other workers' menu changes are noticed via the version counter")
+
+if __name__ == '__main__':
+    test_reads_are_served_from_memory()
+    test_indexes_agree_with_menu()
+    test_local_write_invalidates()
+    test_other_worker_write_is_noticed()
+    print("\n🎉 All menu index tests passed!")
@@ -0,0 +1,107 @@
+"""
+Test script for optimistic concurrency on updates
+An edit sent with the version it was loaded at only applies if nobody saved
+the row in between; otherwise the route answers 409 with the current row
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app import app
+from app.db_service import create_order
+
+def customer_form(customer, **changes):
+    """Edit-form fields for a customer as returned by /customers/get"""
+    form = {key: customer[key] or '' for key in
+            ('first_name', 'last_name', 'email', 'phone', 'address', 'city', 'state', 'zip_code')}
+    form['version'] = customer['version']
+    form.update(changes)
+    return form
+
+def test_second_customer_edit_is_refused(logged_in_client, query):
+    """Two clerks load the same customer; the later save gets 409 and the current row"""
+    client = logged_in_client()
+    customer_id = query("SELECT customer_id FROM customers WHERE archived = FALSE LIMIT 1")[0]['customer_id']
+    loaded = client.get(f'/customers/get/{customer_id}').get_json()['customer']
+
+    first = client.post(f'/customers/update/{customer_id}', data=customer_form(loaded, city='Macon'))
+    assert first.status_code == 200
+
+    second = client.post(f'/customers/update/{customer_id}', data=customer_form(loaded, city='Athens'))
+    body = second.get_json()
+    assert second.status_code == 409
+    assert body['customer']['city'] == 'Macon'
+    assert body['customer']['version'] == loaded['version'] + 1
+
+    # Retrying on top of the current row succeeds
+    retry = client.post(f'/customers/update/{customer_id}', data=customer_form(body['customer'], city=loaded['city']))
+    assert retry.status_code == 200
+    assert query("SELECT version FROM customers WHERE customer_id = %s", (customer_id,))[0]['version'] == loaded['version'] + 2
+    print("✅ A stale customer edit is refused with the current row")
+
+def test_stale_pizza_edit_is_refused(logged_in_client, query):
+    """Pizza edits check the version too"""
+    client = logged_in_client()
+    pizza_id = query("SELECT pizza_id FROM pizzas WHERE archived = FALSE LIMIT 1")[0]['pizza_id']
+    pizza = client.get(f'/pizzas/get/{pizza_id}').get_json()['pizza']
+    form = {key: pizza[key] or '' for key in ('name', 'description', 'size', 'base_price', 'category')}
+    form['available'] = 'true' if pizza['available'] else 'false'
+
+    response = client.post(f'/pizzas/update/{pizza_id}', data=dict(form, version=pizza['version'] - 1))
+    assert response.status_code == 409
+    assert response.get_json()['pizza']['version'] == pizza['version']
+
+    response = client.post(f'/pizzas/update/{pizza_id}', data=dict(form, version=pizza['version']))
+    assert response.status_code == 200
+    print("✅ A stale pizza edit is refused; a current one applies")
+
+def test_stale_order_status_is_refused(logged_in_client, query, orderable_pizza_ids):
+    """A status change made from an old page does not overwrite a newer one"""
+    pizza_id = orderable_pizza_ids()[0]
+    with app.test_request_context():
+        order_id = create_order(1, 1, [(pizza_id, 1)])
+    version = query("SELECT version FROM orders WHERE order_id = %s", (order_id,))[0]['version']
+
+    client = logged_in_client()
+    assert client.post(f'/orders/update-status/{order_id}',
+                       data={'status': 'In Progress', 'version': version}).status_code == 200
+    response = client.post(f'/orders/update-status/{order_id}',
+                           data={'status': 'Cancelled', 'version': version})
+    assert response.status_code == 409
+    assert response.get_json()['order']['status'] == 'In Progress'
+    assert query("SELECT status FROM orders WHERE order_id = %s", (order_id,))[0]['status'] == 'In Progress'
+
+    # Requests without a version keep the old last-write-wins behaviour
+    assert client.post(f'/orders/update-status/{order_id}', data={'status': 'Completed'}).status_code == 200
+    print("✅ A stale order status change is refused")
+
+def test_missing_rows_are_not_found(logged_in_client):
+    """Updating a row that no longer exists answers 404, with or without a version"""
+    client = logged_in_client()
+    for data in ({'status': 'Completed'}, {'status': 'Completed', 'version': 1}):
+        response = client.post('/orders/update-status/999999', data=data)
+        assert response.status_code == 404
+        assert response.get_json()['message'] == 'Order not found.'
+    response = client.post('/customers/update/999999', data={
+        'first_name': 'Gone', 'last_name': 'Customer', 'email': 'gone@test.com', 'phone': '555-0100',
+        'address': '1 Main St', 'city': 'Macon', 'state': 'GA', 'zip_code': '31201', 'version': 1})
+    assert response.status_code == 404
+    print("✅ Updates to missing rows answer 404")
+
+def test_malformed_versions_are_bad_requests(logged_in_client):
+    """A version that is not a whole number is refused with 400 before anything is updated"""
+    client = logged_in_client()
+    for url in ('/customers/update/1', '/employees/update/1', '/pizzas/update/1', '/orders/update-status/1'):
+        response = client.post(url, data={'status': 'Completed', 'version': 'abc'})
+        assert response.status_code == 400, url
+        assert response.get_json()['message'] == 'version must be a whole number.'
+    print("✅ Malformed versions answer 400")
+
+if __name__ == '__main__':
+    from conftest import login_client, orderable_pizza_ids, run_query
+    test_second_customer_edit_is_refused(login_client, run_query)
+    test_stale_pizza_edit_is_refused(login_client, run_query)
+    test_stale_order_status_is_refused(login_client, run_query, orderable_pizza_ids)
+    test_missing_rows_are_not_found(login_client)
+    test_malformed_versions_are_bad_requests(login_client)
+    print("\n🎉 All optimistic locking tests passed!")
@@ -0,0 +1,60 @@
+"""
+Test script for order creation
+Checks that line prices come from the pizzas table, that large orders are
+written completely, and that a bad line leaves nothing behind
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app import app
+from app.db_service import create_order, delete_order, get_available_pizzas, get_order_by_id, get_order_details
+
+def test_prices_come_from_the_menu():
+    """Client-supplied unit prices are ignored in favour of the pizza's base price"""
+    with app.test_request_context():
+        pizza = get_available_pizzas()[0]
+        order_id = create_order(1, 1, [(pizza.pizza_id, 2, 0.01)], tax_rate=0.07)
+        try:
+            details = get_order_details(order_id)
+            order = get_order_by_id(order_id)
+            assert details[0].unit_price == pizza.base_price
+            assert order.subtotal == round(2 * pizza.base_price, 2)
+        finally:
+            delete_order(order_id)
+    print("✅ Unit prices are looked up server-side")
+
+def test_large_order_is_written_in_full():
+    """A 200-line order stores every line and the matching totals"""
+    with app.test_request_context():
+        pizzas = get_available_pizzas()
+        items = [(pizzas[i % len(pizzas)].pizza_id, 1 + i % 3) for i in range(200)]
+        order_id = create_order(1, 1, items, tax_rate=0)
+        try:
+            details = get_order_details(order_id)
+            order = get_order_by_id(order_id)
+            assert len(details) == 200
+            assert round(sum(d.subtotal for d in details), 2) == order.total_amount
+        finally:
+            delete_order(order_id)
+    print("✅ 200-line order is stored in full")
+
+def test_unknown_pizza_rolls_back(count_orders):
+    """An order with a pizza that is not on the menu is rejected without writing anything"""
+    before = count_orders()
+    with app.test_request_context():
+        pizza = get_available_pizzas()[0]
+        try:
+            create_order(1, 1, [(pizza.pizza_id, 1), (999999, 1)])
+            assert False, "Expected ValueError"
+        except ValueError as e:
+            assert '999999' in str(e)
+    assert count_orders() == before
+    print("✅ Orders with unknown pizzas are rejected")
+
+if __name__ == '__main__':
+    from conftest import count_orders
+    test_prices_come_from_the_menu()
+    test_large_order_is_written_in_full()
+    test_unknown_pizza_rolls_back(count_orders)
+    print("\n🎉 All order pricing tests passed!")
@@ -0,0 +1,66 @@
+"""
+Test script for keyset pagination of the listing pages
+Walks the seeded sample data forwards and backwards page by page
+"""
+
+import sys
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app import app
+from app.db_pagination import MAX_PAGE_SIZE, clamp_page_size, decode_cursor, encode_cursor
+from app.db_service import get_all_customers, get_all_orders, get_customers_page, get_orders_page
+
+def walk(get_page, page_size):
+    """Follow next tokens to the end, then prev tokens back to the start"""
+    pages = [get_page(None, page_size)]
+    while pages[-1]['next_cursor']:
+        pages.append(get_page(pages[-1]['next_cursor'], page_size))
+
+    backwards = [pages[-1]]
+    while backwards[-1]['prev_cursor']:
+        backwards.append(get_page(backwards[-1]['prev_cursor'], page_size))
+    return pages, backwards[::-1]
+
+def test_customer_pages_cover_listing():
+    """Paging through customers yields the unpaged listing in order, both ways"""
+    with app.test_request_context():
+        expected = [c.customer_id for c in get_all_customers()]
+        pages, backwards = walk(get_customers_page, 2)
+
+        forward_ids = [c.customer_id for page in pages for c in page['items']]
+        backward_ids = [c.customer_id for page in backwards for c in page['items']]
+        assert forward_ids == expected
+        assert backward_ids == expected
+        assert pages[0]['prev_cursor'] is None
+        assert pages[0]['total'] == len(expected)
+    print("✅ Customer pages match the full listing forwards and backwards")
+
+def test_order_pages_break_date_ties():
+    """Orders sharing an order_date are neither skipped nor repeated"""
+    with app.test_request_context():
+        expected = [o.order_id for o in get_all_orders()]
+        pages, _ = walk(get_orders_page, 1)
+
+        ids = [o.order_id for page in pages for o in page['items']]
+        assert sorted(ids) == sorted(expected)
+        assert len(ids) == len(set(ids))
+        dates = [o.order_date for page in pages for o in page['items']]
+        assert dates == sorted(dates, reverse=True)
+    print("✅ Order pages are newest first with no gaps or repeats")
+
+def test_tokens_and_page_size():
+    """Bad tokens fall back to the first page and page sizes are capped"""
+    assert clamp_page_size('1000') == MAX_PAGE_SIZE
+    assert clamp_page_size('abc') == clamp_page_size(None)
+    assert decode_cursor('not-a-token', 2) is None
+    assert decode_cursor(encode_cursor('next', [1, 2, 3]), 2) is None
+    with app.test_request_context():
+        first_page = [c.customer_id for c in get_customers_page(None, 2)['items']]
+        assert [c.customer_id for c in get_customers_page('garbage', 2)['items']] == first_page
+    print("✅ Invalid cursors and page sizes are handled")
+
+if __name__ == '__main__':
+    test_customer_pages_cover_listing()
+    test_order_pages_break_date_ties()
+    test_tokens_and_page_size()
+    print("\n🎉 All pagination tests passed!")
@@ -0,0 +1,87 @@
+"""
+Test script for password hashing in the process pool
+Checks hashing and verification round trips, the queue limit, and that
+logins upgrade hashes made with old parameters
+"""
+
+import os
+import sys
+import threading
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app import app, passwords
+from app.db_service import create_employee, delete_employee
+from app.passwords import PasswordHasherBusy, hash_password, needs_rehash, verify_password
+
+def test_hash_and_verify_in_pool():
+    """Hashes made in the pool verify there, and wrong passwords fail"""
+    before = passwords.get_password_stats()
+    password_hash = hash_password('slice-of-life')
+    assert verify_password(password_hash, 'slice-of-life')
+    assert not verify_password(password_hash, 'wrong')
+    assert not verify_password(None, 'slice-of-life')
+    after = passwords.get_password_stats()
+    assert after['hashed'] == before['hashed'] + 1
+    assert after['verified'] == before['verified'] + 2
+    print("✅ Passwords hash and verify in the pool")
+
+def test_full_queue_is_refused():
+    """Jobs beyond the workers plus the queue limit fail fast instead of piling up"""
+    os.environ.update(PASSWORD_HASH_WORKERS='1', PASSWORD_HASH_QUEUE_LIMIT='0',
+                      PASSWORD_HASH_METHOD='pbkdf2:sha256:3000000')
+    passwords._pool['pid'] = None  # rebuild the pool with the settings above
+    outcomes = []
+
+    def login_attempt():
+        try:
+            hash_password('rush')
+            outcomes.append('hashed')
+        except PasswordHasherBusy:
+            outcomes.append('busy')
+
+    try:
+        threads = [threading.Thread(target=login_attempt) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        passwords._pool['executor'].shutdown()
+        passwords._pool['pid'] = None
+        for name in ('PASSWORD_HASH_WORKERS', 'PASSWORD_HASH_QUEUE_LIMIT', 'PASSWORD_HASH_METHOD'):
+            del os.environ[name]
+
+    assert 'hashed' in outcomes and 'busy' in outcomes, outcomes
+    print("✅ A saturated hashing pool refuses extra jobs")
+
+def test_login_upgrades_old_hashes(query):
+    """Signing in rehashes a password stored with other parameters"""
+    os.environ['PASSWORD_HASH_METHOD'] = 'pbkdf2:sha256:1000'
+    try:
+        with app.test_request_context():
+            employee_id = create_employee('Rehash', 'Test', 'rehash@test.com', None, 'Staff',
+                                          'password123', '2024-01-01')
+    finally:
+        del os.environ['PASSWORD_HASH_METHOD']
+
+    try:
+        old_hash = query("SELECT password_hash FROM employees WHERE employee_id = %s", (employee_id,))[0]['password_hash']
+        assert old_hash.startswith('pbkdf2:sha256:1000$') and needs_rehash(old_hash)
+
+        response = app.test_client().post('/auth/login', data={'email': 'rehash@test.com', 'password': 'password123'})
+        assert response.status_code == 302
+
+        new_hash = query("SELECT password_hash FROM employees WHERE employee_id = %s", (employee_id,))[0]['password_hash']
+        assert new_hash.startswith('scrypt:32768:8:1$') and not needs_rehash(new_hash)
+        assert verify_password(new_hash, 'password123')
+    finally:
+        with app.test_request_context():
+            delete_employee(employee_id)
+    print("✅ Logins upgrade hashes made with old parameters")
+
+if __name__ == '__main__':
+    from conftest import run_query
+    test_hash_and_verify_in_pool()
+    test_full_queue_is_refused()
+    test_login_upgrades_old_hashes(run_query)
+    print("\n🎉 All password hashing tests passed!")
@@ -0,0 +1,134 @@
+"""
+Test script for the signed-in employee (principal) cache
+Checks that authenticated requests stop querying for the employee, that the
+cached principal has no password hash, and that employee writes from this
+worker and from other workers (via cache_versions) are picked up
+"""
+
+import os
+import sys
+import threading
+import time
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app import app
+from app.db_backend import connect
+from app import db_principal
+from app.db_cache import bump_version
+from app.db_principal import PRINCIPAL_VERSION_NAME, get_principal, get_principal_stats
+from app.db_service import create_employee, delete_employee, get_employee_by_id, update_employee
+
+def test_requests_do_not_query_for_the_employee(logged_in_client):
+    """Once cached, authenticated requests load the employee from memory"""
+    os.environ['PRINCIPAL_VERSION_CHECK_SECONDS'] = '3600'
+    try:
+        client = logged_in_client()
+        assert client.get('/db-stats').status_code == 200
+        before = get_principal_stats()
+        for _ in range(20):
+            assert client.get('/db-stats').status_code == 200
+        after = get_principal_stats()
+    finally:
+        del os.environ['PRINCIPAL_VERSION_CHECK_SECONDS']
+
+    assert (after['misses'], after['version_checks']) == (before['misses'], before['version_checks'])
+    assert after['hits'] >= before['hits'] + 20
+    print("✅ Authenticated requests are served from the principal cache")
+
+def test_principal_has_no_password_hash():
+    """The cached principal never carries the password hash"""
+    with app.test_request_context():
+        principal = get_principal(1)
+    assert principal is not None and principal.is_authenticated
+    assert not hasattr(principal, 'password_hash')
+    print("✅ Cached principals carry no password hash")
+
+def test_local_write_invalidates():
+    """An employee edited by this worker is reloaded on the next request"""
+    with app.test_request_context():
+        employee = get_employee_by_id(1)
+        get_principal(1)
+        try:
+            update_employee(1, employee.first_name, employee.last_name, employee.email,
+                            '555-0199', employee.role, employee.active)
+            assert get_principal(1).phone == '555-0199'
+        finally:
+            update_employee(1, employee.first_name, employee.last_name, employee.email,
+                            employee.phone, employee.role, employee.active)
+        assert get_principal(1).phone == employee.phone
+
+        employee_id = create_employee('Cache', 'Test', 'principal.cache@test.com', None, 'Staff',
+                                      'password123', '2024-01-01')
+        assert get_principal(employee_id).email == 'principal.cache@test.com'
+        delete_employee(employee_id)
+        assert get_principal(employee_id) is None
+    print("✅ Local employee writes drop the cached principal")
+
+def test_other_worker_write_is_noticed(logged_in_client):
+    """A deactivation that bumps the shared employees version signs the employee out"""
+    with app.test_request_context():
+        employee_id = create_employee('Elsewhere', 'Test', 'principal.elsewhere@test.com', None, 'Staff',
+                                      'password123', '2024-01-01')
+        assert get_principal(employee_id).is_authenticated
+
+    # Simulate another worker deactivating the employee
+    conn = connect()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE employees SET active = FALSE WHERE employee_id = %s", (employee_id,))
+    bump_version(cursor, PRINCIPAL_VERSION_NAME)
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+    os.environ['PRINCIPAL_VERSION_CHECK_SECONDS'] = '0'
+    try:
+        response = logged_in_client(employee_id).get('/db-stats')
+        assert response.status_code == 302, "A deactivated employee must be sent to the login page"
+    finally:
+        del os.environ['PRINCIPAL_VERSION_CHECK_SECONDS']
+        with app.test_request_context():
+            delete_employee(employee_id)
+    print("✅ Other workers' employee changes are noticed via the version counter")
+
+def test_version_check_is_single_flight():
+    """Requests arriving while one re-reads the version use the cache instead of queuing"""
+    with app.test_request_context():
+        assert get_principal(1) is not None
+    calls = []
+    read_version = db_principal.read_version
+
+    def slow_read_version(cursor, name):
+        calls.append(name)
+        time.sleep(0.2)
+        return read_version(cursor, name)
+
+    results = []
+    def load():
+        with app.test_request_context():
+            results.append(get_principal(1))
+
+    os.environ['PRINCIPAL_VERSION_CHECK_SECONDS'] = '3600'
+    db_principal.read_version = slow_read_version
+    db_principal._principal_state['checked_at'] = 0.0
+    try:
+        threads = [threading.Thread(target=load) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        db_principal.read_version = read_version
+        del os.environ['PRINCIPAL_VERSION_CHECK_SECONDS']
+
+    assert len(calls) == 1, calls
+    assert len(results) == 8 and all(principal is not None for principal in results)
+    print("✅ Only one request per interval re-reads the employees version")
+
+if __name__ == '__main__':
+    from conftest import login_client
+    test_requests_do_not_query_for_the_employee(login_client)
+    test_principal_has_no_password_hash()
+    test_local_write_invalidates()
+    test_other_worker_write_is_noticed(login_client)
+    test_version_check_is_single_flight()
+    print("\n🎉 All principal cache tests passed!")
@@ -0,0 +1,87 @@
+"""
+Test script for streamed report pages and the order export
+Checks responses arrive in pieces and the connection is returned afterwards
+"""
+
+import csv
+import gzip
+import io
+import json
+import sys
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app import app
+from app.db_connect import get_pool_stats
+from app.db_service import get_all_orders, iter_customers
+from app.streaming import buffered
+
+def test_buffered_groups_small_chunks():
+    """Small template chunks are joined into larger writes without losing text"""
+    pieces = list(buffered(['ab', 'cd', 'ef', 'g'], size=4))
+    assert pieces == ['abcd', 'efg']
+    print("✅ Chunks are grouped without losing any text")
+
+def test_order_report_streams_every_order(logged_in_client):
+    """The order report is a streamed response listing every order"""
+    with app.app_context():
+        expected = get_all_orders()
+    in_use_before = get_pool_stats()['in_use']
+
+    response = logged_in_client().get('/orders/report', buffered=False)
+    assert response.status_code == 200
+    assert response.is_streamed
+    body = b''.join(response.response).decode()
+    response.close()
+
+    for order in expected:
+        assert f"#{order.order_id}</a>" in body
+    assert f"{len(expected)} orders" in body
+    assert get_pool_stats()['in_use'] == in_use_before, "Connection should be released once the stream ends"
+    print("✅ Order report streams every order and releases its connection")
+
+def test_iter_customers_is_lazy():
+    """Customers are produced one at a time from the cursor"""
+    with app.test_request_context():
+        customers = iter_customers()
+        first = next(customers)
+        rest = list(customers)
+    assert first.customer_id not in [c.customer_id for c in rest]
+    print("✅ Customers stream lazily")
+
+def test_order_export_csv_and_resume(logged_in_client):
+    """The CSV export has one row per line item and resumes after an order_id"""
+    client = logged_in_client()
+    rows = list(csv.DictReader(io.StringIO(client.get('/orders/export').get_data(as_text=True))))
+    order_ids = sorted({int(row['order_id']) for row in rows})
+    assert order_ids, "Sample data should have orders"
+    assert all(row['pizza_name'] for row in rows)
+
+    resumed = csv.DictReader(io.StringIO(
+        client.get(f'/orders/export?after={order_ids[0]}').get_data(as_text=True)
+    ))
+    assert sorted({int(row['order_id']) for row in resumed}) == order_ids[1:]
+    print("✅ CSV export lists every line item and resumes by order_id")
+
+def test_order_export_ndjson_gzip(logged_in_client):
+    """NDJSON export nests line items per order and is gzipped on request"""
+    response = logged_in_client().get(
+        '/orders/export?format=ndjson&status=Completed',
+        headers={'Accept-Encoding': 'gzip'}
+    )
+    assert response.headers['Content-Encoding'] == 'gzip'
+    orders = [json.loads(line) for line in gzip.decompress(response.get_data()).splitlines()]
+    assert orders and all(order['status'] == 'Completed' for order in orders)
+    assert all(order['items'] for order in orders)
+
+    bad = logged_in_client().get('/orders/export?start=yesterday')
+    assert bad.status_code == 400
+    print("✅ NDJSON export filters, nests items and gzips")
+
+if __name__ == '__main__':
+    from conftest import login_client
+    test_buffered_groups_small_chunks()
+    test_order_report_streams_every_order(login_client)
+    test_iter_customers_is_lazy()
+    test_order_export_csv_and_resume(login_client)
+    test_order_export_ndjson_gzip(login_client)
+    print("\n🎉 All streaming tests passed!")
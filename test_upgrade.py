@@ -0,0 +1,68 @@
+"""
+Test script for `python app/init_db.py --upgrade`
+Builds a separate SQLite database shaped like one created before the support
+tables existed, upgrades it and checks that nothing is left empty or missing
+"""
+
+import os
+import sys
+import tempfile
+sys.stdout.reconfigure(encoding='utf-8')
+
+from app.db_backend import connect, is_sqlite
+from app.init_db import create_tables, insert_sample_data, main
+
+def execute(statements):
+    """Run statements on a fresh connection and commit"""
+    conn = connect()
+    cursor = conn.cursor()
+    for statement in statements:
+        cursor.execute(statement)
+    conn.commit()
+    cursor.close()
+    conn.close()
+
+def upgrade():
+    """Run init_db's --upgrade path and return its exit code"""
+    argv = sys.argv
+    sys.argv = ['init_db.py', '--upgrade']
+    try:
+        return main()
+    finally:
+        sys.argv = argv
+
+def test_upgrade_adds_missing_schema(query):
+    """Missing indexes are added, and rollup tables created by --upgrade are rebuilt from the orders"""
+    if not is_sqlite():
+        print("⏭️  Skipped: the upgrade test builds its own SQLite database")
+        return
+    path = os.environ['SQLITE_PATH']
+    os.environ['SQLITE_PATH'] = os.path.join(tempfile.mkdtemp(prefix='pizza_upgrade_'), 'old.sqlite3')
+    try:
+        create_tables()
+        insert_sample_data()
+        execute(["DROP TABLE rollup_daily_sales", "DROP TABLE rollup_status_sales",
+                 "DROP TABLE rollup_pizza_sales", "DROP INDEX idx_employees_name",
+                 "DROP INDEX idx_customers_archived_name", "DROP INDEX idx_pizzas_archived_sort"])
+
+        assert upgrade() == 0
+        indexes = {row['name'] for row in query("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {'idx_employees_name', 'idx_customers_archived_name', 'idx_pizzas_archived_sort'} <= indexes
+        orders = query("SELECT COUNT(*) AS n, SUM(total_amount) AS total FROM orders")[0]
+        rollup = query("SELECT SUM(order_count) AS n, SUM(total_sales) AS total FROM rollup_daily_sales")[0]
+        assert orders['n'] == rollup['n'] == 3
+        assert round(orders['total'], 2) == round(rollup['total'], 2)
+        assert query("SELECT COUNT(*) AS n FROM rollup_pizza_sales")[0]['n'] > 0
+
+        # Upgrading again leaves the (now maintained) rollups alone
+        execute(["UPDATE rollup_status_sales SET order_count = 99 WHERE status = 'Completed'"])
+        assert upgrade() == 0
+        assert query("SELECT order_count FROM rollup_status_sales WHERE status = 'Completed'")[0]['order_count'] == 99
+    finally:
+        os.environ['SQLITE_PATH'] = path
+    print("✅ --upgrade adds missing indexes and backfills rollup tables it creates, and only those")
+
+if __name__ == '__main__':
+    from conftest import run_query
+    test_upgrade_adds_missing_schema(run_query)
+    print("\n🎉 All upgrade tests passed!")